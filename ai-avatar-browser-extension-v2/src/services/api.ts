@@ -277,7 +277,7 @@ class ApiService {
   }
 
   // Get voice configuration
-  async getVoiceConfig(): Promise<{ status: string; voice_configuration: VoiceConfig; timestamp: string }> {
+  async getVoiceConfig(): Promise<{ status: string; voice_configuration: VoiceConfig; generated_at: string }> {
     return this.makeRequest('/v1/voice/config');
   }
 
@@ -16,6 +16,7 @@ export interface DifficultyConfig {
 }
 
 export interface SportsContextConfig {
+  aliases?: string[];
   terminology: string[];
   personality: string;
   focus: string;
@@ -4,7 +4,7 @@ Environment configuration and settings management
 
 import os
 import json
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field, field_validator
 
@@ -14,9 +14,14 @@ class Settings(BaseSettings):
     
     # OpenAI Configuration
     openai_api_key: str = Field(..., env="OPENAI_API_KEY")
+    openai_base_url: str = Field(default="https://api.openai.com/v1", env="OPENAI_BASE_URL")
     realtime_model: str = Field(default="gpt-realtime", env="REALTIME_MODEL")
     realtime_voice: str = Field(default="verse", env="REALTIME_VOICE")
     token_ttl_seconds: int = Field(default=600, env="TOKEN_TTL_SECONDS")
+    token_body_fast_path_enabled: bool = Field(default=False, env="TOKEN_BODY_FAST_PATH_ENABLED")
+    token_body_fast_path_size: int = Field(default=1024, env="TOKEN_BODY_FAST_PATH_SIZE")
+    idempotency_ttl_seconds: float = Field(default=300.0, env="IDEMPOTENCY_TTL_SECONDS")
+    idempotency_max_entries: int = Field(default=10000, env="IDEMPOTENCY_MAX_ENTRIES")
     
     # Security Configuration
     allowed_origins: List[str] = Field(
@@ -27,14 +32,64 @@ class Settings(BaseSettings):
         default=["https://www.espn.com", "chrome-extension://abc123"],
         env="CORS_ORIGINS"
     )
+    origin_validation_enabled: bool = Field(default=False, env="ORIGIN_VALIDATION_ENABLED")
+    origin_cache_size: int = Field(default=1024, env="ORIGIN_CACHE_SIZE")
     
     # Rate Limiting
     rate_limit_per_minute: int = Field(default=10, env="RATE_LIMIT_PER_MINUTE")
     rate_limit_burst: int = Field(default=5, env="RATE_LIMIT_BURST")
+    rate_limit_enabled: bool = Field(default=True, env="RATE_LIMIT_ENABLED")
+    rate_limit_key: str = Field(default="ip", env="RATE_LIMIT_KEY")  # ip, origin or origin_ip
+    rate_limit_backend: str = Field(default="memory", env="RATE_LIMIT_BACKEND")  # memory or sqlite
+    rate_limit_sqlite_path: str = Field(default="/tmp/parker_rate_limit.sqlite3", env="RATE_LIMIT_SQLITE_PATH")
+    trusted_proxy_count: int = Field(default=0, env="TRUSTED_PROXY_COUNT")  # proxies appending X-Forwarded-For
+    
+    # Serverless cold starts (on by default on Vercel)
+    cold_start_mode: bool = Field(default=bool(os.getenv("VERCEL")), env="COLD_START_MODE")
+    config_snapshot_path: Optional[str] = Field(default=None, env="CONFIG_SNAPSHOT_PATH")
+    prewarm_enabled: bool = Field(default=False, env="PREWARM_ENABLED")
+    prewarm_session: bool = Field(default=False, env="PREWARM_SESSION")  # mint a default token while prewarming
+    
+    # Health probing
+    health_probe_enabled: bool = Field(default=True, env="HEALTH_PROBE_ENABLED")
+    health_probe_interval: float = Field(default=30.0, env="HEALTH_PROBE_INTERVAL")
+    health_probe_timeout: float = Field(default=5.0, env="HEALTH_PROBE_TIMEOUT")
+    health_probe_failure_threshold: int = Field(default=3, env="HEALTH_PROBE_FAILURE_THRESHOLD")
+    cache_cleanup_interval: float = Field(default=60.0, env="CACHE_CLEANUP_INTERVAL")
+    
+    # Precomputed responses (/, /debug, /v1/voice/config, /v1/voice/test, unfiltered /v1/voice/monitoring)
+    response_snapshot_interval: float = Field(default=5.0, env="RESPONSE_SNAPSHOT_INTERVAL")
+    response_compress_min_bytes: int = Field(default=1024, env="RESPONSE_COMPRESS_MIN_BYTES")
+    
+    # Voice configuration hot reload
+    voice_config_watch_enabled: bool = Field(default=True, env="VOICE_CONFIG_WATCH_ENABLED")
+    voice_config_watch_interval: float = Field(default=2.0, env="VOICE_CONFIG_WATCH_INTERVAL")
+    
+    # Upstream fair queuing
+    upstream_max_concurrency: int = Field(default=32, env="UPSTREAM_MAX_CONCURRENCY")
+    upstream_queue_per_origin: int = Field(default=64, env="UPSTREAM_QUEUE_PER_ORIGIN")
+    upstream_queue_timeout: float = Field(default=10.0, env="UPSTREAM_QUEUE_TIMEOUT")
+    upstream_origin_weights: Dict[str, float] = Field(default_factory=dict, env="UPSTREAM_ORIGIN_WEIGHTS")
+    
+    # Load shedding
+    load_shedding_enabled: bool = Field(default=True, env="LOAD_SHEDDING_ENABLED")
+    load_shed_lag_threshold_ms: float = Field(default=100.0, env="LOAD_SHED_LAG_THRESHOLD_MS")
+    load_shed_lag_critical_ms: float = Field(default=500.0, env="LOAD_SHED_LAG_CRITICAL_MS")
+    load_shed_pending_threshold: int = Field(default=32, env="LOAD_SHED_PENDING_THRESHOLD")
+    load_shed_pending_critical: int = Field(default=128, env="LOAD_SHED_PENDING_CRITICAL")
+    load_shed_sample_interval: float = Field(default=0.1, env="LOAD_SHED_SAMPLE_INTERVAL")
+    load_shed_retry_after: float = Field(default=2.0, env="LOAD_SHED_RETRY_AFTER")
+    load_shed_low_priority_paths: List[str] = Field(
+        default=["/v1/voice/test", "/v1/voice/monitoring", "/v1/voice/events", "/v1/voice/audio", "/v1/voice/convert", "/debug"],
+        env="LOAD_SHED_LOW_PRIORITY_PATHS"
+    )
     
     # Logging
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
     log_format: str = Field(default="json", env="LOG_FORMAT")
+    log_async: bool = Field(default=True, env="LOG_ASYNC")
+    log_sample_rate: float = Field(default=1.0, env="LOG_SAMPLE_RATE")
+    log_queue_size: int = Field(default=10000, env="LOG_QUEUE_SIZE")
     
     # Advanced Settings
     default_instructions: str = Field(
@@ -66,6 +121,41 @@ class Settings(BaseSettings):
     # Monitoring
     health_check_interval: int = Field(default=30, env="HEALTH_CHECK_INTERVAL")
     metrics_enabled: bool = Field(default=True, env="METRICS_ENABLED")
+    monitoring_degraded_error_rate: float = Field(default=0.25, env="MONITORING_DEGRADED_ERROR_RATE")
+    monitoring_slow_request_ms: int = Field(default=10000, env="MONITORING_SLOW_REQUEST_MS")
+    session_max_age_seconds: int = Field(default=900, env="SESSION_MAX_AGE_SECONDS")
+    session_reaper_interval: int = Field(default=30, env="SESSION_REAPER_INTERVAL")
+    server_timing_enabled: bool = Field(default=False, env="SERVER_TIMING_ENABLED")
+    monitoring_snapshot_interval: float = Field(default=2.0, env="MONITORING_SNAPSHOT_INTERVAL")
+    monitoring_page_max: int = Field(default=500, env="MONITORING_PAGE_MAX")
+    
+    # Client event ingestion (/v1/voice/events)
+    voice_events_queue_size: int = Field(default=10000, env="VOICE_EVENTS_QUEUE_SIZE")
+    voice_events_max_sessions: int = Field(default=5000, env="VOICE_EVENTS_MAX_SESSIONS")
+    voice_events_retry_after: float = Field(default=1.0, env="VOICE_EVENTS_RETRY_AFTER")
+    
+    # Realtime WebSocket relay (/v1/realtime/relay)
+    relay_enabled: bool = Field(default=False, env="RELAY_ENABLED")
+    relay_upstream_url: str = Field(default="wss://api.openai.com/v1/realtime", env="RELAY_UPSTREAM_URL")
+    relay_public_url: str = Field(default="", env="RELAY_PUBLIC_URL")
+    relay_max_sessions: int = Field(default=200, env="RELAY_MAX_SESSIONS")
+    relay_max_session_seconds: float = Field(default=900.0, env="RELAY_MAX_SESSION_SECONDS")
+    relay_max_frame_bytes: int = Field(default=1048576, env="RELAY_MAX_FRAME_BYTES")
+    relay_open_timeout: float = Field(default=10.0, env="RELAY_OPEN_TIMEOUT")
+    
+    # Token refresh stream (/v1/realtime/token/stream)
+    token_stream_lead_seconds: float = Field(default=15.0, env="TOKEN_STREAM_LEAD_SECONDS")
+    token_stream_heartbeat_seconds: float = Field(default=15.0, env="TOKEN_STREAM_HEARTBEAT_SECONDS")
+    token_stream_max_subscribers: int = Field(default=5000, env="TOKEN_STREAM_MAX_SUBSCRIBERS")
+    token_stream_retry_seconds: float = Field(default=3.0, env="TOKEN_STREAM_RETRY_SECONDS")
+    
+    # Request trace capture (anonymized token request records for replay)
+    trace_capture_enabled: bool = Field(default=False, env="TRACE_CAPTURE_ENABLED")
+    trace_capture_path: str = Field(default="traces/token_requests.jsonl", env="TRACE_CAPTURE_PATH")
+    trace_capture_max_bytes: int = Field(default=50 * 1024 * 1024, env="TRACE_CAPTURE_MAX_BYTES")
+    trace_capture_backups: int = Field(default=5, env="TRACE_CAPTURE_BACKUPS")
+    trace_capture_queue_size: int = Field(default=10000, env="TRACE_CAPTURE_QUEUE_SIZE")
+    trace_capture_salt: str = Field(default="", env="TRACE_CAPTURE_SALT")
     
     # Application
     app_name: str = Field(default="Parker Realtime Token Service")
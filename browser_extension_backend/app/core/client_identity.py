@@ -0,0 +1,47 @@
+"""
+Client identity helpers for rate limiting and per-origin scheduling
+"""
+
+from typing import Optional
+
+from starlette.requests import Request
+
+from app.config.settings import settings
+
+
+def client_ip(request: Request) -> str:
+    """Client IP as seen by the outermost trusted proxy
+
+    Clients can send any X-Forwarded-For they like, and each proxy appends
+    the address it received the request from, so only the hop added by the
+    ``trusted_proxy_count``-th proxy from the right can be relied on.
+    """
+    hops = settings.trusted_proxy_count
+    if hops > 0:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            addresses = forwarded.split(",")
+            return addresses[-min(hops, len(addresses))].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def origin_key(request: Request) -> Optional[str]:
+    """Chrome extension ID or site origin the request came from, if any"""
+    origin = request.headers.get("origin")
+    if not origin or origin == "null":
+        return None
+    if origin.startswith("chrome-extension://"):
+        return "ext:" + origin[len("chrome-extension://"):].rstrip("/")
+    return "site:" + origin
+
+
+def client_key(request: Request, strategy: str = "ip") -> str:
+    """Key identifying the client for the given strategy (ip, origin or origin_ip)"""
+    if strategy == "ip":
+        return "ip:" + client_ip(request)
+
+    origin = origin_key(request)
+    if strategy == "origin":
+        return origin or "ip:" + client_ip(request)
+    # origin_ip: per client within each origin
+    return f"{origin or 'none'}|ip:{client_ip(request)}"
@@ -2,13 +2,32 @@
 Dependency injection container for managing service instances
 """
 
-from typing import Optional
+from pathlib import Path
+from typing import Any, Dict, Optional
+import asyncio
+import contextvars
 import structlog
+from app.models.token import TokenRequest
 from app.services.openai_client import OpenAIClient
 from app.services.token_service import TokenService
 from app.services.cache import InMemoryCache
 from app.services.voice_config import VoiceConfigService
 from app.services.voice_monitoring import VoiceMonitoringService
+from app.services.rate_limiter import RateLimiter, create_rate_limiter
+from app.services.fair_scheduler import FairScheduler
+from app.services.load_shedder import LoadShedder
+from app.services.health_prober import HealthProber
+from app.services.monitoring_snapshot import MonitoringSnapshotter
+from app.services.event_ingestor import VoiceEventIngestor
+from app.services.realtime_relay import RealtimeRelay
+from app.services.token_stream import TokenBroadcaster
+from app.services.body_digest import BodyDigestCache
+from app.services.idempotency import IdempotencyStore
+from app.services.trace_capture import TraceRecorder
+from app.utils.yaml_loader import yaml_loader
+from app.utils.config_snapshot import DEFAULT_SNAPSHOT_PATH
+from app.core.precomputed import precomputed
+from app.core.logging_config import get_logging_stats
 from app.config.settings import settings
 
 logger = structlog.get_logger(__name__)
@@ -23,42 +42,324 @@ class ServiceContainer:
         self._cache: Optional[InMemoryCache] = None
         self._voice_config: Optional[VoiceConfigService] = None
         self._voice_monitoring: Optional[VoiceMonitoringService] = None
+        self._rate_limiter: Optional[RateLimiter] = None
+        self._scheduler: Optional[FairScheduler] = None
+        self._load_shedder: Optional[LoadShedder] = None
+        self._health_prober: Optional[HealthProber] = None
+        self._monitoring_snapshots: Optional[MonitoringSnapshotter] = None
+        self._event_ingestor: Optional[VoiceEventIngestor] = None
+        self._realtime_relay: Optional[RealtimeRelay] = None
+        self._token_stream: Optional[TokenBroadcaster] = None
+        self._body_digests: Optional[BodyDigestCache] = None
+        self._idempotency: Optional[IdempotencyStore] = None
+        self._trace_recorder: Optional[TraceRecorder] = None
+        self._background_tasks: list[asyncio.Task] = []
+        self._prewarm_task: Optional[asyncio.Task] = None
+        self._init_lock = asyncio.Lock()
+        self._ready = asyncio.Event()
         self._initialized = False
+        yaml_loader.add_reload_callback(self._swap_voice_config)
+    
+    @property
+    def is_ready(self) -> bool:
+        """Whether initialization has completed"""
+        return self._ready.is_set()
+    
+    async def ready(self) -> None:
+        """Wait until the container is ready, initializing it if nobody else is"""
+        if not self._ready.is_set():
+            await self.initialize()
     
     async def initialize(self) -> None:
-        """Initialize all services"""
+        """Initialize all services
+        
+        Single-flight: concurrent callers on a cold instance wait on the lock
+        for the first one to finish instead of building their own services.
+        """
         if self._initialized:
             return
         
+        async with self._init_lock:
+            if self._initialized:
+                return
+            try:
+                await self._build_services()
+            except Exception as e:
+                logger.error("Service container initialization failed", error=str(e))
+                # Keep the lock: callers queued on it retry the build after us
+                await self._release_services()
+                raise
+            
+            # In a fresh context, so tasks started by the first request don't
+            # log with its request ID forever
+            contextvars.Context().run(self._start_background_tasks)
+            
+            self._initialized = True
+            self._ready.set()
+            logger.info("Service container initialized successfully")
+    
+    async def _build_services(self) -> None:
         logger.info("Initializing service container")
         
         # Initialize cache first
         self._cache = InMemoryCache(default_ttl=settings.token_ttl_seconds)
         
+        # Initialize OpenAI client
+        self._openai_client = OpenAIClient(settings.openai_api_key, base_url=settings.openai_base_url)
+        
         # Initialize voice configuration service
-        self._voice_config = VoiceConfigService()
+        if settings.cold_start_mode:
+            # Precompiled snapshot instead of parsing YAML on the first request
+            yaml_loader.snapshot_path = Path(settings.config_snapshot_path or DEFAULT_SNAPSHOT_PATH)
+        
+        # Config parsing and CA certificate loading are blocking; keep them off the loop
+        self._voice_config, _ = await asyncio.gather(
+            asyncio.to_thread(VoiceConfigService),
+            asyncio.to_thread(self._openai_client.prewarm)
+        )
         
         # Initialize voice monitoring service
         self._voice_monitoring = VoiceMonitoringService()
         
-        # Initialize OpenAI client
-        self._openai_client = OpenAIClient(settings.openai_api_key)
+        # Initialize per-client rate limiter
+        self._rate_limiter = create_rate_limiter(
+            backend=settings.rate_limit_backend,
+            rate_per_minute=settings.rate_limit_per_minute,
+            burst=settings.rate_limit_burst,
+            sqlite_path=settings.rate_limit_sqlite_path
+        )
+        
+        # Initialize fair scheduler for upstream session slots
+        self._scheduler = FairScheduler(
+            max_concurrency=settings.upstream_max_concurrency,
+            max_queue_per_origin=settings.upstream_queue_per_origin,
+            queue_timeout=settings.upstream_queue_timeout,
+            weights=settings.upstream_origin_weights
+        )
+        
+        # Initialize load shedder (admission control under overload)
+        if settings.load_shedding_enabled:
+            self._load_shedder = LoadShedder(
+                lag_threshold_ms=settings.load_shed_lag_threshold_ms,
+                lag_critical_ms=settings.load_shed_lag_critical_ms,
+                pending_threshold=settings.load_shed_pending_threshold,
+                pending_critical=settings.load_shed_pending_critical,
+                retry_after=settings.load_shed_retry_after,
+                scheduler=self._scheduler
+            )
+        
+        # Initialize upstream health prober (results cached for health endpoints)
+        self._health_prober = HealthProber(
+            self._openai_client,
+            timeout_seconds=settings.health_probe_timeout,
+            failure_threshold=settings.health_probe_failure_threshold
+        )
+        
+        # Monitoring reads are served from snapshots rebuilt in the background
+        self._monitoring_snapshots = MonitoringSnapshotter(self._voice_monitoring, self._monitoring_summary)
+        
+        # Client telemetry is queued and applied to voice monitoring by one consumer
+        self._event_ingestor = VoiceEventIngestor(
+            self._voice_monitoring,
+            queue_size=settings.voice_events_queue_size,
+            max_sessions=settings.voice_events_max_sessions,
+            retry_after=settings.voice_events_retry_after
+        )
+        
+        # Initialize Realtime relay (extension <-> upstream WebSocket passthrough)
+        if settings.relay_enabled:
+            self._realtime_relay = RealtimeRelay(
+                upstream_url=settings.relay_upstream_url,
+                monitoring=self._voice_monitoring,
+                max_sessions=settings.relay_max_sessions,
+                max_session_seconds=settings.relay_max_session_seconds,
+                max_frame_bytes=settings.relay_max_frame_bytes,
+                open_timeout=settings.relay_open_timeout
+            )
         
         # Initialize token service with all dependencies
         self._token_service = TokenService(
             self._openai_client, 
             self._cache, 
             self._voice_config, 
-            self._voice_monitoring
+            self._voice_monitoring,
+            self._scheduler,
+            self._load_shedder
+        )
+        
+        # Results of calls made with an Idempotency-Key, for retries to reuse
+        self._idempotency = IdempotencyStore(
+            ttl_seconds=settings.idempotency_ttl_seconds,
+            max_entries=settings.idempotency_max_entries
+        )
+        
+        # Parsed token requests by raw body digest (opt-in fast path)
+        if settings.token_body_fast_path_enabled:
+            self._body_digests = BodyDigestCache(max_entries=settings.token_body_fast_path_size)
+        
+        # Anonymized token request trace for offline replay (opt-in)
+        if settings.trace_capture_enabled:
+            self._trace_recorder = TraceRecorder(
+                settings.trace_capture_path,
+                max_bytes=settings.trace_capture_max_bytes,
+                backups=settings.trace_capture_backups,
+                queue_size=settings.trace_capture_queue_size,
+                salt=settings.trace_capture_salt
+            )
+            self._trace_recorder.start()
+        
+        # Token refresh channels share mints across SSE subscribers
+        self._token_stream = TokenBroadcaster(
+            self._token_service,
+            lead_seconds=settings.token_stream_lead_seconds,
+            heartbeat_seconds=settings.token_stream_heartbeat_seconds,
+            max_subscribers=settings.token_stream_max_subscribers,
+            retry_seconds=settings.token_stream_retry_seconds
         )
+    
+    def start_prewarm(self) -> Optional[asyncio.Task]:
+        """Initialize in the background if an event loop is already running
         
-        self._initialized = True
-        logger.info("Service container initialized successfully")
+        Called at import time so initialization overlaps with the platform's
+        own startup; without a running loop the first request initializes.
+        """
+        if self._prewarm_task is not None or self._initialized:
+            return self._prewarm_task
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        self._prewarm_task = loop.create_task(self._prewarm(), name="container-prewarm")
+        return self._prewarm_task
+    
+    async def _prewarm(self) -> None:
+        try:
+            await self.initialize()
+            if settings.prewarm_session:
+                # Mint and cache a token for the default request configuration
+                await self._token_service.generate_token(TokenRequest(), request_id="prewarm")
+            logger.info("Service container prewarmed")
+        except Exception as e:
+            logger.warning("Service container prewarm failed", error=str(e))
+    
+    def _start_background_tasks(self) -> None:
+        """Start periodic maintenance tasks on the running event loop"""
+        self._background_tasks.append(asyncio.create_task(
+            self._voice_monitoring.run_session_reaper(
+                interval_seconds=settings.session_reaper_interval,
+                max_age_seconds=settings.session_max_age_seconds
+            ),
+            name="voice-session-reaper"
+        ))
+        self._background_tasks.append(asyncio.create_task(
+            self._cache.run_cleanup(interval_seconds=settings.cache_cleanup_interval),
+            name="cache-cleanup"
+        ))
+        if settings.health_probe_enabled:
+            self._background_tasks.append(asyncio.create_task(
+                self._health_prober.run(interval_seconds=settings.health_probe_interval),
+                name="health-prober"
+            ))
+        self._background_tasks.append(asyncio.create_task(
+            self._rate_limiter.run_eviction(interval_seconds=max(self._rate_limiter.idle_ttl, 1.0)),
+            name="rate-limiter-eviction"
+        ))
+        # Deployed files don't change on serverless instances
+        if settings.voice_config_watch_enabled and not settings.cold_start_mode:
+            self._background_tasks.append(asyncio.create_task(
+                yaml_loader.watch(interval_seconds=settings.voice_config_watch_interval),
+                name="voice-config-watcher"
+            ))
+        if self._load_shedder:
+            self._background_tasks.append(asyncio.create_task(
+                self._load_shedder.run_lag_monitor(interval_seconds=settings.load_shed_sample_interval),
+                name="loop-lag-monitor"
+            ))
+        self._background_tasks.append(asyncio.create_task(
+            self._monitoring_snapshots.run(interval_seconds=settings.monitoring_snapshot_interval),
+            name="monitoring-snapshot"
+        ))
+        self._background_tasks.append(asyncio.create_task(
+            self._event_ingestor.run(),
+            name="voice-event-consumer"
+        ))
+        self._background_tasks.append(asyncio.create_task(
+            self._token_stream.run(),
+            name="token-stream-heartbeat"
+        ))
+    
+    def _monitoring_summary(self) -> Dict[str, Any]:
+        """Aggregate monitoring sections captured in each monitoring snapshot"""
+        return {
+            "performance_stats": self._voice_monitoring.get_performance_stats(),
+            "voice_performance_by_type": self._voice_monitoring.get_voice_performance_by_type(),
+            "health_status": self._voice_monitoring.get_health_status(),
+            "time_windows": self._voice_monitoring.get_window_stats(),
+            "stage_timings": self._voice_monitoring.get_stage_timings(),
+            "logging": get_logging_stats(),
+            "rate_limiter": self._rate_limiter.get_stats(),
+            "upstream_scheduler": self._scheduler.get_stats(),
+            "upstream_health": self._health_prober.get_state(),
+            "load_shedding": self._load_shedder.get_stats() if self._load_shedder else None,
+            "event_ingestion": self._event_ingestor.get_stats(),
+            "realtime_relay": self._realtime_relay.get_stats() if self._realtime_relay else None,
+            "token_stream": self._token_stream.get_stats(),
+            "body_fast_path": self._body_digests.get_stats() if self._body_digests else None,
+            "idempotency": self._idempotency.get_stats(),
+            "trace_capture": self._trace_recorder.get_stats() if self._trace_recorder else None,
+            "precomputed_responses": precomputed.get_stats()
+        }
+    
+    def _swap_voice_config(self, config: Dict[str, Any]) -> None:
+        """Build a voice config snapshot from a reloaded YAML and swap it in"""
+        if not self._initialized:
+            return
+        
+        voice_config = VoiceConfigService(config)
+        self._voice_config = voice_config
+        self._token_service.voice_config = voice_config
+        
+        # Cached tokens and responses carry data built from the old personalities
+        self._cache.clear()
+        # Canonical requests depend on the sport aliases
+        if self._body_digests:
+            self._body_digests.clear()
+        precomputed.invalidate()
+        logger.info("Voice configuration reloaded")
+    
+    async def _stop_background_tasks(self) -> None:
+        """Cancel background tasks and wait for them to finish"""
+        tasks, self._background_tasks = self._background_tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
     
     async def cleanup(self) -> None:
         """Cleanup all services"""
         logger.info("Cleaning up service container")
         
+        prewarm = self._prewarm_task
+        if prewarm and not prewarm.done() and prewarm is not asyncio.current_task():
+            prewarm.cancel()
+            await asyncio.gather(prewarm, return_exceptions=True)
+        
+        await self._release_services()
+        self._prewarm_task = None
+        # Fresh primitives: the next initialize may run on a different event loop
+        self._init_lock = asyncio.Lock()
+        self._ready = asyncio.Event()
+        logger.info("Service container cleanup complete")
+    
+    async def _release_services(self) -> None:
+        """Stop background work and drop every service"""
+        await self._stop_background_tasks()
+        
+        if self._token_stream:
+            self._token_stream.close()
+        
+        if self._trace_recorder:
+            self._trace_recorder.stop()
+        
         if self._openai_client:
             await self._openai_client.close()
             self._openai_client = None
@@ -71,10 +372,21 @@ class ServiceContainer:
             self._voice_monitoring.reset_metrics()
             self._voice_monitoring = None
         
+        self._rate_limiter = None
+        self._scheduler = None
+        self._load_shedder = None
+        self._health_prober = None
+        self._monitoring_snapshots = None
+        self._event_ingestor = None
+        self._realtime_relay = None
+        self._token_stream = None
+        self._body_digests = None
+        self._idempotency = None
+        self._trace_recorder = None
         self._voice_config = None
         self._token_service = None
         self._initialized = False
-        logger.info("Service container cleanup complete")
+        precomputed.invalidate()
     
     @property
     def token_service(self) -> TokenService:
@@ -104,6 +416,83 @@ class ServiceContainer:
             raise RuntimeError("Service container not initialized")
         return self._voice_config
     
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """Get rate limiter instance"""
+        if not self._initialized or not self._rate_limiter:
+            raise RuntimeError("Service container not initialized")
+        return self._rate_limiter
+    
+    @property
+    def scheduler(self) -> FairScheduler:
+        """Get upstream fair scheduler instance"""
+        if not self._initialized or not self._scheduler:
+            raise RuntimeError("Service container not initialized")
+        return self._scheduler
+    
+    @property
+    def load_shedder(self) -> Optional[LoadShedder]:
+        """Get load shedder instance (None when load shedding is disabled)"""
+        if not self._initialized:
+            raise RuntimeError("Service container not initialized")
+        return self._load_shedder
+    
+    @property
+    def health_prober(self) -> HealthProber:
+        """Get upstream health prober instance"""
+        if not self._initialized or not self._health_prober:
+            raise RuntimeError("Service container not initialized")
+        return self._health_prober
+    
+    @property
+    def monitoring_snapshots(self) -> MonitoringSnapshotter:
+        """Get monitoring snapshot builder instance"""
+        if not self._initialized or not self._monitoring_snapshots:
+            raise RuntimeError("Service container not initialized")
+        return self._monitoring_snapshots
+    
+    @property
+    def event_ingestor(self) -> VoiceEventIngestor:
+        """Get client event ingestor instance"""
+        if not self._initialized or not self._event_ingestor:
+            raise RuntimeError("Service container not initialized")
+        return self._event_ingestor
+    
+    @property
+    def realtime_relay(self) -> Optional[RealtimeRelay]:
+        """Get Realtime relay instance (None when the relay is disabled)"""
+        if not self._initialized:
+            raise RuntimeError("Service container not initialized")
+        return self._realtime_relay
+    
+    @property
+    def token_stream(self) -> TokenBroadcaster:
+        """Get token refresh stream broadcaster instance"""
+        if not self._initialized or not self._token_stream:
+            raise RuntimeError("Service container not initialized")
+        return self._token_stream
+    
+    @property
+    def body_digests(self) -> Optional[BodyDigestCache]:
+        """Get token request body digest cache (None when the fast path is disabled)"""
+        if not self._initialized:
+            raise RuntimeError("Service container not initialized")
+        return self._body_digests
+    
+    @property
+    def idempotency(self) -> IdempotencyStore:
+        """Get Idempotency-Key result store instance"""
+        if not self._initialized or not self._idempotency:
+            raise RuntimeError("Service container not initialized")
+        return self._idempotency
+    
+    @property
+    def trace_recorder(self) -> Optional[TraceRecorder]:
+        """Get token request trace recorder (None when capture is disabled)"""
+        if not self._initialized:
+            raise RuntimeError("Service container not initialized")
+        return self._trace_recorder
+    
     @property
     def voice_monitoring(self) -> VoiceMonitoringService:
         """Get voice monitoring service instance"""
@@ -0,0 +1,183 @@
+"""
+Structured logging pipeline with sampling, secret redaction and off-loop rendering
+
+structlog runs the cheap processors (level filter, sampling, redaction,
+timestamp) on the calling thread and hands the event dict to the stdlib
+logging machinery. In async mode the record goes through a bounded queue to
+a listener thread, which does the JSON rendering and the write, so the event
+loop never blocks on serialization or stdout.
+"""
+
+import atexit
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+import structlog
+
+from app.core.request_context import get_request_id
+
+# Keys whose values must never reach the logs
+REDACTED_KEYS = frozenset({
+    "client_secret", "api_key", "openai_api_key", "authorization", "token_response"
+})
+REDACTED = "[REDACTED]"
+
+# Levels that are subject to sampling; warnings and errors are always kept
+SAMPLED_LEVELS = frozenset({"debug", "info"})
+
+
+def redact_secrets(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace secret-bearing values (top level and one nested dict level)"""
+    for key, value in event_dict.items():
+        if key in REDACTED_KEYS:
+            event_dict[key] = REDACTED
+        elif isinstance(value, dict) and not REDACTED_KEYS.isdisjoint(value):
+            event_dict[key] = {
+                inner: REDACTED if inner in REDACTED_KEYS else inner_value
+                for inner, inner_value in value.items()
+            }
+    return event_dict
+
+
+def add_request_id(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach the request ID bound by SecurityMiddleware unless the call passed one"""
+    if "request_id" not in event_dict:
+        request_id = get_request_id()
+        if request_id != "unknown":
+            event_dict["request_id"] = request_id
+    return event_dict
+
+
+class EventSampler:
+    """Drop a fraction of high-volume info/debug events"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+
+    def __call__(self, logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        if self.rate < 1.0 and method_name in SAMPLED_LEVELS and random.random() >= self.rate:
+            raise structlog.DropEvent
+        return event_dict
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Queue handler that enqueues the raw record and drops it when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Rendering happens in the listener thread, not here
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _BlockingSentinelListener(QueueListener):
+    """Queue listener whose stop() waits for room instead of failing on a full queue"""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[_DroppingQueueHandler] = None
+
+
+def configure_logging(
+    level: str = "INFO",
+    log_format: str = "json",
+    async_mode: bool = True,
+    sample_rate: float = 1.0,
+    queue_size: int = 10000,
+    stream: Any = None
+) -> None:
+    """Configure structlog and the stdlib root logger"""
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    renderer = (
+        structlog.processors.JSONRenderer()
+        if log_format == "json"
+        else structlog.dev.ConsoleRenderer(colors=False)
+    )
+    formatter = structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=[
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso")
+        ],
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            renderer
+        ]
+    )
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(formatter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(level.upper())
+
+    if async_mode:
+        _queue_handler = _DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        _listener = _BlockingSentinelListener(_queue_handler.queue, output, respect_handler_level=False)
+        _listener.start()
+        root.addHandler(_queue_handler)
+    else:
+        root.addHandler(output)
+
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            EventSampler(sample_rate),
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            add_request_id,
+            redact_secrets,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.processors.UnicodeDecoder(),
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True
+    )
+
+
+def shutdown_logging() -> None:
+    """Flush and stop the background listener, if running"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener = None
+        _queue_handler = None
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    """Queue depth and dropped-record count for the async pipeline"""
+    if _queue_handler is None:
+        return {"async": False, "queued": 0, "dropped": 0}
+    return {
+        "async": True,
+        "queued": _queue_handler.queue.qsize(),
+        "dropped": _queue_handler.dropped
+    }
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,168 @@
+"""
+Precomputed JSON responses with strong ETags and content negotiation
+"""
+
+import gzip
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.config.settings import settings
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+# Preferred first when the client weights codings equally
+_CODINGS = ("br", "gzip")
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedPayload:
+    """A serialized response body and its precompressed variants"""
+    digest: str
+    built_at: float
+    variants: Dict[str, bytes]  # "identity", "gzip", "br"
+    version: Any = None
+
+    def etag(self, coding: str) -> str:
+        return f'"{self.digest}"' if coding == "identity" else f'"{self.digest}-{coding}"'
+
+
+def negotiate_encoding(accept_encoding: str, available) -> str:
+    """Best content coding from an Accept-Encoding header among ``available``"""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+
+    best, best_q = "identity", 0.0
+    for coding in _CODINGS:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if coding in available and q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _matches(if_none_match: str, digest: str) -> bool:
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        # Any coding of the same content counts as current
+        if tag.strip('"').split("-", 1)[0] == digest:
+            return True
+    return False
+
+
+class PrecomputedResponses:
+    """Encoded response bodies keyed by endpoint, rebuilt on invalidation or age
+
+    Each entry is serialized once, hashed for its ETag and compressed up
+    front, so serving it is a dictionary lookup plus header comparison.
+    """
+
+    def __init__(self, min_compress_bytes: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.min_compress_bytes = min_compress_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._entries: Dict[str, EncodedPayload] = {}
+        self.builds = 0
+        self.not_modified = 0
+
+    def _encode(self, payload: Any, version: Any = None) -> EncodedPayload:
+        body = json.dumps(
+            jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+        variants = {"identity": body}
+        if len(body) >= self.min_compress_bytes:
+            variants["gzip"] = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+            if brotli is not None:
+                variants["br"] = brotli.compress(body, quality=self.brotli_quality)
+        self.builds += 1
+        return EncodedPayload(
+            digest=hashlib.blake2b(body, digest_size=16).hexdigest(),
+            built_at=time.monotonic(),
+            variants=variants,
+            version=version
+        )
+
+    def get(
+        self,
+        key: str,
+        build: Callable[[], Any],
+        max_age: Optional[float] = None,
+        version: Any = None
+    ) -> EncodedPayload:
+        """Cached payload for ``key``, rebuilt if missing, older than ``max_age``
+        seconds or built for a different ``version`` of its source data"""
+        entry = self._entries.get(key)
+        if (
+            entry is None
+            or entry.version != version
+            or (max_age is not None and time.monotonic() - entry.built_at >= max_age)
+        ):
+            entry = self._entries[key] = self._encode(build(), version)
+        return entry
+
+    def invalidate(self, *keys: str) -> None:
+        """Drop the given entries, or all of them"""
+        if not keys:
+            self._entries.clear()
+            return
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def respond(
+        self,
+        request: Request,
+        key: str,
+        build: Callable[[], Any],
+        max_age: Optional[float] = None,
+        version: Any = None
+    ) -> Response:
+        """Serve the payload for ``key`` honouring If-None-Match and Accept-Encoding"""
+        entry = self.get(key, build, max_age, version)
+        coding = negotiate_encoding(request.headers.get("accept-encoding", ""), entry.variants)
+        headers = {
+            "ETag": entry.etag(coding),
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "no-cache"
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, entry.digest):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return Response(content=entry.variants[coding], media_type="application/json", headers=headers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "builds": self.builds,
+            "not_modified": self.not_modified,
+            "brotli_available": brotli is not None
+        }
+
+
+# Global instance, invalidated by the service container on config reload
+precomputed = PrecomputedResponses(min_compress_bytes=settings.response_compress_min_bytes)
@@ -0,0 +1,44 @@
+"""
+Per-request context propagation using contextvars
+"""
+
+import itertools
+import os
+from contextvars import ContextVar, Token
+
+# Request ID for the request currently being handled by this task
+request_id_var: ContextVar[str] = ContextVar("request_id", default="unknown")
+
+_prefix = ""
+_counter = itertools.count(1)
+
+
+def _reseed() -> None:
+    """Derive a per-process prefix so IDs stay unique across workers"""
+    global _prefix, _counter
+    _prefix = f"{os.getpid():x}{os.urandom(4).hex()}"
+    _counter = itertools.count(1)
+
+
+_reseed()
+os.register_at_fork(after_in_child=_reseed)
+
+
+def new_request_id() -> str:
+    """Generate a unique request ID (process prefix + counter, no uuid4 per request)"""
+    return f"req_{_prefix}_{next(_counter):x}"
+
+
+def get_request_id() -> str:
+    """Get the request ID bound to the current context"""
+    return request_id_var.get()
+
+
+def bind_request_id(request_id: str) -> Token:
+    """Bind a request ID to the current context and return the reset token"""
+    return request_id_var.set(request_id)
+
+
+def reset_request_id(token: Token) -> None:
+    """Restore the request ID that was bound before ``bind_request_id``"""
+    request_id_var.reset(token)
@@ -0,0 +1,93 @@
+"""
+Lightweight in-process span recorder
+
+Spans follow OpenTelemetry naming semantics (name, start/end in nanoseconds,
+attributes, parent) but are kept in memory per request; no exporter or
+collector is involved. Recording is a no-op unless a trace was started for
+the current context.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+
+@dataclass(slots=True)
+class Span:
+    """A single timed stage"""
+    name: str
+    start_ns: int
+    end_ns: int = 0
+    parent: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+
+class Trace:
+    """Spans recorded while handling one request"""
+
+    __slots__ = ("spans",)
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def durations(self) -> Dict[str, float]:
+        """Total milliseconds per span name (retried stages are summed)"""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        return totals
+
+    def server_timing(self) -> str:
+        """Render the spans as a ``Server-Timing`` header value"""
+        return ", ".join(
+            f"{name.replace('.', '-')};dur={duration:.2f}"
+            for name, duration in self.durations().items()
+        )
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[str]] = ContextVar("current_span", default=None)
+
+
+def start_trace() -> Trace:
+    """Start collecting spans for the current context"""
+    trace = Trace()
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    """Get the trace bound to the current context, if any"""
+    return _current_trace.get()
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+    """Record an already-measured span (e.g. derived from httpx trace events)"""
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    trace.spans.append(Span(name, start_ns, end_ns, _current_span.get(), attributes))
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Time the enclosed block as a span of the current trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    current = Span(name, time.perf_counter_ns(), parent=_current_span.get(), attributes=attributes)
+    token = _current_span.set(name)
+    try:
+        yield current
+    finally:
+        current.end_ns = time.perf_counter_ns()
+        _current_span.reset(token)
+        trace.spans.append(current)
@@ -2,41 +2,48 @@
 FastAPI application for OpenAI Realtime Token Service
 """
 
-from fastapi import FastAPI, HTTPException, Depends, Request, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, WebSocket, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
 import os
+import math
+from functools import partial
+from typing import Literal, Optional
 from datetime import datetime
 import structlog
 import asyncio
 
 from app.config.settings import settings
-from app.models.token import TokenRequest, TokenResponse
+from app.models.token import TokenRequest, TokenResponse, VoiceType, DifficultyLevel
 from app.models.health import HealthResponse
 from app.models.errors import ErrorResponse, ErrorCode
+from app.models.events import VoiceEventBatch, VoiceEventKind
 from app.middleware.security import SecurityMiddleware
+from app.middleware.load_shedding import LoadSheddingMiddleware
+from app.middleware.trace_capture import TraceCaptureMiddleware
 from app.core.container import container
+from app.core.tracing import span, start_trace
+from app.core.client_identity import client_key
+from app.services.fair_scheduler import UpstreamQueueRejected
+from app.services.load_shedder import LoadShedRejected
+from app.services.monitoring_snapshot import MonitoringSnapshot
+from app.services.event_ingestor import EventQueueFull
+from app.services.token_stream import TokenStreamFull
+from app.services.idempotency import IdempotencyConflict
+from app.services.token_service import build_turn_detection
+from app.core.precomputed import precomputed
+from app.core.logging_config import configure_logging, shutdown_logging
 
 # Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
-    cache_logger_on_first_use=True
+configure_logging(
+    level=settings.log_level,
+    log_format=settings.log_format,
+    async_mode=settings.log_async,
+    sample_rate=settings.log_sample_rate,
+    queue_size=settings.log_queue_size
 )
 
 logger = structlog.get_logger(__name__)
@@ -50,11 +57,6 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
-# Rate limiting setup
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 # Global exception handler for HTTPException
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
@@ -72,48 +74,262 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             "request_id": request_id,
             "timestamp": datetime.utcnow().isoformat() + "Z"
         },
-        headers={"X-Request-ID": request_id}
+        headers={**(exc.headers or {}), "X-Request-ID": request_id}
+    )
+
+
+def _json_safe(value):
+    """Replace NaN and infinities, which JSON cannot carry, with their names"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """FastAPI's 422 body, safe to render when the rejected input was NaN or infinite"""
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content={"detail": _json_safe(jsonable_encoder(exc.errors()))}
     )
 
-# CORS configuration (must be first to handle Chrome extensions properly)
+# Shed low-priority endpoints under overload (runs inside SecurityMiddleware,
+# so rejections still carry a request ID)
+app.add_middleware(
+    LoadSheddingMiddleware,
+    get_shedder=lambda: container.load_shedder if container.is_ready else None,
+    low_priority_prefixes=settings.load_shed_low_priority_paths
+)
+
+# Anonymized token request trace (opt-in); inside SecurityMiddleware so
+# origin rejections are left out and request state is shared
+app.add_middleware(
+    TraceCaptureMiddleware,
+    get_recorder=lambda: container.trace_recorder if container.is_ready else None
+)
+
+# Request IDs, X-Request-ID stamping and (optionally enforced) origin checks
+app.add_middleware(
+    SecurityMiddleware,
+    allowed_origins=settings.allowed_origins,
+    enforce_origin=settings.origin_validation_enabled,
+    origin_cache_size=settings.origin_cache_size
+)
+
+# CORS configuration. The last middleware added is the outermost, so CORS
+# headers also reach the 403/503/429 responses produced by the middleware
+# above and preflights are answered before any of them run
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allow ALL origins temporarily for testing
     allow_credentials=False,  # Must be False when using wildcard
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "X-Request-ID"],
 )
 
-# Temporarily disable security middleware to test CORS
-# app.add_middleware(SecurityMiddleware, allowed_origins=settings.allowed_origins)
-
 # Services are now managed by the dependency injection container
 
 
-@app.post("/v1/realtime/token", response_model=TokenResponse)
-# @limiter.limit("10/minute")  # Temporarily disabled for testing
-async def create_realtime_token(
-    request: Request,
-    token_request: TokenRequest
-):
+def _inline_schema(model) -> dict:
+    """JSON schema for a model with its $defs inlined (for openapi_extra)"""
+    schema = model.model_json_schema()
+    definitions = schema.pop("$defs", {})
+    
+    def resolve(node):
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if ref:
+                return resolve(definitions[ref.rsplit("/", 1)[-1]])
+            return {key: resolve(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [resolve(item) for item in node]
+        return node
+    
+    return resolve(schema)
+
+
+
+async def _ensure_ready(request_id: str) -> None:
+    """Initialize the container on a cold instance, as a structured 503 if that fails"""
+    if container.is_ready:
+        return
+    logger.info("Waiting for container on first request", request_id=request_id)
+    try:
+        await container.ready()
+    except Exception as e:
+        # The failed attempt was torn down, so the next request initializes afresh
+        logger.error("Container initialization failed", request_id=request_id, error=str(e), exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": {
+                    "code": ErrorCode.SERVICE_UNAVAILABLE.value,
+                    "message": "Service failed to initialize, please retry",
+                    "details": {"error": str(e)}
+                },
+                "request_id": request_id,
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            },
+            headers={"Retry-After": "1"}
+        )
+
+
+_MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+def _idempotency_key(request: Request, endpoint: str, request_id: str) -> Optional[str]:
+    """Store key for the request's Idempotency-Key header, scoped to endpoint and client"""
+    key = request.headers.get("idempotency-key")
+    if key is None:
+        return None
+    if not 0 < len(key) <= _MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": {
+                    "code": ErrorCode.INVALID_FIELD_VALUE.value,
+                    "message": f"Idempotency-Key must be 1-{_MAX_IDEMPOTENCY_KEY_LENGTH} characters",
+                    "details": {"header": "Idempotency-Key"}
+                },
+                "request_id": request_id,
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }
+        )
+    return f"{endpoint}:{client_key(request, settings.rate_limit_key)}:{key}"
+
+
+def _idempotency_conflict(request_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail={
+            "error": {
+                "code": ErrorCode.INVALID_REQUEST.value,
+                "message": "Idempotency-Key was already used with a different request body",
+                "details": {"header": "Idempotency-Key"}
+            },
+            "request_id": request_id,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    )
+
+@app.post(
+    "/v1/realtime/token",
+    response_model=TokenResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _inline_schema(TokenRequest)}}
+        }
+    }
+)
+async def create_realtime_token(request: Request):
     """Generate ephemeral OpenAI Realtime API token"""
     request_id = getattr(request.state, 'request_id', 'unknown')
+    trace = start_trace()
+    
+    # Ensure container is initialized (for Vercel serverless)
+    await _ensure_ready(request_id)
+    
+    idempotency_key = _idempotency_key(request, "token", request_id)
     
-    logger.info("Token generation request received", request_id=request_id, token_request=token_request.dict())
+    # Retries of a call the store already holds join or replay it for free
+    if settings.rate_limit_enabled and not (idempotency_key and idempotency_key in container.idempotency):
+        decision = await container.rate_limiter.acquire(client_key(request, settings.rate_limit_key))
+        if not decision.allowed:
+            retry_after = max(1, math.ceil(decision.retry_after))
+            logger.warning("Rate limit exceeded", request_id=request_id, retry_after=retry_after)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded. Please try again later.",
+                headers={"Retry-After": str(retry_after)}
+            )
+    
+    # Body is validated here rather than by FastAPI so the stage can be timed
+    body = await request.body()
+    with span("validation"):
+        digests = container.body_digests
+        prepared = digests.get(body) if digests else None
+        if prepared is None:
+            try:
+                token_request = TokenRequest.model_validate_json(body)
+            except ValidationError as e:
+                raise RequestValidationError(
+                    [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+                )
+            prepared = container.token_service.prepare(token_request)
+            if digests:
+                digests.put(body, prepared)
+        token_request = prepared.request
+    request.state.canonical = prepared.canonical
+    
+    logger.info("Token generation request received",
+               request_id=request_id,
+               voice=token_request.voice.value,
+               difficulty=token_request.difficulty.value)
+    
+    async def mint():
+        # Generate token using service from container
+        token_response = await container.token_service.generate_token(
+            token_request, request_id, origin=client_key(request, "origin"), prepared=prepared
+        )
+        with span("serialization"):
+            content = token_response.model_dump_json()
+        request.state.minted = "upstream" in trace.durations()
+        return content, request.state.minted
     
     try:
-        # Ensure container is initialized (for Vercel serverless)
-        if not container._initialized:
-            logger.info("Initializing container on first request", request_id=request_id)
-            await container.initialize()
+        if idempotency_key:
+            content, replayed = await container.idempotency.run(idempotency_key, body, mint)
+        else:
+            content, _ = await mint()
+            replayed = False
         
-        # Generate token using service from container
-        logger.info("About to call container.token_service.generate_token", request_id=request_id)
-        token_response = await container.token_service.generate_token(token_request, request_id)
-        logger.info("Token generation successful", request_id=request_id, token_response=token_response.dict())
+        response = Response(content=content, media_type="application/json")
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        
+        if settings.metrics_enabled:
+            container.voice_monitoring.record_stage_timings(trace.durations())
+        if settings.server_timing_enabled:
+            response.headers["Server-Timing"] = trace.server_timing()
         
-        return token_response
+        return response
         
+    except UpstreamQueueRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": {
+                    "code": ErrorCode.SERVICE_UNAVAILABLE.value,
+                    "message": "Upstream capacity exhausted for this client, please retry",
+                    "details": {"reason": e.reason}
+                },
+                "request_id": request_id,
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            },
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        )
+    except LoadShedRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": {
+                    "code": ErrorCode.SERVICE_UNAVAILABLE.value,
+                    "message": "Service is shedding load, please retry later",
+                    "details": {"priority": e.priority}
+                },
+                "request_id": request_id,
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            },
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        )
+    except IdempotencyConflict:
+        raise _idempotency_conflict(request_id)
     except ValueError as e:
         logger.error("Invalid request", request_id=request_id, error=str(e))
         raise HTTPException(
@@ -144,21 +360,77 @@ async def create_realtime_token(
         )
 
 
+
+@app.get("/v1/realtime/token/stream")
+async def stream_realtime_tokens(request: Request):
+    """Server-sent events carrying a fresh token shortly before the current one expires
+    
+    Query parameters are the fields of the token request body. Each ``token``
+    event's data is a token response and its id the session ID, so a
+    reconnect with ``Last-Event-ID`` only receives tokens it has not seen.
+    """
+    request_id = getattr(request.state, 'request_id', 'unknown')
+    
+    await _ensure_ready(request_id)
+    
+    if settings.rate_limit_enabled:
+        decision = await container.rate_limiter.acquire(client_key(request, settings.rate_limit_key))
+        if not decision.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded. Please try again later.",
+                headers={"Retry-After": str(max(1, math.ceil(decision.retry_after)))}
+            )
+    
+    try:
+        token_request = TokenRequest.model_validate(dict(request.query_params))
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("query", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+    
+    try:
+        stream = container.token_stream.subscribe(
+            token_request,
+            origin=client_key(request, "origin"),
+            last_event_id=request.headers.get("last-event-id")
+        )
+    except TokenStreamFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": {
+                    "code": ErrorCode.SERVICE_UNAVAILABLE.value,
+                    "message": "Token stream capacity reached, please retry later",
+                    "details": {}
+                },
+                "request_id": request_id,
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            },
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        )
+    
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/healthz", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (served from the background prober's cached state)"""
+    openai_status = "unknown"
+    openai_rtt_ms = openai_last_success = None
     try:
         # Ensure container is initialized (for Vercel serverless)
-        if not container._initialized:
-            logger.info("Initializing container for health check")
-            await container.initialize()
+        if not container.is_ready:
+            logger.info("Waiting for container for health check")
+            await container.ready()
         
-        # Test OpenAI API connectivity
-        openai_connected = await container.token_service.test_openai_connectivity()
-        openai_status = "connected" if openai_connected else "disconnected"
-        
-        # Clean up expired cache entries
-        container.cache.cleanup_expired()
+        probe = container.health_prober.get_state()
+        openai_status = probe["status"]
+        openai_rtt_ms = probe["rtt_ms"]
+        openai_last_success = probe["last_success"]
         
     except Exception as e:
         logger.warning("Health check failed", error=str(e))
@@ -168,12 +440,43 @@ async def health_check():
         status="healthy",
         timestamp=datetime.utcnow().isoformat() + "Z",
         version=settings.app_version,
-        openai_status=openai_status
+        openai_status=openai_status,
+        openai_rtt_ms=openai_rtt_ms,
+        openai_last_success=openai_last_success
+    )
+
+
+@app.get("/livez")
+async def liveness_check():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive", "timestamp": datetime.utcnow().isoformat() + "Z"}
+
+
+@app.get("/readyz")
+async def readiness_check():
+    """Readiness probe: services initialized and upstream not persistently failing"""
+    checks = {"container": container.is_ready, "upstream": None}
+    if container.is_ready:
+        checks["upstream"] = container.health_prober.get_state()
+    
+    ready = checks["container"] and checks["upstream"]["healthy"]
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "checks": checks,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
     )
 
+
 @app.get("/debug")
-async def debug_info():
+async def debug_info(request: Request):
     """Debug endpoint to check environment variables"""
+    return precomputed.respond(request, "debug", _debug_payload)
+
+
+def _debug_payload() -> dict:
     return {
         "openai_api_key_set": bool(settings.openai_api_key),
         "openai_api_key_length": len(settings.openai_api_key) if settings.openai_api_key else 0,
@@ -192,8 +495,12 @@ async def debug_info():
 
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Root endpoint with service information"""
+    return precomputed.respond(request, "root", _root_payload, max_age=settings.response_snapshot_interval)
+
+
+def _root_payload() -> dict:
     return {
         "service": settings.app_name,
         "version": settings.app_version,
@@ -201,9 +508,14 @@ async def root():
         "endpoints": {
             "token_generation": "/v1/realtime/token",
             "health_check": "/healthz",
+            "liveness": "/livez",
+            "readiness": "/readyz",
             "voice_config": "/v1/voice/config",
             "voice_testing": "/v1/voice/test",
             "voice_monitoring": "/v1/voice/monitoring",
+            "voice_events": "/v1/voice/events",
+            "voice_audio": "/v1/voice/audio/{session_id}",
+            "voice_convert": "/v1/voice/convert",
             "documentation": "/docs"
         },
         "cache_stats": container.cache.get_stats()
@@ -211,15 +523,16 @@ async def root():
 
 
 @app.get("/v1/voice/config")
-async def get_voice_configuration():
+async def get_voice_configuration(request: Request):
     """Get comprehensive voice configuration information"""
     try:
-        voice_info = container.token_service.get_voice_configuration_info()
-        return {
+        # Rebuilt only when the voice configuration is reloaded
+        return precomputed.respond(request, "voice_config", lambda: {
             "status": "success",
-            "voice_configuration": voice_info,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
+            "voice_configuration": container.token_service.get_voice_configuration_info(),
+            # When this payload was built, not when it was served
+            "generated_at": datetime.utcnow().isoformat() + "Z"
+        })
     except Exception as e:
         logger.error("Failed to get voice configuration", error=str(e))
         raise HTTPException(
@@ -236,15 +549,14 @@ async def get_voice_configuration():
 
 
 @app.get("/v1/voice/test")
-async def get_voice_testing_info():
+async def get_voice_testing_info(request: Request):
     """Get voice testing endpoint information"""
     try:
-        testing_info = container.token_service.get_voice_testing_endpoints()
-        return {
+        return precomputed.respond(request, "voice_test", lambda: {
             "status": "success",
-            "voice_testing_endpoints": testing_info,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
+            "voice_testing_endpoints": container.token_service.get_voice_testing_endpoints(),
+            "generated_at": datetime.utcnow().isoformat() + "Z"
+        })
     except Exception as e:
         logger.error("Failed to get voice testing info", error=str(e))
         raise HTTPException(
@@ -310,22 +622,53 @@ async def test_voice_quality(request: Request, voice_type: str):
         )
 
 
+def _parse_since(value: str) -> float:
+    """Epoch seconds from an ISO 8601 time or a number of epoch seconds"""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    # Naive times are local, like the recorded metric timestamps
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
 @app.get("/v1/voice/monitoring")
-async def get_voice_monitoring():
-    """Get voice monitoring and performance metrics"""
+async def get_voice_monitoring(
+    request: Request,
+    since: Optional[str] = Query(None, description="Only metrics recorded after this ISO 8601 time or epoch seconds"),
+    voice: Optional[str] = Query(None, description="Only metrics for this voice type"),
+    offset: int = Query(0, ge=0, description="Skip this many of the newest matching metrics"),
+    limit: int = Query(50, ge=1, le=settings.monitoring_page_max, description="Metrics per page")
+):
+    """Get voice monitoring and performance metrics
+    
+    Served from the latest background snapshot, so figures can lag live
+    state by up to MONITORING_SNAPSHOT_INTERVAL seconds.
+    """
+    request_id = getattr(request.state, 'request_id', 'unknown')
     try:
-        monitoring_data = {
-            "performance_stats": container.voice_monitoring.get_performance_stats(),
-            "voice_performance_by_type": container.voice_monitoring.get_voice_performance_by_type(),
-            "health_status": container.voice_monitoring.get_health_status(),
-            "recent_metrics": container.voice_monitoring.get_recent_metrics(limit=50)
-        }
-        
-        return {
-            "status": "success",
-            "voice_monitoring": monitoring_data,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
+        since_ts = _parse_since(since) if since is not None else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": {
+                    "code": ErrorCode.INVALID_FIELD_VALUE.value,
+                    "message": "since must be an ISO 8601 time or epoch seconds",
+                    "details": {"since": since}
+                },
+                "request_id": request_id,
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }
+        )
+    
+    try:
+        snapshot = container.monitoring_snapshots.latest()
+        build = partial(_monitoring_payload, snapshot, since_ts, voice, offset, limit)
+        if since is None and voice is None and offset == 0 and limit == 50:
+            # The extension's default view: encoded once per snapshot
+            return precomputed.respond(request, "voice_monitoring", build, version=snapshot.generation)
+        return build()
     except Exception as e:
         logger.error("Failed to get voice monitoring data", error=str(e))
         raise HTTPException(
@@ -341,6 +684,328 @@ async def get_voice_monitoring():
         )
 
 
+def _monitoring_payload(
+    snapshot: MonitoringSnapshot,
+    since: Optional[float],
+    voice: Optional[str],
+    offset: int,
+    limit: int
+) -> dict:
+    recent_metrics, total = snapshot.query(since=since, voice=voice, offset=offset, limit=limit)
+    returned = offset + len(recent_metrics)
+    
+    return {
+        "status": "success",
+        "voice_monitoring": {**snapshot.summary, "recent_metrics": recent_metrics},
+        "pagination": {
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "next_offset": returned if returned < total else None
+        },
+        "snapshot": {
+            "generation": snapshot.generation,
+            "built_at": datetime.utcfromtimestamp(snapshot.built_at).isoformat() + "Z"
+        },
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
+
+
+@app.post("/v1/voice/events", status_code=status.HTTP_202_ACCEPTED)
+async def ingest_voice_events(request: Request, response: Response, batch: VoiceEventBatch):
+    """Accept a batch of client voice session events
+    
+    Events are queued and applied to voice monitoring in the background, so
+    they show up in /v1/voice/monitoring after the next snapshot. A retried
+    batch with the same Idempotency-Key is acknowledged without being queued
+    again.
+    """
+    request_id = getattr(request.state, 'request_id', 'unknown')
+    idempotency_key = _idempotency_key(request, "events", request_id)
+    
+    async def submit():
+        container.event_ingestor.submit(batch)
+        return {
+            "status": "accepted",
+            "accepted": len(batch.events),
+            "request_id": request_id
+        }, False
+    
+    try:
+        if idempotency_key:
+            result, replayed = await container.idempotency.run(idempotency_key, await request.body(), submit)
+        else:
+            result, _ = await submit()
+            replayed = False
+    except IdempotencyConflict:
+        raise _idempotency_conflict(request_id)
+    except EventQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": {
+                    "code": ErrorCode.SERVICE_UNAVAILABLE.value,
+                    "message": "Event queue is full, please retry later",
+                    "details": {"events": len(batch.events)}
+                },
+                "request_id": request_id,
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            },
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        )
+    
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
+class _AudioTooLong(Exception):
+    """A streamed audio body went past its size limit"""
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body is produced while the request body is read
+
+    StreamingResponse watches for disconnects with its own ``receive()``
+    loop, which takes request body messages away from the iterator still
+    reading them and truncates the input. Here only the iterator receives;
+    ``request.stream()`` raises on a disconnect while the body is read.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _invalid_audio(request_id: str, status_code: int, message: str, details: dict) -> HTTPException:
+    return HTTPException(
+        status_code=status_code,
+        detail={
+            "error": {
+                "code": ErrorCode.INVALID_REQUEST.value,
+                "message": message,
+                "details": details
+            },
+            "request_id": request_id,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    )
+
+
+@app.post("/v1/voice/audio/{session_id}")
+async def analyze_session_audio(request: Request, session_id: str):
+    """Score a clip of session audio and record it as the session's quality
+    
+    The body is raw little-endian PCM16 at AUDIO_SAMPLE_RATE with
+    AUDIO_CHANNELS channels, at most MAX_AUDIO_DURATION seconds long.
+    """
+    request_id = getattr(request.state, 'request_id', 'unknown')
+    max_bytes = settings.max_audio_duration * settings.audio_sample_rate * settings.audio_channels * 2
+    
+    if not 0 < len(session_id) <= 128:
+        raise _invalid_audio(
+            request_id,
+            status.HTTP_400_BAD_REQUEST,
+            "Invalid session ID",
+            {"session_id": session_id[:128]}
+        )
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise _invalid_audio(
+            request_id,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "Audio clip too long",
+            {"max_bytes": max_bytes}
+        )
+    
+    body = await request.body()
+    if len(body) > max_bytes:
+        raise _invalid_audio(
+            request_id,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "Audio clip too long",
+            {"max_bytes": max_bytes}
+        )
+    if len(body) < 2 * settings.audio_channels:
+        raise _invalid_audio(
+            request_id,
+            status.HTTP_400_BAD_REQUEST,
+            "Audio clip is empty",
+            {"bytes": len(body)}
+        )
+    
+    # NumPy is only imported once audio is actually submitted
+    from app.services.audio_quality import analyze_pcm16
+    
+    analysis = await asyncio.to_thread(
+        analyze_pcm16, body, settings.audio_sample_rate, settings.audio_channels
+    )
+    
+    # Through the event queue so it lands in order with the session's other events
+    try:
+        container.event_ingestor.submit(VoiceEventBatch(
+            session_id=session_id,
+            events=[(VoiceEventKind.QUALITY, analysis.quality_score)]
+        ))
+        recorded = True
+    except EventQueueFull:
+        recorded = False
+    
+    return {
+        "status": "success",
+        "session_id": session_id,
+        "audio_analysis": analysis.to_dict(),
+        "meets_quality_threshold": analysis.quality_score >= settings.voice_quality_threshold,
+        "recorded": recorded,
+        "request_id": request_id,
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
+
+
+@app.post("/v1/voice/convert")
+async def convert_audio(
+    request: Request,
+    input_format: Literal["pcm", "wav"] = Query("pcm", description="Request body format"),
+    output_format: Literal["pcm", "wav"] = Query("pcm", description="Response body format"),
+    sample_rate: int = Query(settings.audio_sample_rate, ge=8000, le=48000, description="Sample rate of PCM input"),
+    channels: int = Query(settings.audio_channels, ge=1, le=8, description="Channel count of PCM input"),
+    target_rate: Optional[int] = Query(None, ge=8000, le=48000, description="Resample to this rate"),
+    trim_silence: bool = Query(False, description="Drop silence the session's server VAD would not need"),
+    enable_interruptions: bool = Query(True, description="Turn detection profile to mirror when trimming")
+):
+    """Convert a PCM16 or WAV body to mono PCM16 or WAV, optionally resampled
+    
+    The body is read, converted and written back in VOICE_STREAMING_BUFFER_SIZE
+    chunks, so memory use does not grow with clip length. With trim_silence,
+    silence is cut using the same threshold, prefix padding and silence
+    duration as the session's turn detection.
+    """
+    request_id = getattr(request.state, 'request_id', 'unknown')
+    max_bytes = settings.max_audio_duration * 48000 * 8 * 2
+    
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise _invalid_audio(
+            request_id,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "Audio stream too long",
+            {"max_bytes": max_bytes}
+        )
+    
+    # NumPy is only imported once audio is actually submitted
+    from app.services.audio_convert import AudioConverter, aconvert_stream
+    from app.services.voice_activity import VadConfig
+    
+    async def limited_body():
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes:
+                # Without Content-Length the overflow shows up mid-stream
+                raise _AudioTooLong()
+            yield chunk
+    
+    try:
+        converter = AudioConverter(
+            input_format=input_format,
+            output_format=output_format,
+            sample_rate=sample_rate,
+            channels=channels,
+            target_rate=target_rate,
+            vad=VadConfig.from_turn_detection(build_turn_detection(enable_interruptions)) if trim_silence else None
+        )
+    except ValueError as e:
+        raise _invalid_audio(
+            request_id,
+            status.HTTP_400_BAD_REQUEST,
+            "Invalid audio stream",
+            {"error": str(e)}
+        )
+    stream = aconvert_stream(limited_body(), chunk_size=settings.voice_streaming_buffer_size, converter=converter)
+    # Pull the first chunk here so a malformed WAV header is still a 400
+    try:
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    except _AudioTooLong:
+        raise _invalid_audio(
+            request_id,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "Audio stream too long",
+            {"max_bytes": max_bytes}
+        )
+    except ValueError as e:
+        raise _invalid_audio(
+            request_id,
+            status.HTTP_400_BAD_REQUEST,
+            "Invalid audio stream",
+            {"error": str(e)}
+        )
+    
+    async def body():
+        if first:
+            yield first
+        try:
+            async for chunk in stream:
+                yield chunk
+        except _AudioTooLong:
+            # The 200 is already sent; aborting the response is the only way
+            # left to tell the client its audio was not fully converted
+            logger.warning("Audio stream too long, aborting response", request_id=request_id, max_bytes=max_bytes)
+            raise
+        if converter.gate is not None:
+            logger.info("Silence trimmed", request_id=request_id, **converter.gate.get_stats())
+    
+    return _DuplexStreamingResponse(
+        body(),
+        media_type="audio/wav" if output_format == "wav" else "application/octet-stream"
+    )
+
+
+
+# Subprotocol browsers use to carry the ephemeral key, since they cannot set headers
+_REALTIME_KEY_PROTOCOL = "openai-insecure-api-key."
+
+
+@app.websocket("/v1/realtime/relay")
+async def realtime_relay(
+    websocket: WebSocket,
+    model: str = Query(default=settings.realtime_model),
+    voice: VoiceType = Query(default=VoiceType.VERSE),
+    difficulty: DifficultyLevel = Query(default=DifficultyLevel.EASY),
+    token: Optional[str] = Query(default=None)
+):
+    """Relay a Realtime session through this service
+    
+    The client authenticates with the ephemeral key from /v1/realtime/token,
+    either as ``?token=`` or the ``openai-insecure-api-key.<key>`` subprotocol,
+    and then speaks the Realtime protocol exactly as it would upstream.
+    """
+    relay = container.realtime_relay
+    protocols = websocket.scope.get("subprotocols", [])
+    for protocol in protocols:
+        if protocol.startswith(_REALTIME_KEY_PROTOCOL):
+            token = token or protocol[len(_REALTIME_KEY_PROTOCOL):]
+    if relay is None or not token:
+        await websocket.close(code=1008)
+        return
+    
+    await relay.serve(
+        websocket,
+        token=token,
+        model=model,
+        voice=voice.value,
+        difficulty=difficulty.value,
+        subprotocol="realtime" if "realtime" in protocols else None
+    )
+
+# Under uvicorn the app is imported inside the running loop, so initialization
+# can start now and overlap with the server's own startup
+if settings.prewarm_enabled:
+    container.start_prewarm()
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
@@ -361,6 +1026,7 @@ async def shutdown_event():
     await container.cleanup()
     
     logger.info("Shutdown complete")
+    shutdown_logging()
 
 
 if __name__ == "__main__":
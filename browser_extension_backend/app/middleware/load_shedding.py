@@ -0,0 +1,69 @@
+"""
+Load shedding middleware for low-priority endpoints
+"""
+
+import json
+import math
+from datetime import datetime
+from typing import Callable, Optional, Sequence
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.models.errors import ErrorCode
+from app.services.load_shedder import LoadShedder, LoadShedRejected
+
+
+class LoadSheddingMiddleware:
+    """Refuse low-priority paths with 503 while the service is under pressure
+
+    ``get_shedder`` returns ``None`` until the service container is
+    initialized, in which case every request is admitted.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        get_shedder: Callable[[], Optional[LoadShedder]],
+        low_priority_prefixes: Sequence[str]
+    ):
+        self.app = app
+        self.get_shedder = get_shedder
+        self.low_priority_prefixes = tuple(low_priority_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Preflights are never shed: a failed preflight hides the 503 from the extension
+        if (
+            scope["type"] == "http"
+            and scope["method"] != "OPTIONS"
+            and scope["path"].startswith(self.low_priority_prefixes)
+        ):
+            shedder = self.get_shedder()
+            if shedder is not None:
+                try:
+                    shedder.admit("low")
+                except LoadShedRejected as e:
+                    await self._reject(scope, send, e)
+                    return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(scope: Scope, send: Send, exc: LoadShedRejected) -> None:
+        body = json.dumps({
+            "error": {
+                "code": ErrorCode.SERVICE_UNAVAILABLE.value,
+                "message": "Service is shedding load, please retry later",
+                "details": {"priority": exc.priority}
+            },
+            "request_id": scope.get("state", {}).get("request_id", "unknown"),
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(exc.retry_after))).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -2,120 +2,157 @@
 Security middleware for origin validation and request tracking
 """
 
-import uuid
+import json
 import re
-from typing import List, Optional
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
 import structlog
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.request_context import bind_request_id, new_request_id, reset_request_id
+from app.models.errors import ErrorCode
 
 logger = structlog.get_logger(__name__)
 
 
-class SecurityMiddleware(BaseHTTPMiddleware):
-    """Enhanced security middleware with origin validation and request tracking"""
-    
-    def __init__(self, app, allowed_origins: List[str]):
-        super().__init__(app)
+class SecurityMiddleware:
+    """Pure ASGI middleware with request IDs and memoized origin validation
+
+    Unlike ``BaseHTTPMiddleware`` this adds no extra task or response
+    streaming wrapper; it only inspects the scope and decorates the
+    ``http.response.start`` message.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        allowed_origins: List[str],
+        enforce_origin: bool = False,
+        origin_cache_size: int = 1024
+    ):
+        self.app = app
         self.allowed_origins = allowed_origins
-        self._compile_origin_patterns()
-    
-    def _compile_origin_patterns(self):
-        """Compile origin patterns for validation"""
-        self.compiled_patterns = []
-        for origin in self.allowed_origins:
-            if origin.startswith("chrome-extension://"):
-                # Extract extension ID and create pattern
-                ext_id = origin.split("://")[1]
-                pattern = f"chrome-extension://{ext_id}"
-                self.compiled_patterns.append(re.compile(re.escape(pattern)))
-            elif origin.startswith("https://"):
-                # For HTTPS origins, validate exact match or subdomain
-                domain = origin.replace("https://", "")
-                pattern = f"https://(.*\\.)?{re.escape(domain)}"
-                self.compiled_patterns.append(re.compile(pattern))
+        self.enforce_origin = enforce_origin
+        self.origin_pattern = self._compile_origin_pattern(allowed_origins)
+        self._is_allowed = lru_cache(maxsize=origin_cache_size)(self._check_origin)
+
+    @staticmethod
+    def _compile_origin_pattern(allowed_origins: List[str]) -> Optional[re.Pattern]:
+        """Compile every allowed origin into one anchored alternation"""
+        alternatives = []
+        for origin in allowed_origins:
+            if origin.startswith("https://"):
+                # Exact host or any subdomain of it
+                domain = origin[len("https://"):]
+                alternatives.append(f"https://(?:[^/]*\\.)?{re.escape(domain)}")
             else:
-                # Exact match for other origins
-                self.compiled_patterns.append(re.compile(re.escape(origin)))
-    
-    def _validate_origin(self, request: Request) -> bool:
-        """Enhanced origin validation"""
-        origin = request.headers.get("origin")
-        referer = request.headers.get("referer")
-        user_agent = request.headers.get("user-agent", "")
-        
-        # Check origin header
-        if origin:
-            for pattern in self.compiled_patterns:
-                if pattern.match(origin):
-                    return True
-        
-        # Fallback to referer header for same-origin requests
-        if referer:
-            for pattern in self.compiled_patterns:
-                if pattern.match(referer):
-                    return True
-        
-        # Allow Chrome extension requests (they often don't send Origin headers)
-        if origin and origin.startswith("chrome-extension://"):
-            logger.info("Allowing Chrome extension request", 
-                       origin=origin,
-                       path=request.url.path)
+                # Exact match for chrome-extension:// and other origins
+                alternatives.append(re.escape(origin))
+
+        if not alternatives:
+            return None
+        return re.compile("|".join(f"(?:{alternative})" for alternative in alternatives))
+
+    def _matches(self, origin: Optional[str]) -> bool:
+        return bool(origin and self.origin_pattern and self.origin_pattern.fullmatch(origin))
+
+    def _check_origin(self, origin: Optional[str], referer_origin: Optional[str]) -> bool:
+        """Origin decision for an (Origin, Referer origin) pair; memoized by the LRU"""
+        if self._matches(origin) or self._matches(referer_origin):
             return True
-        
-        # Allow requests without origin (Chrome extensions, Postman, etc.)
-        if not origin:
-            logger.info("Allowing no-origin request", 
-                       referer=referer,
-                       user_agent=user_agent,
-                       path=request.url.path)
+
+        # Chrome extensions and tools like Postman often send no usable Origin
+        if not origin or origin.startswith("chrome-extension://"):
             return True
-        
+
         return False
-    
-    async def dispatch(self, request: Request, call_next):
-        """Process request with security validation and tracking"""
-        # Generate request ID
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
-        # Add request ID to request state for downstream services
-        # Note: We don't modify headers directly as it's fragile
-        # Instead, we rely on request.state for internal tracking
-        
-        # Log request details for debugging (origin validation now handled by CORS)
-        if request.method == "POST" and request.url.path == "/v1/realtime/token":
-            logger.info("Token request received", 
-                       request_id=request_id,
-                       origin=request.headers.get("origin"),
-                       referer=request.headers.get("referer"),
-                       user_agent=request.headers.get("user-agent"),
-                       path=request.url.path)
-        
-        # Log request
-        logger.info("Request started",
-                   request_id=request_id,
-                   method=request.method,
-                   path=request.url.path,
-                   origin=request.headers.get("origin"),
-                   user_agent=request.headers.get("user-agent"))
-        
+
+    @staticmethod
+    def _origin_headers(scope: Scope) -> Tuple[Optional[str], Optional[str]]:
+        origin = referer = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value.decode("latin-1")
+            elif name == b"referer":
+                referer = value.decode("latin-1")
+
+        referer_origin = None
+        if referer:
+            parts = urlsplit(referer)
+            referer_origin = f"{parts.scheme}://{parts.netloc}"
+        return origin, referer_origin
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "websocket":
+            if self.enforce_origin and not self._is_allowed(*self._origin_headers(scope)):
+                logger.warning("Rejected WebSocket from unauthorized origin", path=scope["path"])
+                # Closing before accept makes the server answer the handshake with 403
+                await send({"type": "websocket.close", "code": 1008})
+                return
+            await self.app(scope, receive, send)
+            return
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = new_request_id()
+        scope.setdefault("state", {})["request_id"] = request_id
+        request_id_header = (b"x-request-id", request_id.encode("latin-1"))
+
+        if self.enforce_origin and scope["method"] != "OPTIONS":
+            origin, referer_origin = self._origin_headers(scope)
+            if not self._is_allowed(origin, referer_origin):
+                logger.warning("Rejected request from unauthorized origin",
+                               request_id=request_id,
+                               origin=origin,
+                               path=scope["path"])
+                await self._reject(send, request_id_header, request_id)
+                return
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Replaces any X-Request-ID the app set, e.g. in the error handlers
+                headers = [header for header in message.get("headers", []) if header[0].lower() != b"x-request-id"]
+                message["headers"] = [*headers, request_id_header]
+            await send(message)
+
+        token = bind_request_id(request_id)
         try:
-            response = await call_next(request)
-            
-            # Add request ID to response headers
-            response.headers["X-Request-ID"] = request_id
-            
-            logger.info("Request completed",
-                       request_id=request_id,
-                       status_code=response.status_code)
-            
-            return response
-            
+            await self.app(scope, receive, send_with_request_id)
         except Exception as e:
             logger.error("Request failed",
-                        request_id=request_id,
-                        error=str(e),
-                        error_type=type(e).__name__)
+                         request_id=request_id,
+                         error=str(e),
+                         error_type=type(e).__name__)
             raise
+        finally:
+            reset_request_id(token)
+
+    @staticmethod
+    async def _reject(send: Send, request_id_header: Tuple[bytes, bytes], request_id: str) -> None:
+        body = json.dumps({
+            "error": {
+                "code": ErrorCode.UNAUTHORIZED_ORIGIN.value,
+                "message": "Origin not allowed",
+                "details": {}
+            },
+            "request_id": request_id,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 403,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                request_id_header
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def origin_cache_info(self):
+        """Hit/miss statistics of the origin decision cache"""
+        return self._is_allowed.cache_info()
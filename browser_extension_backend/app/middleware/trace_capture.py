@@ -0,0 +1,53 @@
+"""
+Trace capture middleware for token requests
+"""
+
+import time
+from typing import Callable, Optional, Sequence
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.trace_capture import TraceRecorder
+
+
+class TraceCaptureMiddleware:
+    """Hand every request to the captured paths to the trace recorder
+
+    ``get_recorder`` returns ``None`` while capture is disabled or the
+    service container is not initialized. The endpoint leaves the canonical
+    request and whether it minted a session on ``request.state``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        get_recorder: Callable[[], Optional[TraceRecorder]],
+        paths: Sequence[str] = ("/v1/realtime/token",)
+    ):
+        self.app = app
+        self.get_recorder = get_recorder
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        recorder = None
+        if scope["type"] == "http" and scope["path"] in self.paths:
+            recorder = self.get_recorder()
+        if recorder is None:
+            await self.app(scope, receive, send)
+            return
+
+        arrived_at = time.time()
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            recorder.record(Request(scope), arrived_at, status_code, (time.perf_counter() - started) * 1000)
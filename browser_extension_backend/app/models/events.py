@@ -0,0 +1,66 @@
+"""
+Pydantic models for batched client voice session events
+"""
+
+from pydantic import BaseModel, Field, field_validator
+from typing import Annotated, List, Tuple, Union
+from enum import Enum
+
+from app.models.token import DifficultyLevel, VoiceType
+
+MAX_EVENTS_PER_BATCH = 500
+MAX_CHUNK_BYTES = 16 * 1024 * 1024
+MAX_AUDIO_SECONDS = 24 * 3600
+
+
+class VoiceEventKind(str, Enum):
+    """Client-side voice session events"""
+    INTERRUPTION = "interruption"  # No value
+    AUDIO_CHUNK = "audio_chunk"    # Chunk size in bytes
+    QUALITY = "quality"            # Audio quality score, 0-1
+    SATISFACTION = "satisfaction"  # User satisfaction score, 0-1
+    END = "end"                    # Audio duration in seconds, if known
+
+
+# Accepted values per kind; one event outside its range rejects the batch
+EVENT_VALUE_RANGES = {
+    VoiceEventKind.AUDIO_CHUNK: (0, MAX_CHUNK_BYTES),
+    VoiceEventKind.QUALITY: (0.0, 1.0),
+    VoiceEventKind.SATISFACTION: (0.0, 1.0),
+    VoiceEventKind.END: (0.0, MAX_AUDIO_SECONDS),
+}
+
+# Events are compact arrays: ["interruption"] or ["audio_chunk", 4096]
+VoiceEvent = Union[
+    Tuple[VoiceEventKind],
+    Tuple[VoiceEventKind, Annotated[float, Field(allow_inf_nan=False)]]
+]
+
+
+class VoiceEventBatch(BaseModel):
+    """A batch of events for one Realtime session, in the order they happened"""
+    session_id: str = Field(..., min_length=1, max_length=128, description="Realtime session ID from the token response")
+    voice: VoiceType = Field(default=VoiceType.VERSE, description="Voice type used by the session")
+    difficulty: DifficultyLevel = Field(default=DifficultyLevel.EASY, description="Difficulty level used by the session")
+    events: List[VoiceEvent] = Field(..., min_length=1, max_length=MAX_EVENTS_PER_BATCH)
+    
+    @field_validator("events")
+    @classmethod
+    def check_event_values(cls, events: List[VoiceEvent]) -> List[VoiceEvent]:
+        for index, event in enumerate(events):
+            if len(event) < 2 or event[0] not in EVENT_VALUE_RANGES:
+                continue
+            low, high = EVENT_VALUE_RANGES[event[0]]
+            if not low <= event[1] <= high:
+                raise ValueError(f"events[{index}]: {event[0].value} must be between {low} and {high}")
+        return events
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "session_id": "sess_abc123",
+                "voice": "cedar",
+                "difficulty": "easy",
+                "events": [["audio_chunk", 4096], ["interruption"], ["quality", 0.92], ["end", 48.5]]
+            }
+        }
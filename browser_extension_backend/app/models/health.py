@@ -4,6 +4,7 @@ Pydantic models for health check responses
 
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Optional
 
 
 class HealthResponse(BaseModel):
@@ -12,6 +13,8 @@ class HealthResponse(BaseModel):
     timestamp: str = Field(..., description="Current timestamp")
     version: str = Field(..., description="Service version")
     openai_status: str = Field(..., description="OpenAI API status")
+    openai_rtt_ms: Optional[float] = Field(None, description="Round-trip time of the last connectivity probe")
+    openai_last_success: Optional[str] = Field(None, description="Time of the last successful connectivity probe")
 
     class Config:
         json_schema_extra = {
@@ -19,6 +22,8 @@ class HealthResponse(BaseModel):
                 "status": "healthy",
                 "timestamp": "2024-12-21T10:30:00Z",
                 "version": "1.0.0",
-                "openai_status": "connected"
+                "openai_status": "connected",
+                "openai_rtt_ms": 182.4,
+                "openai_last_success": "2024-12-21T10:29:45Z"
             }
         }
@@ -0,0 +1,334 @@
+"""
+Streaming PCM16 conversion: WAV framing, downmixing and resampling
+"""
+
+import struct
+from math import gcd
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Optional
+
+import numpy as np
+
+from app.services.voice_activity import VadConfig, VoiceActivityGate
+
+# RIFF/data sizes for a stream whose length is not known up front
+_STREAMING_SIZE = 0xFFFFFFFF
+_MAX_WAV_HEADER = 64 * 1024
+# Same bounds as the /v1/voice/convert query parameters
+_WAV_SAMPLE_RATES = range(8000, 48001)
+_WAV_CHANNELS = range(1, 9)
+
+
+def wav_header(sample_rate: int, channels: int = 1, data_size: Optional[int] = None) -> bytes:
+    """44-byte PCM16 WAV header; sizes are 0xFFFFFFFF when ``data_size`` is unknown"""
+    block_align = channels * 2
+    riff_size = _STREAMING_SIZE if data_size is None else 36 + data_size
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", riff_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * block_align, block_align, 16,
+        b"data", _STREAMING_SIZE if data_size is None else data_size
+    )
+
+
+def check_pcm16_format(audio_format: int, channels: int, sample_rate: int, bits: int) -> None:
+    """Raise ValueError unless a WAV fmt chunk describes PCM16 audio this service handles"""
+    if audio_format not in (1, 0xFFFE) or bits != 16:
+        raise ValueError(f"unsupported WAV encoding (format {audio_format}, {bits}-bit)")
+    if sample_rate not in _WAV_SAMPLE_RATES:
+        raise ValueError(f"unsupported WAV sample rate {sample_rate} Hz (8000-48000)")
+    if channels not in _WAV_CHANNELS:
+        raise ValueError(f"unsupported WAV channel count {channels} (1-8)")
+
+
+class WavParser:
+    """Strips a WAV header from a byte stream, reading the format on the way"""
+
+    def __init__(self):
+        self.sample_rate: Optional[int] = None
+        self.channels: Optional[int] = None
+        self._pending = bytearray()
+        self._in_data = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        if self._in_data:
+            return chunk
+        self._pending += chunk
+        buffer = self._pending
+        if len(buffer) >= 12 and (buffer[:4] != b"RIFF" or buffer[8:12] != b"WAVE"):
+            raise ValueError("not a RIFF/WAVE stream")
+
+        offset = 12
+        while offset + 8 <= len(buffer):
+            chunk_id, size = struct.unpack_from("<4sI", buffer, offset)
+            body = offset + 8
+            if chunk_id == b"data":
+                if self.sample_rate is None:
+                    raise ValueError("data chunk before fmt chunk")
+                self._in_data = True
+                data = bytes(buffer[body:])
+                self._pending = bytearray()
+                return data
+            if body + size > len(buffer):
+                break
+            if chunk_id == b"fmt ":
+                audio_format, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", buffer, body)
+                check_pcm16_format(audio_format, channels, sample_rate, bits)
+                self.sample_rate, self.channels = sample_rate, channels
+            offset = body + size + (size & 1)
+
+        if len(buffer) > _MAX_WAV_HEADER:
+            raise ValueError("WAV header too large")
+        return b""
+
+
+class Downmixer:
+    """Averages interleaved PCM16 channels to mono"""
+
+    def __init__(self, channels: int):
+        self.channels = channels
+        self._carry = b""
+
+    def feed(self, chunk: bytes) -> bytes:
+        if self._carry:
+            chunk = self._carry + chunk
+        usable = len(chunk) - len(chunk) % (2 * self.channels)
+        self._carry = chunk[usable:]
+        frames = np.frombuffer(chunk, dtype="<i2", count=usable // 2).reshape(-1, self.channels)
+        return np.rint(frames.mean(axis=1, dtype=np.float32)).astype("<i2").tobytes()
+
+    def flush(self) -> bytes:
+        # A trailing partial frame has no complete sample to average
+        self._carry = b""
+        return b""
+
+
+class Resampler:
+    """Rational-ratio polyphase resampler for mono PCM16 streams
+
+    A Kaiser-windowed sinc low-pass is split into ``up`` phases of
+    ``taps_per_phase`` taps. Each chunk computes its output with one strided
+    matrix-vector product per phase over a sliding window of the input,
+    keeping only the last ``taps_per_phase - 1`` input samples between
+    chunks, so memory is independent of stream length. Output is
+    delay-compensated and trimmed to ``ceil(n * up / down)`` samples on
+    ``flush()``.
+    """
+
+    def __init__(
+        self,
+        from_rate: int,
+        to_rate: int,
+        taps_per_phase: int = 32,
+        rolloff: float = 0.92,
+        beta: float = 8.6
+    ):
+        divisor = gcd(from_rate, to_rate)
+        self.up = to_rate // divisor
+        self.down = from_rate // divisor
+        self.taps = taps_per_phase
+
+        length = taps_per_phase * self.up
+        cutoff = 0.5 * rolloff / max(self.up, self.down)  # cycles per upsampled sample
+        # Centre the sinc on a multiple of ``down`` so the delay is a whole number of output samples
+        self._delay = int(round((length - 1) / 2 / self.down))
+        m = np.arange(length) - self._delay * self.down
+        window = np.i0(beta * np.sqrt(np.clip(1 - (m / np.abs(m).max()) ** 2, 0, None))) / np.i0(beta)
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * m) * window * self.up
+        # phases[p, k] = prototype[p + k * up], reversed to line up with input windows
+        self._phases = prototype.reshape(taps_per_phase, self.up).T[:, ::-1].astype(np.float32)
+
+        self._history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        self._base = -(taps_per_phase - 1)  # input index of _history[0]
+        self._next = 0                       # next output index
+        self._skip = self._delay
+        self._consumed = 0
+        self._produced = 0
+
+    def _run(self, samples: np.ndarray) -> np.ndarray:
+        buffer = np.concatenate((self._history, samples))
+        last = self._base + len(buffer) - 1
+        end = -(-(last + 1) * self.up // self.down)
+        n = np.arange(self._next, end, dtype=np.int64)
+        upsampled = n * self.down
+        starts = upsampled // self.up - (self.taps - 1) - self._base
+
+        windows = np.lib.stride_tricks.sliding_window_view(buffer, self.taps)
+        phases = upsampled % self.up
+        out = np.empty(len(n), dtype=np.float32)
+        # Every ``up``-th output uses the same phase and an input ``down`` samples
+        # further on, so each phase is one strided matrix-vector product
+        for r in range(min(self.up, len(n))):
+            count = (len(n) - r + self.up - 1) // self.up
+            start = starts[r]
+            rows = windows[start:start + (count - 1) * self.down + 1:self.down]
+            out[r::self.up] = rows @ self._phases[phases[r]]
+
+        next_input = end * self.down // self.up
+        keep_from = max(next_input - (self.taps - 1) - self._base, 0)
+        self._history = buffer[keep_from:]
+        self._base += keep_from
+        self._next = end
+
+        if self._skip:
+            dropped = min(self._skip, len(out))
+            out = out[dropped:]
+            self._skip -= dropped
+        return out
+
+    def _emit(self, out: np.ndarray, limit: Optional[int] = None) -> bytes:
+        if limit is not None:
+            out = out[:max(limit - self._produced, 0)]
+        self._produced += len(out)
+        return np.clip(np.rint(out), -32768, 32767).astype("<i2").tobytes()
+
+    def feed(self, chunk: bytes) -> bytes:
+        samples = np.frombuffer(chunk, dtype="<i2", count=len(chunk) // 2).astype(np.float32)
+        self._consumed += len(samples)
+        return self._emit(self._run(samples))
+
+    def flush(self) -> bytes:
+        """Push the filter tail through and trim to the exact output length"""
+        expected = -(-self._consumed * self.up // self.down)
+        tail = np.zeros(self._delay * self.down // self.up + 2, dtype=np.float32)
+        return self._emit(self._run(tail), limit=expected)
+
+
+class AudioConverter:
+    """Chain of streaming stages: WAV parsing, downmix, resample, silence
+    trimming, WAV framing
+
+    ``feed()`` and ``flush()`` return whatever output is ready; each stage
+    keeps at most one partial frame or filter history between calls.
+    """
+
+    def __init__(
+        self,
+        input_format: str = "pcm",
+        output_format: str = "pcm",
+        sample_rate: int = 24000,
+        channels: int = 1,
+        target_rate: Optional[int] = None,
+        mono: bool = True,
+        vad: Optional[VadConfig] = None
+    ):
+        if input_format not in ("pcm", "wav") or output_format not in ("pcm", "wav"):
+            raise ValueError("only pcm and wav are supported")
+        self.output_format = output_format
+        self.target_rate = target_rate
+        self.mono = mono
+        self.vad = vad
+        self.gate: Optional[VoiceActivityGate] = None
+        self._parser = WavParser() if input_format == "wav" else None
+        self._stages = None
+        self._header_sent = False
+        self._carry = b""
+        if self._parser is None:
+            self._configure(sample_rate, channels)
+
+    def _configure(self, sample_rate: int, channels: int) -> None:
+        stages = []
+        if self.mono and channels > 1:
+            stages.append(Downmixer(channels))
+            channels = 1
+        rate = sample_rate
+        if self.target_rate and self.target_rate != sample_rate:
+            if channels != 1:
+                raise ValueError("resampling needs mono input")
+            stages.append(Resampler(sample_rate, self.target_rate))
+            rate = self.target_rate
+        if self.vad is not None:
+            if channels != 1:
+                raise ValueError("silence trimming needs mono input")
+            self.gate = VoiceActivityGate(rate, self.vad)
+            stages.append(self.gate)
+        self._stages = stages
+        self.output_rate, self.output_channels = rate, channels
+
+    def _header(self) -> bytes:
+        if self.output_format != "wav" or self._header_sent:
+            return b""
+        self._header_sent = True
+        return wav_header(self.output_rate, self.output_channels)
+
+    def feed(self, chunk: bytes) -> bytes:
+        if self._parser is not None:
+            chunk = self._parser.feed(chunk)
+            if self._stages is None:
+                if self._parser.sample_rate is None:
+                    return b""
+                self._configure(self._parser.sample_rate, self._parser.channels)
+        if self._carry:
+            chunk = self._carry + chunk
+        # Stages work on whole samples
+        usable = len(chunk) - len(chunk) % 2
+        chunk, self._carry = chunk[:usable], chunk[usable:]
+        for stage in self._stages:
+            chunk = stage.feed(chunk)
+        return self._header() + chunk
+
+    def flush(self) -> bytes:
+        if self._stages is None:
+            raise ValueError("stream ended before WAV audio data")
+        out = b""
+        for stage in self._stages:
+            if out:
+                out = stage.feed(out)
+            out += stage.flush()
+        return self._header() + out
+
+
+def rechunk(chunks: Iterable[bytes], chunk_size: int) -> Iterator[bytes]:
+    """Regroup a byte stream into ``chunk_size`` pieces (the last may be shorter)"""
+    pending = bytearray()
+    for chunk in chunks:
+        pending += chunk
+        while len(pending) >= chunk_size:
+            yield bytes(pending[:chunk_size])
+            del pending[:chunk_size]
+    if pending:
+        yield bytes(pending)
+
+
+async def arechunk(chunks: AsyncIterable[bytes], chunk_size: int) -> AsyncIterator[bytes]:
+    pending = bytearray()
+    async for chunk in chunks:
+        pending += chunk
+        while len(pending) >= chunk_size:
+            yield bytes(pending[:chunk_size])
+            del pending[:chunk_size]
+    if pending:
+        yield bytes(pending)
+
+
+def convert_stream(
+    chunks: Iterable[bytes],
+    chunk_size: int = 4096,
+    converter: Optional[AudioConverter] = None,
+    **options
+) -> Iterator[bytes]:
+    """Convert a byte stream chunk by chunk; ``options`` go to AudioConverter"""
+    converter = converter or AudioConverter(**options)
+    for chunk in rechunk(chunks, chunk_size):
+        out = converter.feed(chunk)
+        if out:
+            yield out
+    out = converter.flush()
+    if out:
+        yield out
+
+
+async def aconvert_stream(
+    chunks: AsyncIterable[bytes],
+    chunk_size: int = 4096,
+    converter: Optional[AudioConverter] = None,
+    **options
+) -> AsyncIterator[bytes]:
+    """Async counterpart of ``convert_stream`` for request and response bodies"""
+    converter = converter or AudioConverter(**options)
+    async for chunk in arechunk(chunks, chunk_size):
+        out = converter.feed(chunk)
+        if out:
+            yield out
+    out = converter.flush()
+    if out:
+        yield out
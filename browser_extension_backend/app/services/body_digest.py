@@ -0,0 +1,60 @@
+"""
+Bounded map from raw request body digests to already-parsed requests
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class BodyDigestCache:
+    """LRU of body digest -> prepared request
+
+    Extension builds send byte-identical bodies, so a hit lets the caller
+    skip JSON parsing, validation and cache-key construction. Only bodies
+    that validated are stored; entries must be cleared when the
+    configuration that canonicalization depends on changes.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_body_bytes: int = 4096):
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
+        self._entries: "OrderedDict[bytes, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(body: bytes) -> bytes:
+        return hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, body: bytes) -> Optional[Any]:
+        if len(body) > self.max_body_bytes:
+            return None
+        key = self.digest(body)
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, body: bytes, value: Any) -> None:
+        if len(body) > self.max_body_bytes:
+            return
+        self._entries[self.digest(body)] = value
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
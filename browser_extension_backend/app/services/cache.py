@@ -2,6 +2,7 @@
 In-memory cache service for OpenAI API responses
 """
 
+import asyncio
 import time
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
@@ -83,6 +84,15 @@ class InMemoryCache:
         
         return len(expired_keys)
     
+    async def run_cleanup(self, interval_seconds: float) -> None:
+        """Periodically remove expired entries until cancelled"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.cleanup_expired()
+            except Exception as e:
+                logger.error("Cache cleanup failed", error=str(e))
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         current_time = time.time()
@@ -0,0 +1,59 @@
+"""
+Token request canonicalization ahead of cache keying
+"""
+
+import re
+from typing import Any, Dict, Optional
+
+from app.config.settings import settings
+from app.models.token import TokenRequest
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Only these lengths change the instructions; anything else is the default
+_RESPONSE_LENGTHS = ("short", "long")
+
+
+def normalize_text(value: Optional[str]) -> Optional[str]:
+    """Collapse whitespace runs and trim; empty strings become None"""
+    if value is None:
+        return None
+    value = _WHITESPACE.sub(" ", value).strip()
+    return value or None
+
+
+def build_sport_aliases(sports_contexts: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """Index of normalized sport names and their ``aliases`` to the context key"""
+    index = {}
+    for sport, context in sports_contexts.items():
+        for name in (sport, *(context.get("aliases") or ())):
+            alias = normalize_text(str(name))
+            if alias:
+                index.setdefault(alias.lower(), sport)
+    return index
+
+
+def canonicalize(token_request: TokenRequest, sport_aliases: Dict[str, str]) -> TokenRequest:
+    """Request with every variation that yields the same upstream payload folded together
+
+    Sports resolve through the alias index, and unknown sports are dropped
+    since they add nothing to the instructions. Custom instructions that are
+    blank or just restate the default instructions are dropped as well; any
+    others are sent upstream as written, so whitespace in them is folded only
+    where cache keys are built, with ``normalize_text``.
+    """
+    sport = normalize_text(token_request.sports_context)
+    instructions = token_request.instructions
+    if normalize_text(instructions) in (None, _default_instructions()):
+        instructions = None
+    length = (normalize_text(token_request.response_length) or "").lower()
+
+    return token_request.model_copy(update={
+        "sports_context": sport_aliases.get(sport.lower()) if sport else None,
+        "instructions": instructions,
+        "response_length": length if length in _RESPONSE_LENGTHS else "medium"
+    })
+
+
+def _default_instructions() -> Optional[str]:
+    return normalize_text(settings.default_instructions)
@@ -0,0 +1,116 @@
+"""
+Queued ingestion of client voice session events into voice monitoring
+"""
+
+import asyncio
+from typing import Any, Dict
+
+import structlog
+
+from app.models.events import VoiceEventBatch, VoiceEventKind
+from app.services.voice_monitoring import VoiceMonitoringService
+
+logger = structlog.get_logger(__name__)
+
+
+class EventQueueFull(Exception):
+    """Raised when the event queue cannot take another batch"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Voice event queue full")
+        self.retry_after = retry_after
+
+
+class VoiceEventIngestor:
+    """Bounded queue of event batches applied to voice monitoring by one consumer
+
+    Handlers only enqueue, so a burst of telemetry costs request parsing and
+    a queue append; the consumer applies batches in arrival order and yields
+    to the event loop between drains so token requests keep being served.
+    Sessions are keyed by the Realtime session ID and started on their first
+    batch; sessions that never send ``end`` are dropped by the session reaper.
+    """
+
+    def __init__(
+        self,
+        monitoring: VoiceMonitoringService,
+        queue_size: int,
+        max_sessions: int,
+        retry_after: float = 1.0,
+        drain_batches: int = 64
+    ):
+        self.monitoring = monitoring
+        self.max_sessions = max_sessions
+        self.retry_after = retry_after
+        self.drain_batches = drain_batches
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        self.accepted_batches = 0
+        self.accepted_events = 0
+        self.rejected_batches = 0
+        self.dropped_batches = 0
+        self.applied_events = 0
+
+    def submit(self, batch: VoiceEventBatch) -> None:
+        try:
+            self._queue.put_nowait(batch)
+        except asyncio.QueueFull:
+            self.rejected_batches += 1
+            raise EventQueueFull(self.retry_after)
+        self.accepted_batches += 1
+        self.accepted_events += len(batch.events)
+
+    def apply(self, batch: VoiceEventBatch) -> None:
+        """Apply one batch to voice monitoring"""
+        monitoring = self.monitoring
+        session_id = batch.session_id
+        if session_id not in monitoring.active_sessions:
+            if len(monitoring.active_sessions) >= self.max_sessions:
+                self.dropped_batches += 1
+                return
+            monitoring.start_session(session_id, batch.voice.value, batch.difficulty.value)
+
+        for event in batch.events:
+            kind = event[0]
+            value = event[1] if len(event) > 1 else None
+            if kind is VoiceEventKind.INTERRUPTION:
+                monitoring.record_interruption(session_id)
+            elif kind is VoiceEventKind.AUDIO_CHUNK:
+                monitoring.record_audio_chunk(session_id, int(value or 0))
+            elif kind is VoiceEventKind.QUALITY:
+                monitoring.record_scores(session_id, audio_quality_score=value)
+            elif kind is VoiceEventKind.SATISFACTION:
+                monitoring.record_scores(session_id, user_satisfaction_score=value)
+            elif kind is VoiceEventKind.END:
+                monitoring.end_reported_session(session_id, audio_duration_seconds=value)
+                # Anything after "end" belongs to a session that no longer exists
+                self.applied_events += 1
+                return
+            self.applied_events += 1
+
+    async def run(self) -> None:
+        """Apply queued batches until cancelled"""
+        queue = self._queue
+        while True:
+            batches = [await queue.get()]
+            while len(batches) < self.drain_batches and not queue.empty():
+                batches.append(queue.get_nowait())
+            for batch in batches:
+                try:
+                    self.apply(batch)
+                except Exception as e:
+                    logger.error("Voice event batch failed", session_id=batch.session_id, error=str(e))
+            if len(batches) == self.drain_batches:
+                # get() does not suspend on a non-empty queue; let requests run
+                await asyncio.sleep(0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "accepted_batches": self.accepted_batches,
+            "accepted_events": self.accepted_events,
+            "applied_events": self.applied_events,
+            "rejected_batches": self.rejected_batches,
+            "dropped_batches": self.dropped_batches
+        }
@@ -0,0 +1,171 @@
+"""
+Weighted fair queuing of upstream session slots across client origins
+"""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class UpstreamQueueRejected(Exception):
+    """Raised when a request cannot get an upstream slot (queue full or deadline passed)"""
+
+    def __init__(self, origin: str, reason: str, retry_after: float):
+        super().__init__(f"Upstream queue {reason} for {origin}")
+        self.origin = origin
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class FairScheduler:
+    """Bounded upstream concurrency shared across origins with deficit round-robin
+
+    While slots are free, requests pass straight through. Once every slot is
+    busy, waiters queue per origin and freed slots are handed out in deficit
+    round-robin order, each origin earning ``quantum * weight`` credits per
+    round. Per-origin queues are bounded and every waiter has a deadline, so
+    one tenant's burst only ever delays its own requests.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue_per_origin: int,
+        queue_timeout: float,
+        weights: Optional[Dict[str, float]] = None,
+        quantum: float = 1.0
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue_per_origin = max_queue_per_origin
+        self.queue_timeout = queue_timeout
+        self.weights = weights or {}
+        self.quantum = quantum
+
+        self._in_flight = 0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {}
+        self._deficits: Dict[str, float] = {}
+        self._active: Deque[str] = deque()
+        self._queued = 0
+
+        self.dispatched_from_queue = 0
+        self.rejected_queue_full = 0
+        self.rejected_deadline = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def _weight(self, origin: str) -> float:
+        return max(self.weights.get(origin, 1.0), 0.01)
+
+    @asynccontextmanager
+    async def slot(self, origin: str) -> AsyncIterator[None]:
+        """Hold one upstream slot for the duration of the block"""
+        await self.acquire(origin)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, origin: str) -> None:
+        if self._in_flight < self.max_concurrency and not self._queued:
+            self._in_flight += 1
+            return
+
+        queue = self._queues.get(origin)
+        if queue is None:
+            queue = self._queues[origin] = deque()
+            self._deficits[origin] = 0.0
+            self._active.append(origin)
+        if len(queue) >= self.max_queue_per_origin:
+            self.rejected_queue_full += 1
+            raise UpstreamQueueRejected(origin, "full", retry_after=self.queue_timeout)
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        self._queued += 1
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was granted as we gave up; hand it back
+                self.release()
+            else:
+                waiter.cancel()
+                self._queued -= 1
+                self._forget(origin, waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected_deadline += 1
+                raise UpstreamQueueRejected(origin, "deadline exceeded", retry_after=1.0) from None
+            raise
+
+    def _forget(self, origin: str, waiter: asyncio.Future) -> None:
+        """Drop a waiter that gave up so it no longer counts against its origin's queue"""
+        queue = self._queues.get(origin)
+        if queue is None or waiter not in queue:
+            return  # already skipped by _dispatch
+        queue.remove(waiter)
+        if not queue:
+            del self._queues[origin]
+            del self._deficits[origin]
+            self._active.remove(origin)
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to queued waiters in deficit round-robin order"""
+        while self._in_flight < self.max_concurrency and self._active:
+            origin = self._active[0]
+            queue = self._queues[origin]
+
+            # Skip waiters that timed out or were cancelled
+            while queue and queue[0].done():
+                queue.popleft()
+
+            if not queue:
+                self._active.popleft()
+                del self._queues[origin]
+                del self._deficits[origin]
+                continue
+
+            if self._deficits[origin] < 1.0:
+                self._deficits[origin] += self.quantum * self._weight(origin)
+                self._active.rotate(-1)
+                continue
+
+            self._deficits[origin] -= 1.0
+            waiter = queue.popleft()
+            self._queued -= 1
+            self._in_flight += 1
+            self.dispatched_from_queue += 1
+            waiter.set_result(None)
+
+    def get_stats(self, top: int = 10) -> Dict[str, Any]:
+        depths = sorted(
+            ((origin, sum(1 for waiter in queue if not waiter.done())) for origin, queue in self._queues.items()),
+            key=lambda item: item[1],
+            reverse=True
+        )
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "queued_origins": len(self._queues),
+            "deepest_queues": dict(depths[:top]),
+            "dispatched_from_queue": self.dispatched_from_queue,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_deadline": self.rejected_deadline
+        }
@@ -0,0 +1,86 @@
+"""
+Background upstream health probing with cached results
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import structlog
+
+from app.services.openai_client import OpenAIClient
+
+logger = structlog.get_logger(__name__)
+
+
+class HealthProber:
+    """Probes OpenAI connectivity on a fixed cadence and caches the outcome
+
+    Health endpoints read the cached state instead of calling upstream, so a
+    probe costs one request per interval per instance regardless of how often
+    load balancers poll.
+    """
+
+    def __init__(self, openai_client: OpenAIClient, timeout_seconds: float, failure_threshold: int):
+        self.openai_client = openai_client
+        self.timeout_seconds = timeout_seconds
+        self.failure_threshold = failure_threshold
+
+        self.status = "unknown"
+        self.rtt_ms: Optional[float] = None
+        self.last_checked: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.consecutive_failures = 0
+        self.probe_count = 0
+
+    @property
+    def upstream_healthy(self) -> bool:
+        """False only once probes have failed ``failure_threshold`` times in a row"""
+        return self.consecutive_failures < self.failure_threshold
+
+    async def probe_once(self) -> bool:
+        started = time.perf_counter()
+        connected = await self.openai_client.test_connectivity(timeout=self.timeout_seconds)
+
+        self.probe_count += 1
+        self.last_checked = time.time()
+        self.rtt_ms = (time.perf_counter() - started) * 1000
+        if connected:
+            self.last_success = self.last_checked
+            self.consecutive_failures = 0
+        else:
+            self.consecutive_failures += 1
+
+        status = "connected" if connected else "disconnected"
+        if status != self.status:
+            log = logger.info if connected else logger.warning
+            log("OpenAI connectivity changed", status=status, previous=self.status, rtt_ms=round(self.rtt_ms, 1))
+        self.status = status
+        return connected
+
+    async def run(self, interval_seconds: float) -> None:
+        """Probe immediately, then every ``interval_seconds`` until cancelled"""
+        while True:
+            try:
+                await self.probe_once()
+            except Exception as e:
+                logger.error("Health probe failed", error=str(e))
+            await asyncio.sleep(interval_seconds)
+
+    @staticmethod
+    def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+        if timestamp is None:
+            return None
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "healthy": self.upstream_healthy,
+            "rtt_ms": round(self.rtt_ms, 2) if self.rtt_ms is not None else None,
+            "last_checked": self._isoformat(self.last_checked),
+            "last_success": self._isoformat(self.last_success),
+            "consecutive_failures": self.consecutive_failures,
+            "probes": self.probe_count
+        }
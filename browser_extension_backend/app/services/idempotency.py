@@ -0,0 +1,133 @@
+"""
+Idempotency-Key store: retries join or replay the original call
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class IdempotencyConflict(Exception):
+    """Raised when a key is reused with a different request body"""
+
+    def __init__(self, key: str):
+        super().__init__("Idempotency-Key was already used with a different request")
+        self.key = key
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "result", "expires_at")
+
+    def __init__(self, fingerprint: bytes, result: asyncio.Future, expires_at: float):
+        self.fingerprint = fingerprint
+        self.result = result
+        self.expires_at = expires_at
+
+
+class IdempotencyStore:
+    """Bounded, TTL-expiring map of idempotency key -> in-flight or completed result
+
+    The first call with a key runs; calls with the same key and body while it
+    is in flight await the same future, and later ones within ``ttl_seconds``
+    get the stored result. Failed calls are forgotten so a retry runs again.
+    The oldest entries are evicted beyond ``max_entries``.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.executed = 0
+        self.joined = 0
+        self.replayed = 0
+        self.conflicts = 0
+        self.upstream_mints_avoided = 0
+
+    def __contains__(self, key: str) -> bool:
+        """Whether a call with ``key`` is in flight or has a live result"""
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > time.monotonic()
+
+    @staticmethod
+    def fingerprint(body: bytes) -> bytes:
+        return hashlib.blake2b(body, digest_size=16).digest()
+
+    async def run(
+        self,
+        key: str,
+        body: bytes,
+        call: Callable[[], Awaitable[Tuple[Any, bool]]]
+    ) -> Tuple[Any, bool]:
+        """Result of ``call`` for ``key`` and whether it was reused
+
+        ``call`` returns ``(result, minted)``; ``minted`` marks results that
+        cost an upstream session.
+        """
+        fingerprint = self.fingerprint(body)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry.result.done() and entry.expires_at <= now:
+            del self._entries[key]
+            entry = None
+
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                self.conflicts += 1
+                raise IdempotencyConflict(key)
+            in_flight = not entry.result.done()
+            if in_flight:
+                self.joined += 1
+            else:
+                self.replayed += 1
+            try:
+                # Shielded so a retry that gives up doesn't cancel the original call
+                result, minted = await asyncio.shield(entry.result)
+            except asyncio.CancelledError:
+                if not entry.result.cancelled():
+                    raise
+                # The original caller went away mid-call; this retry takes over
+                return await self.run(key, body, call)
+            # Once the original finished, a retry would find its token in the
+            # cache anyway, so only joins count as mints avoided
+            if minted and in_flight:
+                self.upstream_mints_avoided += 1
+            return result, True
+
+        entry = _Entry(fingerprint, asyncio.get_running_loop().create_future(), float("inf"))
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        self.executed += 1
+        try:
+            outcome = await call()
+        except BaseException as e:
+            # Joined retries see the same failure; later ones run again
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            if isinstance(e, asyncio.CancelledError):
+                entry.result.cancel()
+            else:
+                entry.result.set_exception(e)
+                entry.result.exception()  # retrieved here if nobody joined
+            raise
+        entry.expires_at = time.monotonic() + self.ttl_seconds
+        entry.result.set_result(outcome)
+        return outcome[0], False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "executed": self.executed,
+            "joined": self.joined,
+            "replayed": self.replayed,
+            "conflicts": self.conflicts,
+            "upstream_mints_avoided": self.upstream_mints_avoided
+        }
@@ -0,0 +1,53 @@
+"""
+Fixed-bucket latency histograms for per-stage timings
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+
+# Upper bounds in milliseconds; the last bucket catches everything above
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (
+    0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000
+)
+
+
+class LatencyHistogram:
+    """Cumulative histogram with O(log buckets) recording"""
+
+    __slots__ = ("bounds", "counts", "count", "total_ms", "max_ms")
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts: List[int] = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect_left(self.bounds, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": self.max_ms
+        }
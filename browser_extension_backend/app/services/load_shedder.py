@@ -0,0 +1,131 @@
+"""
+Admission control from event-loop lag and upstream queue depth
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+import structlog
+
+from app.services.fair_scheduler import FairScheduler
+
+logger = structlog.get_logger(__name__)
+
+# Pressure levels, lowest first
+NORMAL = 0
+ELEVATED = 1  # shed low-priority endpoints
+OVERLOADED = 2  # also shed token requests that miss the cache
+
+LEVEL_NAMES = {NORMAL: "normal", ELEVATED: "elevated", OVERLOADED: "overloaded"}
+
+
+class LoadShedRejected(Exception):
+    """Raised when a request is refused because the service is overloaded"""
+
+    def __init__(self, priority: str, level: int, retry_after: float):
+        super().__init__(f"Shedding {priority} work ({LEVEL_NAMES[level]})")
+        self.priority = priority
+        self.level = level
+        self.retry_after = retry_after
+
+
+class LoadShedder:
+    """Decides whether to admit work given loop lag and pending upstream calls
+
+    Loop lag is sampled by a background task that sleeps for a fixed interval
+    and measures how late it wakes up, smoothed with an EWMA. Pending upstream
+    calls are read from the fair scheduler (in flight plus queued). Crossing
+    either threshold raises the pressure level; low-priority work is shed
+    first, then token cache misses. Cache hits are always admitted.
+    """
+
+    def __init__(
+        self,
+        lag_threshold_ms: float,
+        lag_critical_ms: float,
+        pending_threshold: int,
+        pending_critical: int,
+        retry_after: float = 2.0,
+        scheduler: Optional[FairScheduler] = None,
+        alpha: float = 0.3
+    ):
+        self.lag_threshold_ms = lag_threshold_ms
+        self.lag_critical_ms = lag_critical_ms
+        self.pending_threshold = pending_threshold
+        self.pending_critical = pending_critical
+        self.retry_after = retry_after
+        self.scheduler = scheduler
+        self.alpha = alpha
+
+        self.lag_ms = 0.0
+        self.lag_max_ms = 0.0
+        self._last_level = NORMAL
+
+        self.admitted: Dict[str, int] = {"low": 0, "token_miss": 0}
+        self.shed: Dict[str, int] = {"low": 0, "token_miss": 0}
+
+    def pending(self) -> int:
+        if self.scheduler is None:
+            return 0
+        return self.scheduler.in_flight + self.scheduler.queued
+
+    def level(self) -> int:
+        pending = self.pending()
+        if self.lag_ms >= self.lag_critical_ms or pending >= self.pending_critical:
+            level = OVERLOADED
+        elif self.lag_ms >= self.lag_threshold_ms or pending >= self.pending_threshold:
+            level = ELEVATED
+        else:
+            level = NORMAL
+
+        if level != self._last_level:
+            log = logger.warning if level > self._last_level else logger.info
+            log("Load level changed",
+                level=LEVEL_NAMES[level],
+                previous=LEVEL_NAMES[self._last_level],
+                loop_lag_ms=round(self.lag_ms, 1),
+                pending_upstream=pending)
+            self._last_level = level
+        return level
+
+    def admit(self, priority: str) -> None:
+        """Raise ``LoadShedRejected`` if work of this priority should be shed"""
+        level = self.level()
+        threshold = ELEVATED if priority == "low" else OVERLOADED
+        if level >= threshold:
+            self.shed[priority] += 1
+            raise LoadShedRejected(priority, level, self.retry_after)
+        self.admitted[priority] += 1
+
+    def observe_lag(self, lag_ms: float) -> None:
+        lag_ms = max(lag_ms, 0.0)
+        self.lag_ms += self.alpha * (lag_ms - self.lag_ms)
+        if lag_ms > self.lag_max_ms:
+            self.lag_max_ms = lag_ms
+
+    async def run_lag_monitor(self, interval_seconds: float) -> None:
+        """Sample event-loop lag until cancelled"""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.observe_lag((loop.time() - started - interval_seconds) * 1000)
+            except Exception as e:
+                logger.error("Loop lag sampling failed", error=str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "level": LEVEL_NAMES[self.level()],
+            "loop_lag_ms": round(self.lag_ms, 2),
+            "loop_lag_max_ms": round(self.lag_max_ms, 2),
+            "pending_upstream": self.pending(),
+            "thresholds": {
+                "lag_ms": self.lag_threshold_ms,
+                "lag_critical_ms": self.lag_critical_ms,
+                "pending": self.pending_threshold,
+                "pending_critical": self.pending_critical
+            },
+            "admitted": dict(self.admitted),
+            "shed": dict(self.shed)
+        }
@@ -0,0 +1,132 @@
+"""
+Bucketed sliding time-window counters for request, error, cache and latency stats
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass(slots=True)
+class WindowBucket:
+    """Counters for a single time bucket (one second or one minute)"""
+    epoch: int = -1
+    requests: int = 0
+    errors: int = 0
+    slow_requests: int = 0
+    cache_lookups: int = 0
+    cache_hits: int = 0
+    latency_sum_ms: float = 0.0
+    latency_max_ms: float = 0.0
+
+    def reset(self, epoch: int) -> None:
+        """Reuse the bucket for a new epoch"""
+        self.epoch = epoch
+        self.requests = 0
+        self.errors = 0
+        self.slow_requests = 0
+        self.cache_lookups = 0
+        self.cache_hits = 0
+        self.latency_sum_ms = 0.0
+        self.latency_max_ms = 0.0
+
+
+class SlidingWindowMetrics:
+    """Per-second buckets rolled up into 1m / 5m windows, per-minute buckets for 1h
+
+    Buckets live in fixed-size rings and are recycled lazily when a new epoch
+    lands on a slot, so recording is O(1) and memory is constant.
+    """
+
+    WINDOWS: Dict[str, int] = {"1m": 60, "5m": 300, "1h": 3600}
+
+    def __init__(
+        self,
+        slow_request_ms: int = 10000,
+        clock: Callable[[], float] = time.time
+    ):
+        self.slow_request_ms = slow_request_ms
+        self._clock = clock
+        self._seconds: List[WindowBucket] = [WindowBucket() for _ in range(300)]
+        self._minutes: List[WindowBucket] = [WindowBucket() for _ in range(60)]
+
+    @staticmethod
+    def _bucket(ring: List[WindowBucket], epoch: int) -> WindowBucket:
+        bucket = ring[epoch % len(ring)]
+        if bucket.epoch != epoch:
+            bucket.reset(epoch)
+        return bucket
+
+    def record(
+        self,
+        latency_ms: float,
+        error: bool = False,
+        cache_hit: Optional[bool] = None,
+        now: Optional[float] = None
+    ) -> None:
+        """Record one completed request"""
+        now = self._clock() if now is None else now
+        second = int(now)
+        slow = latency_ms > self.slow_request_ms
+
+        for bucket in (
+            self._bucket(self._seconds, second),
+            self._bucket(self._minutes, second // 60)
+        ):
+            bucket.requests += 1
+            bucket.latency_sum_ms += latency_ms
+            if latency_ms > bucket.latency_max_ms:
+                bucket.latency_max_ms = latency_ms
+            if error:
+                bucket.errors += 1
+            if slow:
+                bucket.slow_requests += 1
+            if cache_hit is not None:
+                bucket.cache_lookups += 1
+                if cache_hit:
+                    bucket.cache_hits += 1
+
+    def window(self, seconds: int, now: Optional[float] = None) -> Dict[str, Any]:
+        """Aggregate the buckets covering the last ``seconds`` seconds"""
+        now = self._clock() if now is None else now
+        if seconds <= len(self._seconds):
+            ring, current = self._seconds, int(now)
+            span = seconds
+        else:
+            ring, current = self._minutes, int(now) // 60
+            span = min(seconds // 60, len(self._minutes))
+
+        oldest = current - span
+        requests = errors = slow = lookups = hits = 0
+        latency_sum = latency_max = 0.0
+        for bucket in ring:
+            if oldest < bucket.epoch <= current:
+                requests += bucket.requests
+                errors += bucket.errors
+                slow += bucket.slow_requests
+                lookups += bucket.cache_lookups
+                hits += bucket.cache_hits
+                latency_sum += bucket.latency_sum_ms
+                if bucket.latency_max_ms > latency_max:
+                    latency_max = bucket.latency_max_ms
+
+        return {
+            "requests": requests,
+            "errors": errors,
+            "slow_requests": slow,
+            "request_rate_per_sec": requests / seconds,
+            "error_rate": errors / requests if requests else 0.0,
+            "cache_hit_rate": hits / lookups if lookups else 0.0,
+            "average_latency_ms": latency_sum / requests if requests else 0.0,
+            "max_latency_ms": latency_max
+        }
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Aggregate every configured window at a single point in time"""
+        now = self._clock() if now is None else now
+        return {name: self.window(seconds, now) for name, seconds in self.WINDOWS.items()}
+
+    def reset(self) -> None:
+        """Drop all recorded buckets"""
+        for bucket in self._seconds + self._minutes:
+            bucket.reset(-1)
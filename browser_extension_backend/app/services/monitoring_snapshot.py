@@ -0,0 +1,142 @@
+"""
+Immutable voice monitoring snapshots rebuilt in the background
+"""
+
+import asyncio
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import structlog
+from fastapi.encoders import jsonable_encoder
+
+from app.services.voice_monitoring import VoiceMetrics, VoiceMonitoringService
+
+logger = structlog.get_logger(__name__)
+
+
+def _serialize(metrics: VoiceMetrics) -> Dict[str, Any]:
+    return {
+        "request_id": metrics.request_id,
+        "voice_type": metrics.voice_type,
+        "difficulty": metrics.difficulty,
+        "response_time_ms": metrics.response_time_ms,
+        "audio_quality_score": metrics.audio_quality_score,
+        "user_satisfaction_score": metrics.user_satisfaction_score,
+        "interruption_count": metrics.interruption_count,
+        "audio_duration_seconds": metrics.audio_duration_seconds,
+        "timestamp": metrics.timestamp.isoformat()
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class MonitoringSnapshot:
+    """Point-in-time monitoring state; never mutated after it is built
+
+    ``metrics`` holds serialized entries oldest first, with ``timestamps``
+    (epoch seconds) alongside for bisecting and ``by_voice`` listing the
+    positions of each voice's entries in the same order.
+    """
+    generation: int
+    built_at: float
+    summary: Dict[str, Any]
+    metrics: Tuple[Dict[str, Any], ...]
+    timestamps: Tuple[float, ...]
+    by_voice: Dict[str, Tuple[int, ...]]
+
+    def query(
+        self,
+        since: Optional[float] = None,
+        voice: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Page of metrics recorded after ``since`` for ``voice``, and the match count
+
+        Pages count back from the newest match: ``offset`` skips that many of
+        the most recent entries and the page itself is oldest first.
+        """
+        if voice is None:
+            start = bisect_right(self.timestamps, since) if since is not None else 0
+            end = len(self.metrics) - offset
+            return list(self.metrics[max(end - limit, start):max(end, start)]), len(self.metrics) - start
+
+        positions = self.by_voice.get(voice, ())
+        if since is not None:
+            positions = positions[bisect_right(positions, since, key=self.timestamps.__getitem__):]
+        end = max(len(positions) - offset, 0)
+        return [self.metrics[i] for i in positions[max(end - limit, 0):end]], len(positions)
+
+
+class MonitoringSnapshotter:
+    """Builds monitoring snapshots on an interval and swaps them in whole
+
+    Readers take a reference to the current snapshot and work on it without
+    locks while new metrics keep landing in the monitoring service; each
+    rebuild only serializes the entries recorded since the previous one.
+    """
+
+    def __init__(self, monitoring: VoiceMonitoringService, build_summary: Callable[[], Dict[str, Any]]):
+        self.monitoring = monitoring
+        self.build_summary = build_summary
+        self._snapshot: Optional[MonitoringSnapshot] = None
+        self._seen_requests = 0
+        self.builds = 0
+
+    def latest(self) -> MonitoringSnapshot:
+        """Current snapshot, built on first use"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh()
+        return snapshot
+
+    def refresh(self) -> MonitoringSnapshot:
+        history = self.monitoring.metrics_history
+        previous = self._snapshot
+        added = self.monitoring.total_requests - self._seen_requests
+
+        if previous is None or added < 0 or added >= len(history):
+            # First build, metrics reset or the whole history turned over
+            metrics = tuple(_serialize(m) for m in history)
+            timestamps = tuple(m.timestamp.timestamp() for m in history)
+        elif added:
+            new = list(islice(reversed(history), added))[::-1]
+            keep = len(history) - added
+            metrics = previous.metrics[len(previous.metrics) - keep:] + tuple(_serialize(m) for m in new)
+            timestamps = previous.timestamps[len(previous.timestamps) - keep:] + tuple(
+                m.timestamp.timestamp() for m in new
+            )
+        else:
+            metrics, timestamps = previous.metrics, previous.timestamps
+
+        if previous is not None and metrics is previous.metrics:
+            by_voice = previous.by_voice
+        else:
+            positions: Dict[str, List[int]] = {}
+            for i, entry in enumerate(metrics):
+                positions.setdefault(entry["voice_type"], []).append(i)
+            by_voice = {voice: tuple(indexes) for voice, indexes in positions.items()}
+
+        snapshot = MonitoringSnapshot(
+            generation=previous.generation + 1 if previous else 1,
+            built_at=time.time(),
+            summary=jsonable_encoder(self.build_summary()),
+            metrics=metrics,
+            timestamps=timestamps,
+            by_voice=by_voice
+        )
+        self._seen_requests = self.monitoring.total_requests
+        self._snapshot = snapshot
+        self.builds += 1
+        return snapshot
+
+    async def run(self, interval_seconds: float) -> None:
+        """Rebuild the snapshot every ``interval_seconds`` until cancelled"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error("Monitoring snapshot build failed", error=str(e))
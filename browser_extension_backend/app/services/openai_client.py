@@ -3,20 +3,56 @@ OpenAI API client with retry logic, connection pooling, and caching
 """
 
 import httpx
+import logging
 import asyncio
+import time
 from typing import Dict, Any, Optional
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-    before_sleep_log
-)
 import structlog
+from app.core.tracing import current_trace, record_span, span
 
 logger = structlog.get_logger(__name__)
 
 
+class _UpstreamTimer:
+    """httpcore ``trace`` extension that turns connection events into spans"""
+    
+    # (span name, httpcore event prefix); started -> complete
+    PHASES = (
+        ("upstream.connect", "connection.connect_tcp"),
+        ("upstream.tls", "connection.start_tls"),
+        ("upstream.body", "http11.receive_response_body"),
+    )
+    
+    __slots__ = ("start_ns", "marks")
+    
+    def __init__(self):
+        self.start_ns = time.perf_counter_ns()
+        self.marks: Dict[str, int] = {}
+    
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        self.marks[event_name] = time.perf_counter_ns()
+    
+    def record(self) -> None:
+        marks = self.marks
+        
+        # Time until the pool handed us a connection (new or reused)
+        first_io = marks.get("connection.connect_tcp.started") or marks.get("http11.send_request_headers.started")
+        if first_io:
+            record_span("upstream.pool_wait", self.start_ns, first_io)
+        
+        for name, prefix in self.PHASES:
+            started = marks.get(f"{prefix}.started")
+            complete = marks.get(f"{prefix}.complete")
+            if started and complete:
+                record_span(name, started, complete)
+        
+        # Request fully sent -> response headers received
+        sent = marks.get("http11.send_request_body.complete") or marks.get("http11.send_request_headers.complete")
+        headers = marks.get("http11.receive_response_headers.complete")
+        if sent and headers:
+            record_span("upstream.server", sent, headers)
+
+
 class OpenAIClient:
     """Enhanced OpenAI client with retry logic and caching"""
     
@@ -24,6 +60,42 @@ class OpenAIClient:
         self.api_key = api_key
         self.base_url = base_url
         self._client = None
+        self._retry_policy = None
+        self._ssl_context = None
+    
+    def prewarm(self) -> None:
+        """Load CA certificates now rather than on the first upstream call"""
+        self._get_ssl_context()
+    
+    def _get_ssl_context(self):
+        # Building an SSL context loads the CA bundle (tens of ms); share one
+        # across the per-request clients
+        if self._ssl_context is None:
+            self._ssl_context = httpx.create_ssl_context()
+        return self._ssl_context
+    
+    def _retrying(self):
+        """Retry policy for session creation
+        
+        tenacity is imported on first use rather than at module import, keeping
+        it off the serverless cold-start path.
+        """
+        if self._retry_policy is None:
+            from tenacity import (
+                AsyncRetrying,
+                stop_after_attempt,
+                wait_exponential,
+                retry_if_exception_type,
+                before_sleep_log
+            )
+            self._retry_policy = AsyncRetrying(
+                stop=stop_after_attempt(3),
+                wait=wait_exponential(multiplier=1, min=4, max=10),
+                retry=retry_if_exception_type((httpx.HTTPError, httpx.TimeoutException)),
+                before_sleep=before_sleep_log(logger, logging.WARNING)
+            )
+        # Retry state lives on the policy object, so each call gets its own copy
+        return self._retry_policy.copy()
     
     def _get_client(self) -> httpx.AsyncClient:
         """Create a fresh httpx client for each request (serverless-safe)"""
@@ -35,6 +107,7 @@ class OpenAIClient:
                 "OpenAI-Beta": "realtime=v1",
                 "User-Agent": "Parker-Token-Service/1.0.0"
             },
+            verify=self._get_ssl_context(),
             timeout=httpx.Timeout(30.0),  # 30 second timeout
             limits=httpx.Limits(
                 max_keepalive_connections=1,  # Minimal for serverless
@@ -51,29 +124,33 @@ class OpenAIClient:
         if self._client and not self._client.is_closed:
             await self._client.aclose()
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((httpx.HTTPError, httpx.TimeoutException)),
-        before_sleep=before_sleep_log(logger, "WARNING")
-    )
     async def create_realtime_session(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create OpenAI Realtime session with retry logic"""
+        return await self._retrying()(self._create_realtime_session, session_data)
+    
+    async def _create_realtime_session(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Single attempt at creating an OpenAI Realtime session"""
         
         try:
-            logger.info("Creating OpenAI session", 
+            logger.debug("Creating OpenAI session", 
                        model=session_data.get("model"),
                        voice=session_data.get("voice"))
             
-            client = self._get_client()
+            with span("upstream.client_setup"):
+                client = self._get_client()
+            timer = _UpstreamTimer() if current_trace() is not None else None
             try:
                 response = await client.post(
                     "/realtime/sessions",
-                    json=session_data
+                    json=session_data,
+                    extensions={"trace": timer} if timer else None
                 )
             finally:
                 await client.aclose()
             
+            if timer:
+                timer.record()
+            
             # Handle different status codes
             if response.status_code == 200:
                 session_response = response.json()
@@ -124,12 +201,12 @@ class OpenAIClient:
             logger.error("Unexpected error creating OpenAI session", error=str(e))
             raise
     
-    async def test_connectivity(self) -> bool:
+    async def test_connectivity(self, timeout: float = 10.0) -> bool:
         """Test OpenAI API connectivity"""
         try:
             client = self._get_client()
             try:
-                response = await client.get("/models", timeout=10.0)
+                response = await client.get("/models", timeout=timeout)
                 return response.status_code == 200
             finally:
                 await client.aclose()
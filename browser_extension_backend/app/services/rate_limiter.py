@@ -0,0 +1,242 @@
+"""
+Token-bucket rate limiting with in-memory and SQLite (cross-worker) backends
+"""
+
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List
+
+import structlog
+
+if TYPE_CHECKING:
+    import sqlite3
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass(slots=True)
+class RateLimitDecision:
+    """Outcome of a rate limit check"""
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+class RateLimiter(ABC):
+    """Shared counters and maintenance loop for the bucket backends"""
+
+    backend = "base"
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(max(burst, 1))
+        # A bucket idle this long has refilled completely
+        self.idle_ttl = self.capacity / self.rate if self.rate > 0 else 3600.0
+        self.allowed_count = 0
+        self.limited_count = 0
+        self.evicted_count = 0
+
+    @abstractmethod
+    def check(self, key: str, cost: float = 1.0) -> RateLimitDecision:
+        """Take ``cost`` tokens from the key's bucket if available"""
+
+    @abstractmethod
+    def evict_idle(self) -> int:
+        """Drop buckets idle long enough to have refilled completely"""
+
+    @abstractmethod
+    def tracked_keys(self) -> int:
+        """Number of buckets currently stored"""
+
+    async def acquire(self, key: str, cost: float = 1.0) -> RateLimitDecision:
+        """``check`` for callers on the event loop"""
+        return self.check(key, cost)
+
+    def _decide(self, tokens: float, cost: float) -> RateLimitDecision:
+        if tokens >= cost:
+            self.allowed_count += 1
+            return RateLimitDecision(True, int(tokens - cost), 0.0)
+        self.limited_count += 1
+        retry_after = (cost - tokens) / self.rate if self.rate > 0 else self.idle_ttl
+        return RateLimitDecision(False, 0, retry_after)
+
+    async def run_eviction(self, interval_seconds: float) -> None:
+        """Periodically evict idle buckets until cancelled"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.error("Rate limiter eviction failed", error=str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "tracked_keys": self.tracked_keys(),
+            "allowed": self.allowed_count,
+            "limited": self.limited_count,
+            "evicted": self.evicted_count
+        }
+
+
+class TokenBucketRateLimiter(RateLimiter):
+    """Per-key token buckets sharded across LRU-ordered dicts
+
+    Buckets are refilled lazily on access, so a check is O(1) and idle keys
+    cost nothing until they are evicted. Each shard keeps keys in access
+    order; a bucket idle for ``capacity / rate`` seconds is full again, so
+    evicting it is indistinguishable from keeping it.
+    """
+
+    backend = "memory"
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        burst: int,
+        shards: int = 16,
+        max_keys_per_shard: int = 4096,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        super().__init__(rate_per_minute, burst)
+        self.max_keys_per_shard = max_keys_per_shard
+        self._clock = clock
+        self._mask = (1 << max(shards - 1, 0).bit_length()) - 1
+        self._shards: List[OrderedDict] = [OrderedDict() for _ in range(self._mask + 1)]
+
+    def check(self, key: str, cost: float = 1.0) -> RateLimitDecision:
+        now = self._clock()
+        shard = self._shards[hash(key) & self._mask]
+        bucket = shard.get(key)
+
+        if bucket is None:
+            if len(shard) >= self.max_keys_per_shard:
+                shard.popitem(last=False)
+                self.evicted_count += 1
+            bucket = shard[key] = [self.capacity, now]
+        else:
+            shard.move_to_end(key)
+            tokens = bucket[0] + (now - bucket[1]) * self.rate
+            bucket[0] = tokens if tokens < self.capacity else self.capacity
+            bucket[1] = now
+
+        decision = self._decide(bucket[0], cost)
+        if decision.allowed:
+            bucket[0] -= cost
+        return decision
+
+    def evict_idle(self) -> int:
+        cutoff = self._clock() - self.idle_ttl
+        evicted = 0
+        for shard in self._shards:
+            # Oldest access first, so stop at the first recently used key
+            while shard:
+                key, bucket = next(iter(shard.items()))
+                if bucket[1] > cutoff:
+                    break
+                del shard[key]
+                evicted += 1
+        self.evicted_count += evicted
+        return evicted
+
+    def tracked_keys(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """Token buckets in a local SQLite file shared by every worker on the host
+
+    Each check is one short ``BEGIN IMMEDIATE`` transaction in WAL mode. It
+    uses the wall clock, which all workers share. ``acquire`` runs the check
+    in a worker thread since it may wait on another worker's lock, and a
+    check the database can't answer is allowed rather than failing the
+    request.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, rate_per_minute: float, burst: int, path: str):
+        super().__init__(rate_per_minute, burst)
+        self.path = path
+        self._local = threading.local()
+        self.error_count = 0
+
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS buckets_updated ON buckets (updated)")
+
+    def _connection(self) -> "sqlite3.Connection":
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    async def acquire(self, key: str, cost: float = 1.0) -> RateLimitDecision:
+        return await asyncio.to_thread(self.check, key, cost)
+
+    def check(self, key: str, cost: float = 1.0) -> RateLimitDecision:
+        import sqlite3
+        try:
+            return self._check(key, cost)
+        except sqlite3.Error as e:
+            # Fail open: a locked or broken database must not take down token minting
+            self.error_count += 1
+            logger.warning("Rate limiter database error, allowing request", error=str(e))
+            return RateLimitDecision(True, 0, 0.0)
+
+    def _check(self, key: str, cost: float) -> RateLimitDecision:
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens = self.capacity if row is None else min(
+                self.capacity, row[0] + (now - row[1]) * self.rate
+            )
+            decision = self._decide(tokens, cost)
+            if decision.allowed:
+                tokens -= cost
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return decision
+
+    def evict_idle(self) -> int:
+        cursor = self._connection().execute(
+            "DELETE FROM buckets WHERE updated < ?", (time.time() - self.idle_ttl,)
+        )
+        self.evicted_count += cursor.rowcount
+        return cursor.rowcount
+
+    def tracked_keys(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**super().get_stats(), "errors": self.error_count}
+
+
+def create_rate_limiter(backend: str, rate_per_minute: float, burst: int, sqlite_path: str) -> RateLimiter:
+    """Build the configured rate limiter backend"""
+    if backend == "sqlite":
+        logger.info("Using SQLite rate limiter backend", path=sqlite_path)
+        return SQLiteRateLimiter(rate_per_minute, burst, sqlite_path)
+    return TokenBucketRateLimiter(rate_per_minute, burst)
+
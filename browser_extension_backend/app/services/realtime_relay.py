@@ -0,0 +1,239 @@
+"""
+WebSocket relay between extension clients and the OpenAI Realtime API
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+import structlog
+from starlette.websockets import WebSocket
+
+from app.core.request_context import new_request_id
+from app.services.voice_monitoring import VoiceMonitoringService
+
+logger = structlog.get_logger(__name__)
+
+# Close codes sent to the client
+_CLOSE_TRY_AGAIN = 1013
+_CLOSE_UPSTREAM_ERROR = 1011
+_CLOSE_POLICY = 1008
+
+
+def _string_field(frame: str, key: str, limit: int = -1) -> Optional[slice]:
+    """Span of a top-level JSON string value, found without parsing the frame"""
+    at = frame.find(key, 0, limit) if limit > 0 else frame.find(key)
+    if at < 0:
+        return None
+    start = frame.find('"', at + len(key) + 1)
+    end = frame.find('"', start + 1)
+    if start < 0 or end < 0:
+        return None
+    return slice(start + 1, end)
+
+
+def event_type(frame: str) -> Optional[str]:
+    """``type`` of a Realtime event; it leads every event the API sends and clients build"""
+    span = _string_field(frame, '"type"', limit=256)
+    return frame[span] if span else None
+
+
+def audio_bytes(frame: str) -> int:
+    """Decoded size of the base64 ``audio`` field of an append event"""
+    span = _string_field(frame, '"audio"')
+    if span is None:
+        return 0
+    length = span.stop - span.start
+    padding = (frame[span.stop - 1] == "=") + (frame[span.stop - 2] == "=") if length >= 2 else 0
+    return length * 3 // 4 - padding
+
+
+class _RelaySession:
+    __slots__ = ("key", "audio_bytes", "frames_in", "frames_out", "bytes_in", "bytes_out", "responding")
+
+    def __init__(self, key: str):
+        self.key = key
+        self.audio_bytes = 0
+        self.frames_in = self.frames_out = 0
+        self.bytes_in = self.bytes_out = 0
+        self.responding = False
+
+
+class RealtimeRelay:
+    """Forwards Realtime frames between a client and upstream untouched
+
+    Frames are passed on as the same ``str``/``bytes`` objects they arrived
+    as; only the leading ``type`` (and an append's audio length) is located
+    with string searches to feed voice monitoring. Each direction is a pump
+    that awaits the send before reading the next frame, so a slow reader
+    pushes back through the transport to the sender instead of growing
+    buffers here; upstream compression is disabled to avoid re-encoding.
+    """
+
+    def __init__(
+        self,
+        upstream_url: str,
+        monitoring: VoiceMonitoringService,
+        max_sessions: int,
+        max_session_seconds: float,
+        max_frame_bytes: int,
+        open_timeout: float,
+        bytes_per_second: int = 48000
+    ):
+        self.upstream_url = upstream_url
+        self.monitoring = monitoring
+        self.max_sessions = max_sessions
+        self.max_session_seconds = max_session_seconds
+        self.max_frame_bytes = max_frame_bytes
+        self.open_timeout = open_timeout
+        self.bytes_per_second = bytes_per_second
+
+        self.active = 0
+        self.sessions = 0
+        self.rejected = 0
+        self.upstream_failures = 0
+        self.timed_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    async def _connect(self, token: str, model: str):
+        from websockets.asyncio.client import connect
+
+        return await connect(
+            f"{self.upstream_url}?{urlencode({'model': model})}",
+            additional_headers={"Authorization": f"Bearer {token}", "OpenAI-Beta": "realtime=v1"},
+            max_size=self.max_frame_bytes,
+            open_timeout=self.open_timeout,
+            compression=None
+        )
+
+    async def serve(
+        self,
+        websocket: WebSocket,
+        token: str,
+        model: str,
+        voice: str,
+        difficulty: str,
+        subprotocol: Optional[str] = None
+    ) -> None:
+        """Relay one client connection until either side closes"""
+        if self.active >= self.max_sessions:
+            self.rejected += 1
+            await websocket.close(code=_CLOSE_TRY_AGAIN)
+            return
+
+        self.active += 1
+        try:
+            try:
+                upstream = await self._connect(token, model)
+            except Exception as e:
+                self.upstream_failures += 1
+                logger.warning("Relay upstream connection failed", error=str(e))
+                await websocket.close(code=_CLOSE_UPSTREAM_ERROR)
+                return
+
+            await websocket.accept(subprotocol=subprotocol)
+            session = _RelaySession(new_request_id())
+            self.sessions += 1
+            self.monitoring.start_session(session.key, voice, difficulty)
+            started = time.monotonic()
+            try:
+                await self._pump(websocket, upstream, session)
+            finally:
+                await upstream.close()
+                self.bytes_in += session.bytes_in
+                self.bytes_out += session.bytes_out
+                self.monitoring.end_reported_session(
+                    session.key,
+                    audio_duration_seconds=session.audio_bytes / self.bytes_per_second
+                )
+                logger.info(
+                    "Relay session closed",
+                    session=session.key,
+                    duration_s=round(time.monotonic() - started, 1),
+                    frames_in=session.frames_in,
+                    frames_out=session.frames_out,
+                    audio_bytes=session.audio_bytes
+                )
+        finally:
+            self.active -= 1
+
+    async def _pump(self, websocket: WebSocket, upstream, session: _RelaySession) -> None:
+        tasks = [
+            asyncio.create_task(self._client_to_upstream(websocket, upstream, session)),
+            asyncio.create_task(self._upstream_to_client(websocket, upstream, session))
+        ]
+        done, pending = await asyncio.wait(
+            tasks, timeout=self.max_session_seconds, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        if not done:
+            self.timed_out += 1
+            await self._close_client(websocket, _CLOSE_POLICY)
+            return
+        for task in done:
+            if task.exception() is not None:
+                logger.warning("Relay pump failed", session=session.key, error=str(task.exception()))
+        await self._close_client(websocket, 1000)
+
+    @staticmethod
+    async def _close_client(websocket: WebSocket, code: int) -> None:
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass  # already closed by the client
+
+    async def _client_to_upstream(self, websocket: WebSocket, upstream, session: _RelaySession) -> None:
+        receive = websocket.receive
+        send = upstream.send
+        monitoring = self.monitoring
+        while True:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            frame = message.get("text")
+            if frame is None:
+                frame = message.get("bytes")
+                if not frame:
+                    continue
+            elif event_type(frame) == "input_audio_buffer.append":
+                size = audio_bytes(frame)
+                session.audio_bytes += size
+                monitoring.record_audio_chunk(session.key, size)
+            session.frames_in += 1
+            session.bytes_in += len(frame)
+            await send(frame)
+
+    async def _upstream_to_client(self, websocket: WebSocket, upstream, session: _RelaySession) -> None:
+        send = websocket.send
+        async for frame in upstream:
+            if isinstance(frame, str):
+                kind = event_type(frame)
+                if kind == "response.created":
+                    session.responding = True
+                elif kind == "response.done":
+                    session.responding = False
+                elif kind == "input_audio_buffer.speech_started" and session.responding:
+                    # User started talking over an in-progress response
+                    self.monitoring.record_interruption(session.key)
+                await send({"type": "websocket.send", "text": frame})
+            else:
+                await send({"type": "websocket.send", "bytes": frame})
+            session.frames_out += 1
+            session.bytes_out += len(frame)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "max_sessions": self.max_sessions,
+            "sessions": self.sessions,
+            "rejected": self.rejected,
+            "upstream_failures": self.upstream_failures,
+            "timed_out": self.timed_out,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out
+        }
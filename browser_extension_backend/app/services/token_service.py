@@ -2,8 +2,10 @@
 Token generation service with business logic and error handling
 """
 
+from dataclasses import dataclass
 from typing import Dict, Any, Optional
 from datetime import datetime
+import asyncio
 import time
 import structlog
 from app.models.token import TokenRequest, TokenResponse
@@ -12,11 +14,48 @@ from app.services.openai_client import OpenAIClient
 from app.services.cache import InMemoryCache
 from app.services.voice_config import VoiceConfigService
 from app.services.voice_monitoring import VoiceMonitoringService
+from app.services.canonical_request import canonicalize, normalize_text
+from app.services.fair_scheduler import FairScheduler, UpstreamQueueRejected
+from app.services.load_shedder import LoadShedder, LoadShedRejected
+from app.core.request_context import new_request_id
+from app.core.tracing import span
 from app.config.settings import settings
 
 logger = structlog.get_logger(__name__)
 
 
+@dataclass(frozen=True, slots=True)
+class PreparedRequest:
+    """A validated token request with its canonical form and cache key"""
+    request: TokenRequest
+    canonical: TokenRequest
+    cache_key: str
+
+
+def realtime_url() -> str:
+    """Realtime endpoint handed to clients: the relay when it is public, else upstream"""
+    if settings.relay_enabled and settings.relay_public_url:
+        return settings.relay_public_url
+    return settings.relay_upstream_url
+
+
+def build_turn_detection(enable_interruptions: bool) -> Dict[str, Any]:
+    """Server VAD settings for a session; local VAD mirrors these"""
+    turn_detection = {
+        "type": "server_vad",
+        "threshold": 0.5,
+        "prefix_padding_ms": 300,
+        "silence_duration_ms": 500
+    }
+    
+    if not enable_interruptions:
+        # Make it harder to interrupt
+        turn_detection["threshold"] = 0.7
+        turn_detection["silence_duration_ms"] = 1000
+    
+    return turn_detection
+
+
 class TokenService:
     """Service for generating OpenAI Realtime tokens with advanced voice configuration"""
     
@@ -25,12 +64,16 @@ class TokenService:
         openai_client: OpenAIClient, 
         cache: InMemoryCache,
         voice_config: VoiceConfigService,
-        voice_monitoring: VoiceMonitoringService
+        voice_monitoring: VoiceMonitoringService,
+        scheduler: Optional[FairScheduler] = None,
+        load_shedder: Optional[LoadShedder] = None
     ):
         self.openai_client = openai_client
         self.cache = cache
         self.voice_config = voice_config
         self.voice_monitoring = voice_monitoring
+        self.scheduler = scheduler
+        self.load_shedder = load_shedder
     
     def _prepare_instructions(self, token_request: TokenRequest) -> str:
         """Prepare comprehensive instructions using voice configuration service"""
@@ -66,17 +109,7 @@ class TokenService:
             audio_format = "wav"
         
         # Configure turn detection based on interruption settings
-        turn_detection = {
-            "type": "server_vad",
-            "threshold": 0.5,
-            "prefix_padding_ms": 300,
-            "silence_duration_ms": 500
-        }
-        
-        if not token_request.enable_interruptions:
-            # Make it harder to interrupt
-            turn_detection["threshold"] = 0.7
-            turn_detection["silence_duration_ms"] = 1000
+        turn_detection = build_turn_detection(token_request.enable_interruptions)
         
         return {
             "model": token_request.model.value,
@@ -96,19 +129,30 @@ class TokenService:
             "speed": settings.default_speed
         }
     
+    def canonicalize(self, token_request: TokenRequest) -> TokenRequest:
+        """Fold request variations that produce the same upstream session"""
+        return canonicalize(token_request, self.voice_config.sport_aliases)
+    
+    def prepare(self, token_request: TokenRequest) -> PreparedRequest:
+        canonical = self.canonicalize(token_request)
+        return PreparedRequest(token_request, canonical, self._generate_cache_key(canonical))
+    
     def _generate_cache_key(self, token_request: TokenRequest) -> str:
-        """Generate cache key for token request with all voice configuration parameters"""
-        # Create a deterministic key from all request parameters
+        """Generate cache key for a canonical token request
+        
+        Only fields that reach the upstream payload are keyed; echo fields
+        are overlaid per request on the way out. Instructions differing only
+        in whitespace share a key and the session minted for the first.
+        """
         key_data = {
             "model": token_request.model.value,
             "voice": token_request.voice.value,
             "difficulty": token_request.difficulty.value,
-            "voice_quality": token_request.voice_quality.value,
             "audio_format": token_request.audio_format.value,
             "enable_interruptions": token_request.enable_interruptions,
             "response_length": token_request.response_length,
             "sports_context": token_request.sports_context,
-            "instructions": token_request.instructions or settings.default_instructions
+            "instructions": normalize_text(token_request.instructions)
         }
         
         # Sort keys for consistent hashing
@@ -116,8 +160,42 @@ class TokenService:
         key_string = str(sorted_data)
         return f"token_request:{hash(key_string)}"
     
-    async def generate_token(self, token_request: TokenRequest, request_id: str) -> TokenResponse:
-        """Generate OpenAI Realtime token with comprehensive error handling, caching, and monitoring"""
+    @staticmethod
+    def echo(response: Dict[str, Any], token_request: TokenRequest) -> TokenResponse:
+        """Token response carrying the caller's own values for the echo fields"""
+        return TokenResponse(**{
+            **response,
+            "voice_quality": token_request.voice_quality.value,
+            "sports_context": token_request.sports_context
+        })
+    
+    async def _create_session(self, session_data: Dict[str, Any], origin: str) -> Dict[str, Any]:
+        """Create the upstream session, waiting for a fair-share slot when saturated"""
+        if self.scheduler is None:
+            return await self.openai_client.create_realtime_session(session_data)
+        
+        with span("upstream.queue_wait"):
+            await self.scheduler.acquire(origin)
+        try:
+            return await self.openai_client.create_realtime_session(session_data)
+        finally:
+            self.scheduler.release()
+    
+    async def generate_token(
+        self,
+        token_request: TokenRequest,
+        request_id: str,
+        origin: str = "anonymous",
+        min_valid_seconds: float = 0.0,
+        prepared: Optional[PreparedRequest] = None
+    ) -> TokenResponse:
+        """Generate OpenAI Realtime token with comprehensive error handling, caching, and monitoring
+        
+        ``origin`` identifies the tenant (extension ID, site or client) for fair queuing.
+        Cached tokens expiring within ``min_valid_seconds`` are treated as misses.
+        ``prepared`` skips canonicalization and keying when the caller already did them.
+        """
+        cache_hit: Optional[bool] = None
         try:
             # Start voice monitoring session
             self.voice_monitoring.start_session(
@@ -127,17 +205,22 @@ class TokenService:
             )
             
             # Check cache first
-            cache_key = self._generate_cache_key(token_request)
-            cached_response = self.cache.get(cache_key)
+            with span("cache_lookup"):
+                prepared = prepared or self.prepare(token_request)
+                canonical, cache_key = prepared.canonical, prepared.cache_key
+                cached_response = self.cache.get(cache_key)
+                if cached_response and cached_response["expires_at"] < time.time() + min_valid_seconds:
+                    cached_response = None
+            cache_hit = cached_response is not None
             if cached_response:
-                logger.info("Using cached token response", 
+                logger.debug("Using cached token response", 
                            request_id=request_id, 
                            cache_key=cache_key)
                 
                 # End monitoring session for cached response
-                self.voice_monitoring.end_session(request_id=request_id)
+                self.voice_monitoring.end_session(request_id=request_id, cache_hit=True)
                 
-                return TokenResponse(**cached_response)
+                return self.echo(cached_response, token_request)
             
             logger.info("Generating token", 
                        request_id=request_id,
@@ -148,13 +231,18 @@ class TokenService:
                        audio_format=token_request.audio_format.value,
                        sports_context=token_request.sports_context)
             
+            # Cache misses cost an upstream call; refuse them first when overloaded
+            if self.load_shedder:
+                self.load_shedder.admit("token_miss")
+            
             # Validate voice configuration
-            validation = self.voice_config.validate_voice_configuration(
-                voice=token_request.voice,
-                difficulty=token_request.difficulty,
-                voice_quality=token_request.voice_quality,
-                audio_format=token_request.audio_format
-            )
+            with span("config_validation"):
+                validation = self.voice_config.validate_voice_configuration(
+                    voice=token_request.voice,
+                    difficulty=token_request.difficulty,
+                    voice_quality=token_request.voice_quality,
+                    audio_format=token_request.audio_format
+                )
             
             if not validation["compatible"]:
                 logger.warning("Voice configuration compatibility warning", 
@@ -162,10 +250,12 @@ class TokenService:
                              validation=validation)
             
             # Prepare session data
-            session_data = self._prepare_session_data(token_request)
+            with span("instructions"):
+                session_data = self._prepare_session_data(canonical)
             
             # Create OpenAI session
-            session_response = await self.openai_client.create_realtime_session(session_data)
+            with span("upstream"):
+                session_response = await self._create_session(session_data, origin)
             
             # Validate response - handle new API format
             client_secret = session_response.get("client_secret")
@@ -175,7 +265,9 @@ class TokenService:
             if not client_secret:
                 logger.error("Invalid OpenAI response - missing client_secret", 
                            request_id=request_id)
-                self.voice_monitoring.end_session(request_id=request_id, error="Invalid OpenAI response")
+                self.voice_monitoring.end_session(
+                    request_id=request_id, error="Invalid OpenAI response", cache_hit=cache_hit
+                )
                 raise ValueError("Invalid OpenAI API response")
             
             # Handle expires_at format
@@ -184,27 +276,30 @@ class TokenService:
                 expires_at = expires_at.get("expires_at")
             
             # Create token response with all voice configuration details
-            token_response = TokenResponse(
-                client_secret=client_secret,
-                expires_at=expires_at,
-                session_id=session_response["id"],
-                model=session_response["model"],
-                voice=session_response["voice"],
-                instructions=session_response["instructions"],
-                web_rtc_url="wss://api.openai.com/v1/realtime",
-                voice_quality=token_request.voice_quality.value,
-                audio_format=token_request.audio_format.value,
-                difficulty=token_request.difficulty.value,
-                enable_interruptions=token_request.enable_interruptions,
-                response_length=token_request.response_length,
-                sports_context=token_request.sports_context
-            )
-            
-            # Cache the response
-            self.cache.set(cache_key, token_response.model_dump(), ttl=settings.token_ttl_seconds)
+            with span("response_build"):
+                token_response = TokenResponse(
+                    client_secret=client_secret,
+                    expires_at=expires_at,
+                    session_id=session_response["id"],
+                    model=session_response["model"],
+                    voice=session_response["voice"],
+                    instructions=session_response["instructions"],
+                    web_rtc_url=realtime_url(),
+                    voice_quality=token_request.voice_quality.value,
+                    audio_format=token_request.audio_format.value,
+                    difficulty=token_request.difficulty.value,
+                    enable_interruptions=token_request.enable_interruptions,
+                    response_length=canonical.response_length,
+                    sports_context=canonical.sports_context
+                )
+                
+                # Cache the canonical response; the caller gets its own echo fields
+                cached_response = token_response.model_dump()
+                self.cache.set(cache_key, cached_response, ttl=settings.token_ttl_seconds)
+                token_response = self.echo(cached_response, token_request)
             
             # End monitoring session successfully
-            self.voice_monitoring.end_session(request_id=request_id)
+            self.voice_monitoring.end_session(request_id=request_id, cache_hit=cache_hit)
             
             logger.info("Token generated successfully", 
                        request_id=request_id,
@@ -220,6 +315,14 @@ class TokenService:
             
             return token_response
             
+        except asyncio.CancelledError:
+            # Client went away mid-request; don't leave the session behind
+            self.voice_monitoring.end_session(request_id=request_id, error="cancelled", cache_hit=cache_hit)
+            raise
+        except (LoadShedRejected, UpstreamQueueRejected) as e:
+            # Expected under overload and counted by the shedder/scheduler; not logged per request
+            self.voice_monitoring.end_session(request_id=request_id, error=str(e), cache_hit=cache_hit)
+            raise
         except Exception as e:
             logger.error("Token generation failed", 
                        request_id=request_id,
@@ -227,7 +330,7 @@ class TokenService:
                        error_type=type(e).__name__)
             
             # End monitoring session with error
-            self.voice_monitoring.end_session(request_id=request_id, error=str(e))
+            self.voice_monitoring.end_session(request_id=request_id, error=str(e), cache_hit=cache_hit)
             raise
     
     async def test_openai_connectivity(self) -> bool:
@@ -277,7 +380,7 @@ class TokenService:
             )
             
             # Generate token for testing
-            request_id = f"voice_test_{voice_type}_{int(time.time())}"
+            request_id = f"voice_test_{voice_type}_{new_request_id()}"
             token_response = await self.generate_token(test_request, request_id)
             
             return {
@@ -0,0 +1,227 @@
+"""
+Server-sent token refresh channels
+"""
+
+import asyncio
+import contextvars
+import time
+import weakref
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+import structlog
+
+from app.core.request_context import new_request_id
+from app.models.token import TokenRequest, TokenResponse
+from app.services.token_service import PreparedRequest, TokenService
+
+logger = structlog.get_logger(__name__)
+
+_HEARTBEAT = b": heartbeat\n\n"
+
+
+class TokenStreamFull(Exception):
+    """Raised when a worker already holds its maximum number of streams"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Token stream capacity reached")
+        self.retry_after = retry_after
+
+
+class _Channel:
+    """Subscribers sharing one token configuration
+
+    ``wake`` is a single future every subscriber awaits; publishing or a
+    heartbeat resolves it and installs a fresh one, so an idle subscriber
+    costs a suspended generator and nothing per tick. Subscribers differ in
+    the echo fields the cache key ignores, so each published token is
+    rendered once per distinct echo and shared by the subscribers wanting it.
+    """
+
+    __slots__ = ("prepared", "token", "events", "subscribers", "task", "wake")
+
+    def __init__(self, prepared: PreparedRequest):
+        self.prepared = prepared
+        self.token: Optional[Dict[str, Any]] = None
+        self.events: Dict[Tuple[str, Optional[str]], bytes] = {}
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self.wake: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    @property
+    def key(self) -> str:
+        return self.prepared.cache_key
+
+    @property
+    def session_id(self) -> Optional[str]:
+        return self.token["session_id"] if self.token is not None else None
+
+    def publish(self, token: TokenResponse) -> None:
+        self.token = token.model_dump()
+        self.events = {}
+        self.notify()
+
+    def event_for(self, token_request: TokenRequest) -> bytes:
+        """``token`` event carrying this subscriber's own echo fields"""
+        echo = (token_request.voice_quality.value, token_request.sports_context)
+        event = self.events.get(echo)
+        if event is None:
+            token = TokenService.echo(self.token, token_request)
+            event = self.events[echo] = (
+                f"event: token\nid: {token.session_id}\ndata: {token.model_dump_json()}\n\n".encode()
+            )
+        return event
+
+    def notify(self, closing: bool = False) -> None:
+        wake, self.wake = self.wake, asyncio.get_running_loop().create_future()
+        if not wake.done():
+            wake.set_result(closing)
+
+
+class TokenBroadcaster:
+    """Pushes a fresh token to SSE subscribers shortly before the current one expires
+
+    Subscribers asking for the same configuration share a channel whose
+    refresh loop mints one token ``lead_seconds`` before ``expires_at``
+    (taking it from the token cache when the cached one lives long enough)
+    and fans it out, so upstream calls scale with configurations rather than
+    connections. One ticker sends heartbeats to every channel.
+    """
+
+    def __init__(
+        self,
+        token_service: TokenService,
+        lead_seconds: float,
+        heartbeat_seconds: float,
+        max_subscribers: int,
+        retry_seconds: float
+    ):
+        self.token_service = token_service
+        self.lead_seconds = lead_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_subscribers = max_subscribers
+        self.retry_seconds = retry_seconds
+        self._channels: Dict[str, _Channel] = {}
+        self.subscribers = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.rejected = 0
+
+    def subscribe(
+        self,
+        token_request: TokenRequest,
+        origin: str = "anonymous",
+        last_event_id: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """SSE byte stream of ``token`` events and heartbeat comments
+
+        Raises TokenStreamFull when at capacity. The slot is taken here, so
+        concurrent subscribes cannot overshoot ``max_subscribers``, and is
+        given back when the stream ends or is discarded without starting.
+        """
+        if self.subscribers >= self.max_subscribers:
+            self.rejected += 1
+            raise TokenStreamFull(self.heartbeat_seconds)
+        prepared = self.token_service.prepare(token_request)
+        self.subscribers += 1
+
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.subscribers -= 1
+
+        stream = self._stream(prepared, origin, last_event_id, release)
+        # An unstarted generator never reaches its finally block
+        weakref.finalize(stream, release)
+        return stream
+
+    async def _stream(
+        self,
+        prepared: PreparedRequest,
+        origin: str,
+        last_event_id: Optional[str],
+        release: Callable[[], None]
+    ) -> AsyncIterator[bytes]:
+        # The channel is joined on first iteration so an unstarted stream mints nothing
+        channel = self._channels.get(prepared.cache_key)
+        if channel is None:
+            channel = self._channels[prepared.cache_key] = _Channel(prepared)
+            # Shared by every subscriber, so not tagged with the first one's request ID
+            channel.task = contextvars.Context().run(
+                asyncio.create_task, self._refresh(channel, origin), name="token-stream-refresh"
+            )
+        channel.subscribers += 1
+
+        sent = last_event_id
+        try:
+            yield f"retry: {int(self.retry_seconds * 1000)}\n\n".encode()
+            while True:
+                if channel.token is not None and channel.session_id != sent:
+                    sent = channel.session_id
+                    yield channel.event_for(prepared.request)
+                # Shielded: cancelling one subscriber must not cancel the shared future
+                if await asyncio.shield(channel.wake):
+                    return
+                if channel.token is None or channel.session_id == sent:
+                    yield _HEARTBEAT
+        finally:
+            self._leave(channel)
+            release()
+
+    def _leave(self, channel: _Channel) -> None:
+        channel.subscribers -= 1
+        if channel.subscribers == 0 and self._channels.get(channel.key) is channel:
+            del self._channels[channel.key]
+            channel.task.cancel()
+
+    async def _refresh(self, channel: _Channel, origin: str) -> None:
+        failures = 0
+        while True:
+            try:
+                token = await self.token_service.generate_token(
+                    channel.prepared.canonical,
+                    new_request_id(),
+                    origin=origin,
+                    min_valid_seconds=self.lead_seconds + self.retry_seconds,
+                    prepared=channel.prepared
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Subscribers keep the token they have; back off before retrying
+                failures += 1
+                self.refresh_failures += 1
+                logger.warning("Token stream refresh failed", error=str(e), failures=failures)
+                await asyncio.sleep(min(self.retry_seconds * 2 ** (failures - 1), 60.0))
+                continue
+
+            failures = 0
+            self.refreshes += 1
+            if token.session_id != channel.session_id:
+                channel.publish(token)
+            await asyncio.sleep(max(token.expires_at - time.time() - self.lead_seconds, self.retry_seconds))
+
+    async def run(self) -> None:
+        """Heartbeat ticker shared by every channel"""
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            for channel in list(self._channels.values()):
+                channel.notify()
+
+    def close(self) -> None:
+        """End every stream; called on shutdown"""
+        for channel in list(self._channels.values()):
+            channel.task.cancel()
+            channel.notify(closing=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": self.subscribers,
+            "max_subscribers": self.max_subscribers,
+            "channels": len(self._channels),
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "rejected": self.rejected
+        }
@@ -0,0 +1,124 @@
+"""
+Anonymized token request trace capture for offline replay
+"""
+
+import hashlib
+import json
+import logging
+import queue
+import secrets
+from logging.handlers import QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import structlog
+from starlette.requests import Request
+
+from app.core.client_identity import client_ip, origin_key
+from app.services.canonical_request import normalize_text
+
+logger = structlog.get_logger(__name__)
+
+
+class _RecordListener(QueueListener):
+    """Writes queued lines as-is; stop() waits for room on a full queue"""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+    def handle(self, record: Any) -> None:
+        self.handlers[0].emit(logging.makeLogRecord({"msg": record}))
+
+
+class TraceRecorder:
+    """Append-only, size-rotated JSON-lines trace of token requests
+
+    Each line holds the arrival time, the canonical request configuration
+    (instructions reduced to a hash), salted hashes of the origin, client IP
+    and Idempotency-Key, the response status, the server-side latency and
+    whether the request minted an upstream session. Lines are serialized on
+    the request path and written by a background thread; when the queue is
+    full the line is dropped and counted rather than blocking the request.
+
+    Without a configured ``salt`` a random one is drawn per process, since
+    unkeyed hashes of IPv4 addresses can be reversed by enumeration; hashes
+    then only correlate within one process's trace.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 50 * 1024 * 1024,
+        backups: int = 5,
+        queue_size: int = 10000,
+        salt: str = ""
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        if salt:
+            self._salt = hashlib.blake2b(salt.encode(), digest_size=32).digest()
+        else:
+            self._salt = secrets.token_bytes(32)
+            logger.warning("TRACE_CAPTURE_SALT is not set, using a random per-process salt")
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=queue_size)
+        self._handler: Optional[RotatingFileHandler] = None
+        self._listener: Optional[_RecordListener] = None
+        self.recorded = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handler = RotatingFileHandler(
+            self.path, maxBytes=self.max_bytes, backupCount=self.backups, encoding="utf-8", delay=True
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._listener = _RecordListener(self._queue, self._handler)
+        self._listener.start()
+        logger.info("Trace capture started", path=str(self.path))
+
+    def stop(self) -> None:
+        """Flush queued records and close the file"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self._handler is not None:
+            self._handler.close()
+            self._handler = None
+
+    def anonymize(self, value: Optional[str]) -> Optional[str]:
+        """Keyed 48-bit hash; stable for one salt, not reversible without it"""
+        if value is None:
+            return None
+        return hashlib.blake2b(value.encode(), digest_size=6, key=self._salt).hexdigest()
+
+    def record(self, request: Request, arrived_at: float, status: int, latency_ms: float) -> None:
+        canonical = getattr(request.state, "canonical", None)
+        config = None
+        if canonical is not None:
+            config = canonical.model_dump(mode="json", exclude={"voice_quality", "instructions"})
+            # Hashed as keyed, so replayed requests share cache entries as the originals did
+            config["instructions"] = self.anonymize(normalize_text(canonical.instructions))
+        line = json.dumps({
+            "t": round(arrived_at, 3),
+            "o": self.anonymize(origin_key(request)),
+            "c": self.anonymize(client_ip(request)),
+            "k": self.anonymize(request.headers.get("idempotency-key")),
+            "cfg": config,
+            "s": status,
+            "ms": round(latency_ms, 2),
+            "m": getattr(request.state, "minted", False)
+        }, separators=(",", ":"))
+        try:
+            self._queue.put_nowait(line)
+            self.recorded += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize()
+        }
@@ -0,0 +1,146 @@
+"""
+Energy-based voice activity detection for PCM16 audio
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict
+
+import numpy as np
+
+# Frame energies are mapped onto the server VAD's 0-1 threshold scale
+# linearly between these levels
+_FLOOR_DBFS = -60.0
+_CEILING_DBFS = -20.0
+
+
+@dataclass(frozen=True, slots=True)
+class VadConfig:
+    """Same knobs as the session's ``server_vad`` turn detection"""
+    threshold: float = 0.5
+    prefix_padding_ms: int = 300
+    silence_duration_ms: int = 500
+    frame_ms: int = 20
+
+    @classmethod
+    def from_turn_detection(cls, turn_detection: Dict[str, Any], frame_ms: int = 20) -> "VadConfig":
+        return cls(
+            threshold=turn_detection["threshold"],
+            prefix_padding_ms=turn_detection["prefix_padding_ms"],
+            silence_duration_ms=turn_detection["silence_duration_ms"],
+            frame_ms=frame_ms
+        )
+
+    @property
+    def threshold_dbfs(self) -> float:
+        return _FLOOR_DBFS + self.threshold * (_CEILING_DBFS - _FLOOR_DBFS)
+
+    def frames(self, duration_ms: int) -> int:
+        return -(-duration_ms // self.frame_ms)
+
+
+def frame_activity(samples: np.ndarray, frame: int, threshold_dbfs: float) -> np.ndarray:
+    """Per-frame speech flags for whole frames of int16 ``samples``"""
+    frames = samples[:len(samples) // frame * frame].reshape(-1, frame).astype(np.float32)
+    power = np.einsum("ij,ij->i", frames, frames) / (frame * 32768.0 ** 2)
+    return power >= 10.0 ** (threshold_dbfs / 10.0)
+
+
+def _dilate(flags: np.ndarray, before: int, after: int) -> np.ndarray:
+    """True wherever a True lies within ``before`` frames later or ``after`` frames earlier"""
+    counts = np.concatenate(([0], np.cumsum(flags)))
+    index = np.arange(len(flags))
+    low = np.maximum(index - after, 0)
+    high = np.minimum(index + before + 1, len(flags))
+    return counts[high] > counts[low]
+
+
+def mark_speech(pcm: bytes, sample_rate: int, config: VadConfig = VadConfig()) -> np.ndarray:
+    """Frames that would be sent: speech plus prefix padding and trailing silence
+
+    Whole-buffer version of ``VoiceActivityGate``; one flag per ``frame_ms``.
+    """
+    frame = sample_rate * config.frame_ms // 1000
+    samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2)
+    speech = frame_activity(samples, frame, config.threshold_dbfs)
+    return _dilate(speech, before=config.frames(config.prefix_padding_ms), after=config.frames(config.silence_duration_ms))
+
+
+class VoiceActivityGate:
+    """Streaming silence trimmer for mono PCM16
+
+    Speech frames pass through as soon as their frame is complete. After
+    speech, ``silence_duration_ms`` of silence is still sent so the server
+    VAD sees the turn end; beyond that, silent frames are held back, at most
+    ``prefix_padding_ms`` of them, and are only sent as the prefix padding of
+    the next speech onset. The added latency is therefore one frame of
+    buffering plus the per-frame processing time, both reported by
+    ``get_stats()``.
+    """
+
+    def __init__(self, sample_rate: int, config: VadConfig = VadConfig()):
+        self.config = config
+        self.frame_bytes = sample_rate * config.frame_ms // 1000 * 2
+        self._prefix_frames = config.frames(config.prefix_padding_ms)
+        self._hangover_frames = config.frames(config.silence_duration_ms)
+        self._held: Deque[bytes] = deque(maxlen=max(self._prefix_frames, 1))
+        self._hangover = 0
+        self._carry = b""
+
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.frames = 0
+        self.speech_frames = 0
+        self.processing_seconds = 0.0
+
+    def feed(self, chunk: bytes) -> bytes:
+        started = time.perf_counter()
+        self.bytes_in += len(chunk)
+        if self._carry:
+            chunk = self._carry + chunk
+        usable = len(chunk) - len(chunk) % self.frame_bytes
+        self._carry = chunk[usable:]
+
+        samples = np.frombuffer(chunk, dtype="<i2", count=usable // 2)
+        speech = frame_activity(samples, self.frame_bytes // 2, self.config.threshold_dbfs)
+
+        out = bytearray()
+        for i, is_speech in enumerate(speech.tolist()):
+            frame = chunk[i * self.frame_bytes:(i + 1) * self.frame_bytes]
+            if is_speech:
+                if self._prefix_frames:
+                    out += b"".join(self._held)
+                self._held.clear()
+                out += frame
+                self._hangover = self._hangover_frames
+                self.speech_frames += 1
+            elif self._hangover:
+                out += frame
+                self._hangover -= 1
+            elif self._prefix_frames:
+                self._held.append(frame)
+        self.frames += len(speech)
+        self.bytes_out += len(out)
+        self.processing_seconds += time.perf_counter() - started
+        return bytes(out)
+
+    def flush(self) -> bytes:
+        """Held silence is dropped; a trailing partial frame is sent if still in a turn"""
+        tail = self._carry if self._hangover else b""
+        self._carry = b""
+        self._held.clear()
+        self.bytes_out += len(tail)
+        return tail
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "saved_fraction": round(1 - self.bytes_out / self.bytes_in, 4) if self.bytes_in else 0.0,
+            "frames": self.frames,
+            "speech_frames": self.speech_frames,
+            "frame_ms": self.config.frame_ms,
+            "processing_us_per_frame": round(self.processing_seconds / self.frames * 1e6, 2) if self.frames else 0.0,
+            "added_latency_ms": self.config.frame_ms
+        }
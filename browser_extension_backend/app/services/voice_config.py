@@ -5,23 +5,46 @@ Voice configuration and personality management service
 import structlog
 from typing import Any, Dict, List, Optional
 from app.models.token import VoiceType, DifficultyLevel, VoiceQuality, AudioFormat
-from app.utils.yaml_loader import yaml_loader
+from app.utils.yaml_loader import YAMLConfigLoader, yaml_loader
+from app.services.canonical_request import build_sport_aliases
 
 logger = structlog.get_logger(__name__)
 
 
 class VoiceConfigService:
-    """Service for managing voice configuration and personality settings"""
+    """Service for managing voice configuration and personality settings
     
-    def __init__(self):
+    Instances are immutable snapshots of one parsed configuration; a config
+    change builds a new instance rather than mutating this one.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None, loader: YAMLConfigLoader = yaml_loader):
+        if config is None:
+            config = self._read_config(loader)
+        self._config = config
         self.voice_personalities = self._load_voice_personalities()
         self.difficulty_instructions = self._load_difficulty_instructions()
         self.sports_contexts = self._load_sports_contexts()
+        self.sport_aliases = build_sport_aliases(self.sports_contexts)
+    
+    @staticmethod
+    def _read_config(loader: YAMLConfigLoader) -> Optional[Dict[str, Any]]:
+        """Parsed YAML config, or None if it cannot be loaded"""
+        try:
+            return loader.load_config()
+        except Exception as e:
+            logger.error("Failed to load voice configuration YAML", error=str(e))
+            return None
+    
+    def _section(self, name: str) -> Dict[str, Any]:
+        if self._config is None:
+            raise RuntimeError("Voice configuration YAML unavailable")
+        return self._config.get(name, {})
     
     def _load_voice_personalities(self) -> Dict[str, Dict[str, str]]:
         """Load voice personality configurations from YAML"""
         try:
-            voices_config = yaml_loader.get_voices()
+            voices_config = self._section('voices')
             # Convert string keys to VoiceType enum values
             return {
                 VoiceType.VERSE: voices_config.get('verse', {}),
@@ -64,7 +87,7 @@ class VoiceConfigService:
     def _load_difficulty_instructions(self) -> Dict[str, str]:
         """Load difficulty-based instruction templates from YAML"""
         try:
-            difficulty_config = yaml_loader.get_difficulty_levels()
+            difficulty_config = self._section('difficulty_levels')
             return {
                 DifficultyLevel.EASY: difficulty_config.get('easy', {}).get('instructions', ''),
                 DifficultyLevel.SAVAGE: difficulty_config.get('savage', {}).get('instructions', ''),
@@ -101,7 +124,7 @@ class VoiceConfigService:
     def _load_sports_contexts(self) -> Dict[str, Dict[str, Any]]:
         """Load sports-specific context configurations from YAML"""
         try:
-            return yaml_loader.get_sports_contexts()
+            return self._section('sports_contexts')
         except Exception as e:
             logger.error("Failed to load sports contexts from YAML, using fallback", error=str(e))
             # Fallback configuration
@@ -168,7 +191,7 @@ class VoiceConfigService:
         if custom_instructions:
             full_instructions += f" Additional context: {custom_instructions}"
         
-        logger.info(
+        logger.debug(
             "Generated voice instructions",
             voice=voice,
             difficulty=difficulty,
@@ -187,7 +210,7 @@ class VoiceConfigService:
         return [
             {
                 "voice": voice,
-                "name": config["name"],
+                "name": config["display_name"],
                 "description": config["description"],
                 "personality": config["personality"],
                 "tone": config["tone"],
@@ -2,12 +2,17 @@
 Voice monitoring and performance tracking service
 """
 
+import asyncio
+import sys
 import time
 import structlog
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from collections import defaultdict, deque
+from app.services.metrics_windows import SlidingWindowMetrics
+from app.services.latency_histogram import LatencyHistogram
+from app.config.settings import settings
 
 logger = structlog.get_logger(__name__)
 
@@ -49,15 +54,33 @@ class VoiceMonitoringService:
         self.performance_stats = VoicePerformanceStats()
         self.error_count = 0
         self.total_requests = 0
+        self.history_interruptions = 0
         
         # Real-time tracking
         self.active_sessions: Dict[str, Dict[str, Any]] = {}
         self.session_start_times: Dict[str, datetime] = {}
+        self.reaped_sessions = 0
+        self.session_collisions = 0
+        
+        # Client-reported and relayed sessions (not requests)
+        self.reported_sessions = 0
+        self.reported_interruptions = 0
+        self.reported_audio_seconds = 0.0
+        
+        # Recent activity (1m / 5m / 1h) for health decisions
+        self.windows = SlidingWindowMetrics(slow_request_ms=settings.monitoring_slow_request_ms)
+        
+        # Per-stage timings from request spans
+        self.stage_histograms: Dict[str, LatencyHistogram] = {}
         
         logger.info("Voice monitoring service initialized", max_history=max_metrics_history)
     
     def start_session(self, request_id: str, voice_type: str, difficulty: str) -> None:
         """Start tracking a voice session"""
+        if request_id in self.active_sessions:
+            self.session_collisions += 1
+            logger.warning("Voice session already active, overwriting", request_id=request_id)
+        
         self.active_sessions[request_id] = {
             "voice_type": voice_type,
             "difficulty": difficulty,
@@ -67,7 +90,7 @@ class VoiceMonitoringService:
         }
         self.session_start_times[request_id] = datetime.now()
         
-        logger.info(
+        logger.debug(
             "Voice session started",
             request_id=request_id,
             voice_type=voice_type,
@@ -97,15 +120,34 @@ class VoiceMonitoringService:
                 total_chunks=self.active_sessions[request_id]["audio_chunks"]
             )
     
+    def record_scores(
+        self,
+        request_id: str,
+        audio_quality_score: Optional[float] = None,
+        user_satisfaction_score: Optional[float] = None
+    ) -> None:
+        """Record quality scores for the current session, applied when it ends"""
+        session_data = self.active_sessions.get(request_id)
+        if session_data is None:
+            return
+        if audio_quality_score is not None:
+            session_data["audio_quality"] = audio_quality_score
+        if user_satisfaction_score is not None:
+            session_data["user_satisfaction"] = user_satisfaction_score
+    
     def end_session(
         self,
         request_id: str,
         audio_quality_score: Optional[float] = None,
         user_satisfaction_score: Optional[float] = None,
         audio_duration_seconds: Optional[float] = None,
-        error: Optional[str] = None
+        error: Optional[str] = None,
+        cache_hit: Optional[bool] = None
     ) -> VoiceMetrics:
-        """End a voice session and record metrics"""
+        """End a voice session and record metrics
+        
+        ``cache_hit`` is None when no cache lookup happened for the session.
+        """
         
         if request_id not in self.active_sessions:
             logger.warning("Attempted to end non-existent session", request_id=request_id)
@@ -113,7 +155,13 @@ class VoiceMonitoringService:
         
         session_data = self.active_sessions[request_id]
         start_time = session_data["start_time"]
-        response_time_ms = int((time.time() - start_time) * 1000)
+        now = time.time()
+        elapsed_ms = (now - start_time) * 1000
+        response_time_ms = int(elapsed_ms)
+        if audio_quality_score is None:
+            audio_quality_score = session_data.get("audio_quality")
+        if user_satisfaction_score is None:
+            user_satisfaction_score = session_data.get("user_satisfaction")
         
         # Create metrics
         metrics = VoiceMetrics(
@@ -127,13 +175,18 @@ class VoiceMonitoringService:
             audio_duration_seconds=audio_duration_seconds
         )
         
-        # Record metrics
+        # Record metrics, keeping the interruption total in step with evictions
+        if len(self.metrics_history) == self.metrics_history.maxlen:
+            self.history_interruptions -= self.metrics_history[0].interruption_count
         self.metrics_history.append(metrics)
+        self.history_interruptions += metrics.interruption_count
         self.total_requests += 1
         
         if error:
             self.error_count += 1
         
+        self.windows.record(elapsed_ms, error=error is not None, cache_hit=cache_hit, now=now)
+        
         # Clean up session
         del self.active_sessions[request_id]
         if request_id in self.session_start_times:
@@ -142,7 +195,7 @@ class VoiceMonitoringService:
         # Update performance stats
         self._update_performance_stats(metrics, error is not None)
         
-        logger.info(
+        logger.debug(
             "Voice session ended",
             request_id=request_id,
             response_time_ms=response_time_ms,
@@ -154,40 +207,73 @@ class VoiceMonitoringService:
         
         return metrics
     
-    def _update_performance_stats(self, metrics: VoiceMetrics, has_error: bool) -> None:
-        """Update aggregated performance statistics"""
-        self.performance_stats.total_requests = self.total_requests
-        self.performance_stats.error_rate = self.error_count / max(self.total_requests, 1)
+    def end_reported_session(self, session_id: str, audio_duration_seconds: Optional[float] = None) -> None:
+        """End a client-reported or relayed session
         
-        # Update response time average
-        if self.total_requests == 1:
-            self.performance_stats.average_response_time_ms = metrics.response_time_ms
-        else:
-            # Rolling average
-            current_avg = self.performance_stats.average_response_time_ms
-            self.performance_stats.average_response_time_ms = (
-                (current_avg * (self.total_requests - 1) + metrics.response_time_ms) / self.total_requests
-            )
+        These sessions last as long as the conversation, so only their
+        scores, interruptions and audio duration are kept; request counts,
+        response time averages, error rates and latency windows only
+        describe token requests. The interruption rate covers both.
+        """
+        session_data = self.active_sessions.pop(session_id, None)
+        if session_data is None:
+            logger.warning("Attempted to end non-existent session", request_id=session_id)
+            return
+        self.session_start_times.pop(session_id, None)
         
+        self._fold_scores(session_data.get("audio_quality"), session_data.get("user_satisfaction"))
+        self.reported_sessions += 1
+        self.reported_interruptions += session_data["interruptions"]
+        if audio_duration_seconds is not None:
+            self.reported_audio_seconds += audio_duration_seconds
+        self._update_interruption_rate()
+        self.performance_stats.last_updated = datetime.now()
+        
+        logger.debug(
+            "Reported voice session ended",
+            request_id=session_id,
+            interruptions=session_data["interruptions"],
+            audio_duration_seconds=audio_duration_seconds
+        )
+    
+    def _fold_scores(self, audio_quality: Optional[float], user_satisfaction: Optional[float]) -> None:
+        """Fold session scores into the quality and satisfaction averages"""
         # Update audio quality average
-        if metrics.audio_quality_score is not None:
+        if audio_quality is not None:
             if self.performance_stats.average_audio_quality == 0.0:
-                self.performance_stats.average_audio_quality = metrics.audio_quality_score
+                self.performance_stats.average_audio_quality = audio_quality
             else:
                 # Simple rolling average for quality
                 self.performance_stats.average_audio_quality = (
-                    (self.performance_stats.average_audio_quality + metrics.audio_quality_score) / 2
+                    (self.performance_stats.average_audio_quality + audio_quality) / 2
                 )
         
         # Update user satisfaction average
-        if metrics.user_satisfaction_score is not None:
+        if user_satisfaction is not None:
             if self.performance_stats.average_user_satisfaction == 0.0:
-                self.performance_stats.average_user_satisfaction = metrics.user_satisfaction_score
+                self.performance_stats.average_user_satisfaction = user_satisfaction
             else:
                 # Simple rolling average for satisfaction
                 self.performance_stats.average_user_satisfaction = (
-                    (self.performance_stats.average_user_satisfaction + metrics.user_satisfaction_score) / 2
+                    (self.performance_stats.average_user_satisfaction + user_satisfaction) / 2
                 )
+    
+    def _update_performance_stats(self, metrics: VoiceMetrics, has_error: bool) -> None:
+        """Update aggregated performance statistics"""
+        self.performance_stats.total_requests = self.total_requests
+        self.performance_stats.error_rate = self.error_count / max(self.total_requests, 1)
+        
+        # Update response time average
+        if self.total_requests == 1:
+            self.performance_stats.average_response_time_ms = metrics.response_time_ms
+        else:
+            # Rolling average
+            current_avg = self.performance_stats.average_response_time_ms
+            self.performance_stats.average_response_time_ms = (
+                (current_avg * (self.total_requests - 1) + metrics.response_time_ms) / self.total_requests
+            )
+        
+        self._fold_scores(metrics.audio_quality_score, metrics.user_satisfaction_score)
         
         # Update voice distribution
         voice_type = metrics.voice_type
@@ -201,12 +287,17 @@ class VoiceMonitoringService:
             self.performance_stats.difficulty_distribution.get(difficulty, 0) + 1
         )
         
-        # Update interruption rate
-        total_interruptions = sum(m.interruption_count for m in self.metrics_history)
-        self.performance_stats.interruption_rate = total_interruptions / max(self.total_requests, 1)
+        self._update_interruption_rate()
         
         self.performance_stats.last_updated = datetime.now()
     
+    def _update_interruption_rate(self) -> None:
+        """Interruptions per session, over token requests and reported sessions"""
+        self.performance_stats.interruption_rate = (
+            (self.history_interruptions + self.reported_interruptions)
+            / max(self.total_requests + self.reported_sessions, 1)
+        )
+    
     def get_performance_stats(self) -> VoicePerformanceStats:
         """Get current performance statistics"""
         return self.performance_stats
@@ -250,28 +341,108 @@ class VoiceMonitoringService:
         
         return dict(voice_stats)
     
+    def reap_stale_sessions(self, max_age_seconds: float, now: Optional[float] = None) -> int:
+        """Drop sessions that were never ended (client disconnects, cancelled requests)"""
+        now = time.time() if now is None else now
+        cutoff = now - max_age_seconds
+        stale = [
+            request_id for request_id, session in self.active_sessions.items()
+            if session["start_time"] < cutoff
+        ]
+        
+        for request_id in stale:
+            del self.active_sessions[request_id]
+            self.session_start_times.pop(request_id, None)
+        
+        if stale:
+            self.reaped_sessions += len(stale)
+            logger.warning("Reaped stale voice sessions", count=len(stale), max_age_seconds=max_age_seconds)
+        
+        return len(stale)
+    
+    async def run_session_reaper(self, interval_seconds: float, max_age_seconds: float) -> None:
+        """Periodically reap stale sessions until cancelled"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.reap_stale_sessions(max_age_seconds)
+            except Exception as e:
+                logger.error("Session reaper failed", error=str(e))
+    
+    def get_session_stats(self) -> Dict[str, Any]:
+        """Get session tracking counters and approximate memory footprint"""
+        tracked_bytes = (
+            sys.getsizeof(self.active_sessions)
+            + sys.getsizeof(self.session_start_times)
+            + sum(sys.getsizeof(session) for session in self.active_sessions.values())
+        )
+        return {
+            "active_sessions": len(self.active_sessions),
+            "tracked_start_times": len(self.session_start_times),
+            "approx_memory_bytes": tracked_bytes,
+            "reaped_sessions": self.reaped_sessions,
+            "session_collisions": self.session_collisions,
+            "reported_sessions": self.reported_sessions,
+            "reported_interruptions": self.reported_interruptions,
+            "reported_audio_seconds": round(self.reported_audio_seconds, 1)
+        }
+    
+    def record_stage_timings(self, durations: Dict[str, float]) -> None:
+        """Record per-stage durations (milliseconds) from a request trace"""
+        for stage, duration_ms in durations.items():
+            histogram = self.stage_histograms.get(stage)
+            if histogram is None:
+                histogram = self.stage_histograms[stage] = LatencyHistogram()
+            histogram.observe(duration_ms)
+    
+    def get_stage_timings(self) -> Dict[str, Dict[str, Any]]:
+        """Get latency distribution per request stage"""
+        return {stage: histogram.to_dict() for stage, histogram in self.stage_histograms.items()}
+    
+    def get_window_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get request, error, cache and latency stats for the 1m / 5m / 1h windows"""
+        return self.windows.snapshot()
+    
     def get_health_status(self) -> Dict[str, Any]:
-        """Get health status of voice monitoring"""
+        """Get health status of voice monitoring based on recent time windows"""
         active_sessions = len(self.active_sessions)
-        recent_errors = sum(1 for m in list(self.metrics_history)[-10:] if m.response_time_ms > 10000)
+        windows = self.windows.snapshot()
+        last_minute = windows["1m"]
+        last_five = windows["5m"]
+        recent_errors = last_minute["errors"] + last_minute["slow_requests"]
+        
+        degraded = (
+            last_minute["errors"] >= 3
+            and last_minute["error_rate"] >= settings.monitoring_degraded_error_rate
+        ) or last_minute["slow_requests"] >= 3
         
         return {
-            "status": "healthy" if recent_errors < 3 else "degraded",
+            "status": "degraded" if degraded else "healthy",
             "active_sessions": active_sessions,
             "total_requests": self.total_requests,
-            "error_rate": self.performance_stats.error_rate,
-            "average_response_time_ms": self.performance_stats.average_response_time_ms,
+            "error_rate": last_five["error_rate"],
+            "average_response_time_ms": last_five["average_latency_ms"],
             "recent_errors": recent_errors,
+            "windows": windows,
+            "sessions": self.get_session_stats(),
             "last_updated": self.performance_stats.last_updated.isoformat()
         }
     
     def reset_metrics(self) -> None:
         """Reset all metrics (for testing)"""
         self.metrics_history.clear()
+        self.history_interruptions = 0
         self.active_sessions.clear()
         self.session_start_times.clear()
+        self.windows.reset()
+        self.stage_histograms.clear()
         self.performance_stats = VoicePerformanceStats()
         self.error_count = 0
         self.total_requests = 0
+        self.reaped_sessions = 0
+        self.session_collisions = 0
+        self.reported_sessions = 0
+        self.reported_interruptions = 0
+        self.reported_audio_seconds = 0.0
         
         logger.info("Voice monitoring metrics reset")
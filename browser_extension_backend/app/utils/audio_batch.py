@@ -0,0 +1,228 @@
+"""
+Offline audio quality scoring for recorded voice sessions
+
+Walks a directory of WAV and raw PCM16 recordings, scores every file with
+the same engine as ``POST /v1/voice/audio`` on a process pool and writes a
+columnar JSON summary with per-voice and per-difficulty aggregates:
+
+    python -m app.utils.audio_batch recordings/ --output quality.json
+
+Voice and difficulty come from path components or filename tokens, e.g.
+``recordings/cedar/savage/game1.wav`` or ``game1_marin_easy.pcm``. Files are
+memory-mapped, so workers read sample data straight from the page cache.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models.token import DifficultyLevel, VoiceType
+
+AUDIO_SUFFIXES = {".wav", ".pcm", ".raw"}
+VOICES = {voice.value for voice in VoiceType}
+DIFFICULTIES = {difficulty.value for difficulty in DifficultyLevel}
+METRICS = ("duration_seconds", "rms_dbfs", "peak_dbfs", "clipping_ratio",
+           "silence_ratio", "spectral_flatness", "quality_score")
+
+
+def find_audio_files(root: Path) -> List[Path]:
+    return sorted(
+        Path(dirpath) / name
+        for dirpath, _, names in os.walk(root)
+        for name in names
+        if Path(name).suffix.lower() in AUDIO_SUFFIXES
+    )
+
+
+def classify(path: Path, root: Path) -> Tuple[str, str]:
+    """(voice, difficulty) from the path below ``root``, "unknown" when absent"""
+    tokens = [
+        token
+        for part in path.relative_to(root).with_suffix("").parts
+        for token in re.split(r"[\W_]+", part.lower())
+    ]
+    voice = next((token for token in tokens if token in VOICES), "unknown")
+    difficulty = next((token for token in tokens if token in DIFFICULTIES), "unknown")
+    return voice, difficulty
+
+
+def wav_data_chunk(buffer: mmap.mmap) -> Tuple[int, int, int, int]:
+    """(data offset, data size, sample rate, channels) of a PCM16 WAV"""
+    from app.services.audio_convert import check_pcm16_format
+
+    if buffer[:4] != b"RIFF" or buffer[8:12] != b"WAVE":
+        raise ValueError("not a RIFF/WAVE file")
+    offset, fmt = 12, None
+    while offset + 8 <= len(buffer):
+        chunk_id, size = struct.unpack_from("<4sI", buffer, offset)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack_from("<HHIIHH", buffer, body)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            audio_format, channels, sample_rate, _, _, bits = fmt
+            check_pcm16_format(audio_format, channels, sample_rate, bits)
+            return body, min(size, len(buffer) - body), sample_rate, channels
+        offset = body + size + (size & 1)
+    raise ValueError("no data chunk")
+
+
+def score_file(job: Tuple[str, int, int]) -> Dict[str, Any]:
+    """Score one file; runs in a worker process"""
+    from app.services.audio_quality import analyze_pcm16
+
+    path, default_rate, default_channels = job
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("empty file")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                if path.lower().endswith(".wav"):
+                    offset, size, sample_rate, channels = wav_data_chunk(buffer)
+                else:
+                    offset, size, sample_rate, channels = 0, len(buffer), default_rate, default_channels
+                failure = None
+                with memoryview(buffer) as view, view[offset:offset + size] as data:
+                    try:
+                        analysis = analyze_pcm16(data, sample_rate, channels)
+                    except Exception as e:
+                        # Handled here: the traceback keeps arrays over the mapping alive,
+                        # and neither the view nor the mmap can close while it exists
+                        failure = f"analysis failed: {type(e).__name__}: {e}"
+        if failure:
+            raise ValueError(failure)
+        return {"path": path, "error": None, **analysis.to_dict()}
+    except (OSError, ValueError, struct.error) as e:
+        return {"path": path, "error": str(e)}
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def aggregate(rows: List[Dict[str, Any]], threshold: float) -> Dict[str, Any]:
+    scores = sorted(row["quality_score"] for row in rows)
+    if not scores:
+        return {"files": 0}
+    return {
+        "files": len(scores),
+        "audio_seconds": round(sum(row["duration_seconds"] for row in rows), 2),
+        "mean_quality": round(sum(scores) / len(scores), 4),
+        "p10_quality": _percentile(scores, 0.10),
+        "median_quality": _percentile(scores, 0.50),
+        "p90_quality": _percentile(scores, 0.90),
+        "below_threshold": round(sum(score < threshold for score in scores) / len(scores), 4),
+        **{
+            f"mean_{metric}": round(sum(row[metric] for row in rows) / len(rows), 4)
+            for metric in ("rms_dbfs", "clipping_ratio", "silence_ratio", "spectral_flatness")
+        }
+    }
+
+
+def summarize(results: List[Dict[str, Any]], threshold: float) -> Dict[str, Any]:
+    columns: Dict[str, List[Any]] = {name: [] for name in ("path", "voice", "difficulty", "error", *METRICS)}
+    for row in results:
+        for name, values in columns.items():
+            values.append(row.get(name))
+
+    scored = [row for row in results if row["error"] is None]
+    groups: Dict[str, Dict[str, List[Dict[str, Any]]]] = {"by_voice": {}, "by_difficulty": {}, "by_voice_difficulty": {}}
+    for row in scored:
+        groups["by_voice"].setdefault(row["voice"], []).append(row)
+        groups["by_difficulty"].setdefault(row["difficulty"], []).append(row)
+        groups["by_voice_difficulty"].setdefault(f"{row['voice']}/{row['difficulty']}", []).append(row)
+
+    return {
+        "threshold": threshold,
+        "overall": aggregate(scored, threshold),
+        **{
+            name: {key: aggregate(rows, threshold) for key, rows in sorted(group.items())}
+            for name, group in groups.items()
+        },
+        "errors": len(results) - len(scored),
+        "columns": columns
+    }
+
+
+def run(
+    root: Path,
+    workers: Optional[int],
+    sample_rate: int,
+    channels: int,
+    chunksize: int,
+    progress: bool = True
+) -> Tuple[List[Dict[str, Any]], float]:
+    """Score every audio file under ``root``; returns (rows, elapsed seconds)"""
+    paths = find_audio_files(root)
+    jobs = [(str(path), sample_rate, channels) for path in paths]
+    labels = [classify(path, root) for path in paths]
+
+    results: List[Dict[str, Any]] = []
+    started = last_report = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for row, (voice, difficulty) in zip(pool.map(score_file, jobs, chunksize=chunksize), labels):
+            row["path"] = os.path.relpath(row["path"], root)
+            row["voice"], row["difficulty"] = voice, difficulty
+            results.append(row)
+
+            now = time.perf_counter()
+            if progress and (now - last_report >= 0.5 or len(results) == len(jobs)):
+                last_report = now
+                rate = len(results) / max(now - started, 1e-9)
+                print(f"\r{len(results)}/{len(jobs)} files  {rate:,.0f} files/s", end="", file=sys.stderr, flush=True)
+    if progress and jobs:
+        print(file=sys.stderr)
+    return results, time.perf_counter() - started
+
+
+def main() -> None:
+    # Only the default threshold comes from settings, which require a key this tool never uses
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline")
+    from app.config.settings import settings
+    from app.services.audio_convert import check_pcm16_format
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--output", type=Path, default=Path("audio_quality.json"))
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=16, help="files per worker task")
+    parser.add_argument("--sample-rate", type=int, default=24000, help="sample rate of raw PCM files")
+    parser.add_argument("--channels", type=int, default=1, help="channel count of raw PCM files")
+    parser.add_argument("--threshold", type=float, default=settings.voice_quality_threshold,
+                        help="quality threshold (default: VOICE_QUALITY_THRESHOLD)")
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args()
+    try:
+        check_pcm16_format(1, args.channels, args.sample_rate, 16)
+    except ValueError as e:
+        parser.error(f"--sample-rate/--channels for raw PCM: {e}")
+    if args.chunksize < 1 or (args.workers is not None and args.workers < 1):
+        parser.error("--workers and --chunksize must be at least 1")
+
+    results, elapsed = run(
+        args.directory, args.workers, args.sample_rate, args.channels, args.chunksize, progress=not args.quiet
+    )
+    summary = summarize(results, args.threshold)
+    summary["elapsed_seconds"] = round(elapsed, 3)
+    summary["files_per_second"] = round(len(results) / max(elapsed, 1e-9), 1)
+    args.output.write_text(json.dumps(summary, separators=(",", ":")))
+
+    print(f"Scored {len(results)} files in {elapsed:.2f}s ({summary['files_per_second']:,.1f} files/s), "
+          f"{summary['errors']} errors; wrote {args.output}")
+    print(f"  {'voice':<8} {'files':>7} {'mean':>7} {'p10':>7} {'median':>7} {'<thr':>7}")
+    for voice, stats in summary["by_voice"].items():
+        print(f"  {voice:<8} {stats['files']:>7} {stats['mean_quality']:>7.3f} {stats['p10_quality']:>7.3f} "
+              f"{stats['median_quality']:>7.3f} {stats['below_threshold']:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Token cache key collapse report for a replayed request trace
+
+Reads a JSON-lines trace of token request bodies (either the body itself or
+an object with a ``body`` field per line), keys every request the way the
+token cache did before canonicalization and the way it does now, and
+reports how many distinct keys collapse together and the hit rate an
+unbounded cache would reach on the replay:
+
+    python -m app.utils.cache_key_report trace.jsonl
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from pydantic import ValidationError
+
+from app.config.settings import settings
+from app.models.token import TokenRequest
+from app.services.canonical_request import canonicalize, normalize_text
+from app.services.voice_config import VoiceConfigService
+
+
+def read_trace(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                body = record.get("body")
+                yield body if isinstance(body, dict) else record
+
+
+def raw_key(request: TokenRequest) -> Tuple:
+    """Key fields as the cache used them before canonicalization"""
+    return (
+        request.model.value, request.voice.value, request.difficulty.value,
+        request.voice_quality.value, request.audio_format.value, request.enable_interruptions,
+        request.response_length, request.sports_context,
+        request.instructions or settings.default_instructions,
+    )
+
+
+def canonical_key(request: TokenRequest) -> Tuple:
+    return (
+        request.model.value, request.voice.value, request.difficulty.value,
+        request.audio_format.value, request.enable_interruptions,
+        request.response_length, request.sports_context, normalize_text(request.instructions),
+    )
+
+
+def report(bodies: Iterator[Dict[str, Any]], sport_aliases: Dict[str, str], top: int = 10) -> Dict[str, Any]:
+    raw_counts: Counter = Counter()
+    canonical_counts: Counter = Counter()
+    variants: Dict[Tuple, set] = defaultdict(set)
+    invalid = 0
+    for body in bodies:
+        try:
+            request = TokenRequest.model_validate(body)
+        except ValidationError:
+            invalid += 1
+            continue
+        raw = raw_key(request)
+        canonical = canonical_key(canonicalize(request, sport_aliases))
+        raw_counts[raw] += 1
+        canonical_counts[canonical] += 1
+        variants[canonical].add(raw)
+
+    requests = sum(raw_counts.values())
+    collapsed: List[Dict[str, Any]] = [
+        {
+            "key": "/".join(str(field) for field in (key[1], key[2], key[5], key[6])),
+            "requests": canonical_counts[key],
+            "raw_keys": len(raw_keys),
+            "raw_sports_contexts": sorted({repr(raw[7]) for raw in raw_keys})[:8],
+        }
+        for key, raw_keys in sorted(variants.items(), key=lambda item: -len(item[1]))[:top]
+        if len(raw_keys) > 1
+    ]
+    return {
+        "requests": requests,
+        "invalid": invalid,
+        "raw_keys": len(raw_counts),
+        "canonical_keys": len(canonical_counts),
+        "collapse_ratio": round(len(raw_counts) / len(canonical_counts), 2) if canonical_counts else None,
+        "raw_hit_rate": round(1 - len(raw_counts) / requests, 4) if requests else None,
+        "canonical_hit_rate": round(1 - len(canonical_counts) / requests, 4) if requests else None,
+        "most_collapsed": collapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", type=Path)
+    parser.add_argument("--top", type=int, default=10, help="collapsed groups to list")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    result = report(read_trace(args.trace), VoiceConfigService().sport_aliases, args.top)
+
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"{result['requests']} requests ({result['invalid']} invalid): "
+          f"{result['raw_keys']} raw keys -> {result['canonical_keys']} canonical keys "
+          f"({result['collapse_ratio']}x)")
+    print(f"  unbounded cache hit rate on replay: {result['raw_hit_rate']:.1%} -> {result['canonical_hit_rate']:.1%}")
+    print("  most collapsed (voice/difficulty/length/sport):")
+    for group in result["most_collapsed"]:
+        print(f"    {group['key']:<32} {group['raw_keys']:>5} raw keys, {group['requests']:>7} requests  "
+              f"e.g. {', '.join(group['raw_sports_contexts'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Precompiled voice configuration snapshot for fast cold starts
+
+The snapshot is the parsed ``voice_personalities.yaml`` serialized as
+compact JSON together with a digest of the YAML it came from. JSON rather
+than ``marshal``, whose format is only guaranteed within one Python version:
+the snapshot is committed next to the settings (the Vercel bundle does not
+include ``shared_config/``, so there is no YAML to fall back to) and must
+load on whatever runtime the deploy picks. Rebuild it whenever the YAML
+changes:
+
+    python -m app.utils.config_snapshot
+    python -m app.utils.config_snapshot --check   # exit 1 if missing or stale
+
+Loading it skips YAML parsing entirely; a snapshot whose digest no longer
+matches the YAML on disk is ignored.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+SNAPSHOT_VERSION = 2
+DEFAULT_SNAPSHOT_PATH = Path(__file__).parent.parent / "config" / "voice_personalities.snapshot"
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def build_snapshot(yaml_path: Path, snapshot_path: Path = DEFAULT_SNAPSHOT_PATH) -> Dict[str, Any]:
+    """Parse the YAML and write the snapshot atomically"""
+    import yaml
+
+    source = Path(yaml_path).read_bytes()
+    config = yaml.load(source, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)) or {}
+    try:
+        payload = json.dumps({
+            "version": SNAPSHOT_VERSION,
+            "source_digest": _digest(source),
+            "config": config
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        representable = json.loads(payload)["config"] == config
+    except TypeError:
+        representable = False
+    if not representable:
+        raise ValueError(f"{yaml_path} has values JSON cannot represent (e.g. dates or non-string keys)")
+
+    tmp_path = Path(f"{snapshot_path}.tmp")
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, snapshot_path)
+    return config
+
+
+def load_snapshot(snapshot_path: Path, yaml_path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """Parsed config from the snapshot, or None if it is missing, unreadable or stale"""
+    try:
+        snapshot = json.loads(Path(snapshot_path).read_bytes())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable config snapshot", path=str(snapshot_path), error=str(e))
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        logger.warning("Ignoring config snapshot with unknown version", path=str(snapshot_path))
+        return None
+
+    # Without the YAML (e.g. not bundled) the snapshot is the only source
+    if yaml_path is not None and Path(yaml_path).exists():
+        if _digest(Path(yaml_path).read_bytes()) != snapshot["source_digest"]:
+            logger.warning("Ignoring stale config snapshot", path=str(snapshot_path))
+            return None
+
+    return snapshot["config"]
+
+
+def main() -> None:
+    from app.utils.yaml_loader import yaml_loader
+
+    parser = argparse.ArgumentParser(description="Build the precompiled voice configuration snapshot")
+    parser.add_argument("--yaml", type=Path, default=yaml_loader.config_path)
+    parser.add_argument("--output", type=Path, default=DEFAULT_SNAPSHOT_PATH)
+    parser.add_argument("--check", action="store_true", help="only verify the snapshot matches the YAML")
+    args = parser.parse_args()
+
+    if args.check:
+        if not args.yaml.exists() or load_snapshot(args.output, args.yaml) is None:
+            print(f"{args.output} is missing or stale; run python -m app.utils.config_snapshot", file=sys.stderr)
+            sys.exit(1)
+        print(f"{args.output} matches {args.yaml}")
+        return
+
+    config = build_snapshot(args.yaml, args.output)
+    print(f"Wrote {args.output} ({len(config)} sections from {args.yaml})")
+
+
+if __name__ == "__main__":
+    main()
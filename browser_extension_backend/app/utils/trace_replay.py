@@ -0,0 +1,223 @@
+"""
+Replay a captured token request trace at N x speed against a fake upstream
+
+Reads the records written with TRACE_CAPTURE_ENABLED (rotated files may be
+passed together), starts a local stand-in for the OpenAI sessions API,
+points the service at it and drives the app in-process, sending each
+request at its original offset divided by ``--speed``. Origins, client IPs
+and Idempotency-Keys are rebuilt from their hashes, so per-client limits,
+idempotent retries and the token cache see the same key structure as in
+production:
+
+    python -m app.utils.trace_replay traces/token_requests.jsonl.1 traces/token_requests.jsonl --speed 10
+
+Settings are read from the environment as usual; ``--set NAME=VALUE``
+overrides them for the replay. The service's own clocks (token TTLs, rate
+limiter refill, token lifetimes) are not compressed, so scale those by the
+same factor to model the original time base.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+def read_records(paths: List[Path]) -> List[Dict[str, Any]]:
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    records.sort(key=lambda record: record["t"])
+    return records
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+
+class FakeUpstream:
+    """Sessions and models endpoints that answer after a fixed delay"""
+
+    def __init__(self, latency_ms: float, token_lifetime: int):
+        self.latency = latency_ms / 1000
+        self.token_lifetime = token_lifetime
+        self.sessions = 0
+        self._ids = itertools.count()
+        self.app = Starlette(routes=[
+            Route("/v1/realtime/sessions", self.create_session, methods=["POST"]),
+            Route("/v1/models", self.models, methods=["GET"]),
+        ])
+
+    async def create_session(self, request: Request) -> JSONResponse:
+        data = await request.json()
+        await asyncio.sleep(self.latency)
+        self.sessions += 1
+        n = next(self._ids)
+        expires_at = int(time.time()) + self.token_lifetime
+        return JSONResponse({
+            "id": f"sess_replay_{n}", "client_secret": {"value": f"ek_replay_{n}", "expires_at": expires_at},
+            "expires_at": expires_at, "model": data.get("model"), "voice": data.get("voice"),
+            "instructions": data.get("instructions"),
+        })
+
+    async def models(self, request: Request) -> JSONResponse:
+        return JSONResponse({"object": "list", "data": []})
+
+
+def request_for(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Body and headers that reproduce a record's request shape"""
+    headers = {"content-type": "application/json"}
+    client = int(record["c"] or "0", 16)
+    headers["x-forwarded-for"] = f"10.{client >> 16 & 255}.{client >> 8 & 255}.{client & 255}"
+    if record["o"]:
+        headers["origin"] = f"chrome-extension://{record['o']}"
+    if record.get("k"):
+        headers["idempotency-key"] = record["k"]
+
+    config = record["cfg"]
+    if config is None:
+        body = {"voice": "unknown"}  # the original failed validation
+    else:
+        body = {key: value for key, value in config.items() if value is not None}
+        if config.get("instructions"):
+            body["instructions"] = f"Replayed instructions {config['instructions']}"
+    return {"content": json.dumps(body), "headers": headers}
+
+
+async def replay(records: List[Dict[str, Any]], speed: float, upstream: FakeUpstream, port: int) -> Dict[str, Any]:
+    server = uvicorn.Server(uvicorn.Config(upstream.app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    from app.core.container import container
+    from app.main import app
+    await container.initialize()
+
+    statuses: Counter = Counter()
+    mismatched = 0
+    latencies: List[float] = []
+    lag: List[float] = []
+
+    async def send(client: httpx.AsyncClient, record: Dict[str, Any]) -> None:
+        nonlocal mismatched
+        started = time.perf_counter()
+        response = await client.post("/v1/realtime/token", **request_for(record))
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses[response.status_code] += 1
+        if response.status_code != record["s"]:
+            mismatched += 1
+
+    transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 0))
+    async with httpx.AsyncClient(transport=transport, base_url="http://replay", timeout=60) as client:
+        first = records[0]["t"]
+        start = time.perf_counter()
+        tasks = []
+        for record in records:
+            due = (record["t"] - first) / speed
+            delay = due - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lag.append(max(0.0, -delay) * 1000)
+            tasks.append(asyncio.create_task(send(client, record)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    services = {
+        "token_cache": container.cache.get_stats(),
+        "idempotency": container.idempotency.get_stats(),
+        "rate_limiter": container.rate_limiter.get_stats(),
+    }
+    await container.cleanup()
+    server.should_exit = True
+    await serving
+
+    original = Counter(record["s"] for record in records)
+    span = records[-1]["t"] - first
+    return {
+        "requests": len(records),
+        "trace_seconds": round(span, 2),
+        "replay_seconds": round(elapsed, 2),
+        "effective_speed": round(span / elapsed, 2) if elapsed else None,
+        "dispatch_lag_p99_ms": percentile(lag, 0.99),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "original_statuses": {str(code): count for code, count in sorted(original.items())},
+        "status_mismatches": mismatched,
+        "latency_ms": {"p50": percentile(latencies, 0.5), "p99": percentile(latencies, 0.99)},
+        "original_latency_ms": {
+            "p50": percentile([record["ms"] for record in records], 0.5),
+            "p99": percentile([record["ms"] for record in records], 0.99),
+        },
+        "upstream_sessions": upstream.sessions,
+        "original_upstream_sessions": sum(1 for record in records if record["m"]),
+        **services,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", type=Path, nargs="+", help="trace files, oldest first")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression factor")
+    parser.add_argument("--limit", type=int, help="replay only the first N records")
+    parser.add_argument("--upstream-latency-ms", type=float, default=300.0, help="fake session creation latency")
+    parser.add_argument("--token-lifetime", type=int, default=60, help="seconds fake tokens stay valid")
+    parser.add_argument("--port", type=int, default=18790, help="port for the fake upstream")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="setting override")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    records = read_records(args.trace)[:args.limit]
+    if not records:
+        parser.error("trace is empty")
+
+    # Settings are read on import, so the environment is fixed up first
+    os.environ.setdefault("OPENAI_API_KEY", "sk-replay")
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    os.environ.update({
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.port}/v1",
+        "TRACE_CAPTURE_ENABLED": "false",
+        "ORIGIN_VALIDATION_ENABLED": "false",
+        "TRUSTED_PROXY_COUNT": "1",  # client IPs are replayed as X-Forwarded-For
+    })
+    for override in args.set:
+        name, _, value = override.partition("=")
+        os.environ[name.upper()] = value
+
+    upstream = FakeUpstream(args.upstream_latency_ms, args.token_lifetime)
+    result = asyncio.run(replay(records, args.speed, upstream, args.port))
+
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"{result['requests']} requests: {result['trace_seconds']}s of trace in {result['replay_seconds']}s "
+          f"({result['effective_speed']}x, dispatch lag p99 {result['dispatch_lag_p99_ms']} ms)")
+    print(f"  statuses        {result['statuses']}  (captured {result['original_statuses']}, "
+          f"{result['status_mismatches']} differ)")
+    print(f"  latency         p50 {result['latency_ms']['p50']} ms, p99 {result['latency_ms']['p99']} ms  "
+          f"(captured p50 {result['original_latency_ms']['p50']} ms, p99 {result['original_latency_ms']['p99']} ms)")
+    print(f"  upstream mints  {result['upstream_sessions']}  (captured {result['original_upstream_sessions']})")
+    print(f"  token cache     {result['token_cache']}")
+    print(f"  idempotency     {result['idempotency']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,10 @@
 YAML configuration loader utility
 """
 
+import asyncio
+import contextlib
 import os
-import yaml
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 import structlog
 
@@ -12,15 +13,21 @@ logger = structlog.get_logger(__name__)
 
 
 class YAMLConfigLoader:
-    """Utility class for loading YAML configuration files"""
+    """Utility class for loading YAML configuration files
     
-    def __init__(self, config_path: str = None):
+    The file is parsed once and cached; ``watch`` polls its inode, mtime and
+    size and re-parses only when one of them changes.
+    """
+    
+    def __init__(self, config_path: str = None, snapshot_path: str = None):
         """
         Initialize the YAML loader
         
         Args:
             config_path: Path to the YAML config file. If None, will look for 
                         shared_config/voice_personalities.yaml relative to project root
+            snapshot_path: Optional precompiled snapshot (see app.utils.config_snapshot)
+                        tried before parsing the YAML
         """
         if config_path is None:
             # Look for shared config relative to project root
@@ -28,11 +35,19 @@ class YAMLConfigLoader:
             config_path = project_root / "shared_config" / "voice_personalities.yaml"
         
         self.config_path = Path(config_path)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
         self._config_cache: Dict[str, Any] = {}
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._failed_signature: Optional[Tuple[int, int, int]] = None
+        self._reload_callbacks: List[Callable[[Dict[str, Any]], None]] = []
         
+    def _file_signature(self) -> Tuple[int, int, int]:
+        stat = os.stat(self.config_path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
     def load_config(self) -> Dict[str, Any]:
         """
-        Load the YAML configuration file
+        Load the YAML configuration file, parsing it only on first use
         
         Returns:
             Dictionary containing the parsed YAML configuration
@@ -41,14 +56,50 @@ class YAMLConfigLoader:
             FileNotFoundError: If the config file doesn't exist
             yaml.YAMLError: If the YAML file is malformed
         """
+        if self._signature is None:
+            config = self._load_snapshot()
+            if config is not None:
+                self._config_cache, self._signature = config, self._snapshot_signature()
+            else:
+                self._config_cache, self._signature = self._parse()
+        return self._config_cache
+    
+    def _load_snapshot(self) -> Optional[Dict[str, Any]]:
+        if self.snapshot_path is None:
+            return None
+        from app.utils.config_snapshot import load_snapshot
+        config = load_snapshot(self.snapshot_path, self.config_path)
+        if config is not None:
+            logger.info("Loaded configuration snapshot", path=str(self.snapshot_path))
+        else:
+            logger.warning(
+                "No usable configuration snapshot, parsing YAML instead",
+                snapshot_path=str(self.snapshot_path),
+                config_path=str(self.config_path)
+            )
+        return config
+    
+    def _snapshot_signature(self) -> Tuple[int, int, int]:
+        # The snapshot matched the YAML on disk (if any), so track that file from here on
+        try:
+            return self._file_signature()
+        except FileNotFoundError:
+            return (0, 0, 0)
+    
+    def _parse(self) -> Tuple[Dict[str, Any], Tuple[int, int, int]]:
+        """Read and parse the file, returning the config and the file signature it came from"""
+        # Imported here so loading from a snapshot never pays for PyYAML
+        import yaml
+        
         if not self.config_path.exists():
             raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
         
         try:
+            signature = self._file_signature()
             with open(self.config_path, 'r', encoding='utf-8') as file:
-                config = yaml.safe_load(file)
-                logger.info("Loaded YAML configuration", path=str(self.config_path))
-                return config
+                config = yaml.load(file, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)) or {}
+            logger.info("Loaded YAML configuration", path=str(self.config_path))
+            return config, signature
         except yaml.YAMLError as e:
             logger.error("Failed to parse YAML configuration", error=str(e), path=str(self.config_path))
             raise
@@ -72,9 +123,46 @@ class YAMLConfigLoader:
         return config.get('sports_contexts', {})
     
     def reload_config(self) -> Dict[str, Any]:
-        """Force reload the configuration from disk"""
-        self._config_cache.clear()
-        return self.load_config()
+        """Force reload the configuration from disk
+        
+        The previous configuration stays cached if the new file fails to parse.
+        """
+        self._config_cache, self._signature = self._parse()
+        return self._config_cache
+    
+    def has_changed(self) -> bool:
+        """Whether the file on disk differs from the cached parse (and from the last failed one)"""
+        try:
+            signature = self._file_signature()
+        except FileNotFoundError:
+            return False
+        return signature != self._signature and signature != self._failed_signature
+    
+    def add_reload_callback(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a callback invoked with the new configuration after a reload"""
+        self._reload_callbacks.append(callback)
+    
+    async def watch(self, interval_seconds: float) -> None:
+        """Poll the file and reload it when it changes, until cancelled"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            if not self.has_changed():
+                continue
+            try:
+                config, signature = await asyncio.to_thread(self._parse)
+            except Exception:
+                # Keep serving the last good config until the file changes again
+                with contextlib.suppress(OSError):
+                    self._failed_signature = self._file_signature()
+                continue
+            
+            self._config_cache, self._signature = config, signature
+            logger.info("YAML configuration changed on disk", path=str(self.config_path))
+            for callback in self._reload_callbacks:
+                try:
+                    callback(config)
+                except Exception as e:
+                    logger.error("YAML configuration reload callback failed", error=str(e))
 
 
 # Global instance for easy access
@@ -0,0 +1,3 @@
+"""
+Micro-benchmarks for hot-path components
+"""
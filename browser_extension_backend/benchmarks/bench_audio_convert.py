@@ -0,0 +1,97 @@
+"""
+Streaming audio conversion throughput and memory
+
+Streams synthetic PCM16 through ``convert_stream`` in VOICE_STREAMING_BUFFER_SIZE
+chunks for each conversion (WAV framing, stereo downmix, 24 kHz <-> 16/48 kHz
+resampling) and reports input MB/s plus the peak traced allocation for two
+stream lengths, which should match if memory is independent of length.
+
+    python -m benchmarks.bench_audio_convert --seconds 60 --chunk-size 4096
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.services.audio_convert import convert_stream
+
+CONVERSIONS = {
+    "pcm->wav 24k": dict(output_format="wav"),
+    "stereo->mono 24k": dict(channels=2),
+    "24k->16k": dict(target_rate=16000),
+    "24k->48k": dict(target_rate=48000),
+    "16k->24k": dict(sample_rate=16000, target_rate=24000),
+    "48k->24k": dict(sample_rate=48000, target_rate=24000),
+    "stereo 48k wav->24k wav": dict(sample_rate=48000, channels=2, target_rate=24000, output_format="wav"),
+}
+
+
+def chunked_tone(seconds: float, sample_rate: int, channels: int, chunk_size: int):
+    """Yield a 440 Hz tone as PCM16 chunks without materializing the whole clip"""
+    samples_per_chunk = chunk_size // (2 * channels)
+    total = int(seconds * sample_rate)
+    for start in range(0, total, samples_per_chunk):
+        t = np.arange(start, min(start + samples_per_chunk, total)) / sample_rate
+        mono = (0.5 * np.sin(2 * np.pi * 440 * t) * 32767).astype("<i2")
+        yield np.repeat(mono, channels).tobytes() if channels > 1 else mono.tobytes()
+
+
+def measure(seconds: float, chunk_size: int, options: dict) -> dict:
+    sample_rate = options.get("sample_rate", 24000)
+    channels = options.get("channels", 1)
+    input_bytes = output_bytes = 0
+    chunks = list(chunked_tone(seconds, sample_rate, channels, chunk_size))
+    input_bytes = sum(len(chunk) for chunk in chunks)
+
+    start = time.perf_counter()
+    for out in convert_stream(chunks, chunk_size=chunk_size, **options):
+        output_bytes += len(out)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for _ in convert_stream(chunked_tone(seconds, sample_rate, channels, chunk_size), chunk_size=chunk_size, **options):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "input_mb": round(input_bytes / 1e6, 2),
+        "output_mb": round(output_bytes / 1e6, 2),
+        "mb_per_s": round(input_bytes / 1e6 / elapsed, 1),
+        "realtime_factor": round(seconds / elapsed, 1),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--chunk-size", type=int, default=4096)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = {
+        name: {
+            "short": measure(args.seconds, args.chunk_size, options),
+            "long": measure(args.seconds * 10, args.chunk_size, options),
+        }
+        for name, options in CONVERSIONS.items()
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.chunk_size}-byte chunks; {args.seconds:g}s and {args.seconds * 10:g}s streams")
+    print(f"  {'conversion':<26} {'MB/s':>8} {'x realtime':>11} {'peak KiB':>18}")
+    for name, result in results.items():
+        short, long = result["short"], result["long"]
+        print(f"  {name:<26} {long['mb_per_s']:>8.1f} {long['realtime_factor']:>11.1f} "
+              f"{short['peak_kib']:>8.1f} / {long['peak_kib']:<8.1f}")
+
+
+if __name__ == "__main__":
+    main()
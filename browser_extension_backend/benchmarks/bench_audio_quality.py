@@ -0,0 +1,73 @@
+"""
+Audio quality analysis throughput on synthetic PCM16 clips
+
+Generates speech-like, noisy, clipped and silent clips at AUDIO_SAMPLE_RATE
+and times ``analyze_pcm16`` on each, reporting milliseconds per clip and
+per second of audio alongside the resulting scores.
+
+    python -m benchmarks.bench_audio_quality --seconds 30 --runs 50
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+
+from app.services.audio_quality import analyze_pcm16
+
+
+def synthetic_clips(seconds: float, sample_rate: int) -> dict:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    # Harmonic "voice" gated on and off to leave pauses
+    gate = (np.sin(2 * np.pi * 0.5 * t) > -0.3).astype(np.float64)
+    speech = sum(a * np.sin(2 * np.pi * f * t) for a, f in ((0.15, 180), (0.07, 360), (0.04, 720))) * gate
+    speech += 0.001 * rng.standard_normal(t.size)
+    clips = {
+        "speech": speech,
+        "noise": 0.1 * rng.standard_normal(t.size),
+        "clipped": speech * 10,
+        "silence": np.zeros_like(t),
+    }
+    return {name: (np.clip(x, -1.0, 32767 / 32768) * 32768).astype("<i2").tobytes() for name, x in clips.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for name, pcm in synthetic_clips(args.seconds, args.sample_rate).items():
+        analysis = analyze_pcm16(pcm, args.sample_rate)
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            analyze_pcm16(pcm, args.sample_rate)
+            timings.append((time.perf_counter() - start) * 1000)
+        median_ms = statistics.median(timings)
+        results[name] = {
+            "ms_per_clip": round(median_ms, 3),
+            "ms_per_audio_second": round(median_ms / args.seconds, 4),
+            "analysis": analysis.to_dict()
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.seconds:g}s clips at {args.sample_rate} Hz (median of {args.runs} runs)")
+    for name, result in results.items():
+        print(
+            f"  {name:<8} {result['ms_per_clip']:8.3f} ms/clip  {result['ms_per_audio_second']:7.4f} ms/s  "
+            f"score={result['analysis']['quality_score']:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Cold-start cost: imports, container initialization and first token
+
+Starts fresh interpreters and times importing ``app.main``, initializing the
+service container and serving the first token request (with the upstream
+OpenAI call stubbed out), with and without COLD_START_MODE. Also prints the
+slowest imports from ``-X importtime``.
+
+    python -m benchmarks.bench_cold_start --runs 10
+    python -m benchmarks.bench_cold_start --json > cold_start.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.utils.config_snapshot import build_snapshot
+from app.utils.yaml_loader import yaml_loader
+
+CHILD = """
+import asyncio, json, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+
+from app.core.container import container
+from app.models.token import TokenRequest
+from app.services.openai_client import OpenAIClient
+
+async def fake_session(self, session_data):
+    return {"id": "sess_bench", "client_secret": {"value": "ek_bench"}, "expires_at": 0,
+            "model": session_data["model"], "voice": session_data["voice"],
+            "instructions": session_data["instructions"]}
+
+OpenAIClient.create_realtime_session = fake_session
+
+async def first_request():
+    t2 = time.perf_counter()
+    await container.initialize()
+    t3 = time.perf_counter()
+    await container.token_service.generate_token(TokenRequest(), "bench")
+    t4 = time.perf_counter()
+    await container.cleanup()
+    return t3 - t2, t4 - t3
+
+init, token = asyncio.run(first_request())
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "init_ms": init * 1000, "first_token_ms": token * 1000}))
+"""
+
+
+def child_env(cold_start: bool, snapshot_path: Path) -> dict:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-bench")
+    env.update({
+        "COLD_START_MODE": "true" if cold_start else "false",
+        "CONFIG_SNAPSHOT_PATH": str(snapshot_path),
+        "LOG_LEVEL": "WARNING",
+        "LOG_ASYNC": "false",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    return env
+
+
+def run_once(env: dict) -> dict:
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def slowest_imports(env: dict, top: int) -> list:
+    """(cumulative ms, module) for the slowest packages and app modules"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        if "." not in module or module.startswith("app."):
+            rows.append((int(cumulative) / 1000, module))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = Path(tmp) / "voice_personalities.snapshot"
+        build_snapshot(yaml_loader.config_path, snapshot_path)
+
+        for label, cold_start in (("default", False), ("cold_start_mode", True)):
+            env = child_env(cold_start, snapshot_path)
+            runs = [run_once(env) for _ in range(args.runs)]
+            results[label] = {
+                key: round(statistics.median(run[key] for run in runs), 2)
+                for key in ("import_ms", "init_ms", "first_token_ms", "process_ms")
+            }
+            results[label]["slowest_imports"] = slowest_imports(env, args.top)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for label, result in results.items():
+        print(f"{label} (median of {args.runs} fresh processes)")
+        for key in ("import_ms", "init_ms", "first_token_ms", "process_ms"):
+            print(f"  {key:<16} {result[key]:9.2f}")
+        print("  slowest imports (cumulative ms):")
+        for cumulative_ms, module in result["slowest_imports"]:
+            print(f"    {cumulative_ms:9.2f}  {module}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Event-loop cost of logging per token request
+
+Replays the log calls a token request makes and measures CPU time spent on
+the calling thread (the event loop thread in production) for the legacy
+pattern and for the current pipeline in sync, async and sampled modes.
+
+    python -m benchmarks.bench_logging --requests 5000
+"""
+
+import argparse
+import os
+import time
+
+import structlog
+
+from app.core.logging_config import configure_logging, shutdown_logging
+
+TOKEN_RESPONSE = {
+    "client_secret": "ek_" + "x" * 40,
+    "expires_at": 1703124056,
+    "session_id": "sess_abc123",
+    "instructions": "You are Parker, an enthusiastic sports commentator. " * 12,
+}
+
+
+def legacy_request(logger) -> None:
+    """Log calls made per token request before the pipeline change"""
+    logger.info("Token generation request received", request_id="req_1", token_request={"voice": "verse"})
+    logger.info("About to call container.token_service.generate_token", request_id="req_1")
+    logger.info("Voice session started", request_id="req_1", voice_type="verse", difficulty="easy")
+    logger.info("Generating token", request_id="req_1", model="gpt-realtime", voice="verse")
+    logger.info("Generated voice instructions", voice="verse", difficulty="easy", instruction_length=600)
+    logger.info("Creating OpenAI session", model="gpt-realtime", voice="verse")
+    logger.info("OpenAI session created successfully", session_id="sess_abc123")
+    logger.info("Voice session ended", request_id="req_1", response_time_ms=120)
+    logger.info("Token generated successfully", request_id="req_1", session_id="sess_abc123")
+    logger.info("Token generation successful", request_id="req_1", token_response=TOKEN_RESPONSE)
+
+
+def current_request(logger) -> None:
+    """Log calls made per token request with the current log levels"""
+    logger.info("Token generation request received", request_id="req_1", voice="verse", difficulty="easy")
+    logger.debug("Voice session started", request_id="req_1", voice_type="verse", difficulty="easy")
+    logger.info("Generating token", request_id="req_1", model="gpt-realtime", voice="verse")
+    logger.debug("Generated voice instructions", voice="verse", difficulty="easy", instruction_length=600)
+    logger.debug("Creating OpenAI session", model="gpt-realtime", voice="verse")
+    logger.info("OpenAI session created successfully", session_id="sess_abc123")
+    logger.debug("Voice session ended", request_id="req_1", response_time_ms=120)
+    logger.info("Token generated successfully", request_id="req_1", session_id="sess_abc123")
+
+
+def measure(label: str, request_fn, requests: int, **config) -> float:
+    with open(os.devnull, "w") as sink:
+        configure_logging(stream=sink, **config)
+        logger = structlog.get_logger("bench")
+        start = time.thread_time()
+        for _ in range(requests):
+            request_fn(logger)
+        elapsed = time.thread_time() - start
+        shutdown_logging()
+
+    per_request_us = elapsed / requests * 1e6
+    # Share of each wall-clock second the event loop spends logging at 1k requests/sec
+    loop_share_at_1k = per_request_us * 1e-6 * 1000
+    print(f"{label:<34} {per_request_us:9.1f} us/request {loop_share_at_1k:8.1%} of loop @1k RPS")
+    return per_request_us
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    baseline = measure("legacy calls, sync", legacy_request, args.requests, async_mode=False)
+    measure("current calls, sync", current_request, args.requests, async_mode=False)
+    measure("current calls, async", current_request, args.requests, async_mode=True)
+    best = measure("current calls, async, 10% sampled", current_request, args.requests,
+                   async_mode=True, sample_rate=0.1)
+    print(f"reduction vs legacy: {baseline / best:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
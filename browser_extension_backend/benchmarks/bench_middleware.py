@@ -0,0 +1,109 @@
+"""
+Per-request overhead of the security middleware
+
+Drives the ASGI callables directly (no server, no sockets) and reports the
+added microseconds per request against a bare endpoint, for the pure ASGI
+SecurityMiddleware and for an equivalent BaseHTTPMiddleware.
+
+    python -m benchmarks.bench_middleware --requests 20000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware.security import SecurityMiddleware
+
+ALLOWED_ORIGINS = ["https://www.espn.com", "https://nba.com", "chrome-extension://abc123"]
+ORIGINS = [b"https://www.espn.com", b"https://stats.nba.com", b"chrome-extension://abc123", b"https://www.nba.com"]
+
+
+async def endpoint(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+class LegacyStyleMiddleware(BaseHTTPMiddleware):
+    """BaseHTTPMiddleware doing the same request-ID work as the old implementation"""
+
+    async def dispatch(self, request, call_next):
+        request_id = str(uuid.uuid4())
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+def make_scope(index: int) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/v1/realtime/token",
+        "raw_path": b"/v1/realtime/token",
+        "query_string": b"",
+        "root_path": "",
+        "server": ("127.0.0.1", 8000),
+        "client": ("127.0.0.1", 50000),
+        "headers": [
+            (b"host", b"localhost"),
+            (b"content-type", b"application/json"),
+            (b"origin", ORIGINS[index % len(ORIGINS)]),
+            (b"user-agent", b"bench"),
+        ],
+    }
+
+
+def make_receive():
+    """Deliver the body once, then report the client as disconnected"""
+    sent = False
+
+    async def receive() -> dict:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"{}", "more_body": False}
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+async def send(message: dict) -> None:
+    pass
+
+
+async def run(app, requests: int) -> float:
+    scopes = [make_scope(i) for i in range(64)]
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(dict(scopes[i % 64]), make_receive(), send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main_async(requests: int) -> None:
+    bare = await run(endpoint, requests)
+    results = {
+        "SecurityMiddleware (pure ASGI)": await run(
+            SecurityMiddleware(endpoint, ALLOWED_ORIGINS, enforce_origin=True), requests
+        ),
+        "BaseHTTPMiddleware equivalent": await run(LegacyStyleMiddleware(endpoint), requests),
+    }
+    print(f"{'bare endpoint':<32} {bare:8.2f} us/request")
+    for label, per_request in results.items():
+        print(f"{label:<32} {per_request:8.2f} us/request (+{per_request - bare:.2f} us overhead)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests))
+
+
+if __name__ == "__main__":
+    main()
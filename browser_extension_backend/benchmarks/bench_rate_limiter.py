@@ -0,0 +1,43 @@
+"""
+Per-request overhead of the token-bucket rate limiter
+
+    python -m benchmarks.bench_rate_limiter --checks 200000 --keys 10000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from app.services.rate_limiter import SQLiteRateLimiter, TokenBucketRateLimiter
+
+
+def measure(label: str, limiter, keys, checks: int) -> None:
+    count = len(keys)
+    start = time.perf_counter()
+    for i in range(checks):
+        limiter.check(keys[i % count])
+    per_check_us = (time.perf_counter() - start) / checks * 1e6
+    print(f"{label:<28} {per_check_us:8.2f} us/check  {limiter.get_stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=200000)
+    parser.add_argument("--keys", type=int, default=10000)
+    args = parser.parse_args()
+
+    keys = [f"ip:10.0.{i // 256}.{i % 256}" for i in range(args.keys)]
+
+    measure("memory, hot keys", TokenBucketRateLimiter(600, 10), keys[:16], args.checks)
+    measure("memory, many keys", TokenBucketRateLimiter(600, 10), keys, args.checks)
+    measure("memory, eviction pressure", TokenBucketRateLimiter(600, 10, max_keys_per_shard=64), keys, args.checks)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_checks = max(args.checks // 20, 1000)
+        limiter = SQLiteRateLimiter(600, 10, os.path.join(tmp, "buckets.sqlite3"))
+        measure("sqlite (cross-worker)", limiter, keys, sqlite_checks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Realtime relay: concurrent sessions per core
+
+Starts a local stand-in for the Realtime API (echoes every audio append back
+as a ``response.audio.delta`` and periodically plays a response that the
+client talks over), runs the service under uvicorn with the relay pointed at
+it, and drives N client sessions that each stream 20 ms PCM16 append events
+at real-time rate. The relay process's CPU time over the measurement window
+gives the sessions one core could carry; round-trip latency through the
+relay (client -> relay -> stand-in -> relay -> client) is reported too.
+
+    python -m benchmarks.bench_relay --sessions 25 100 --seconds 10
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+SAMPLE_RATE = 24000
+FRAME_MS = 20
+RESPONSE_EVERY = 50  # appends between simulated responses
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def cpu_seconds(pid: int) -> float:
+    """utime + stime of a process (Linux)"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def run_upstream(port: int) -> None:
+    from websockets.asyncio.server import serve
+
+    async def session(connection):
+        await connection.send(json.dumps({"type": "session.created"}))
+        appended = 0
+        async for message in connection:
+            event = json.loads(message)
+            if event["type"] != "input_audio_buffer.append":
+                continue
+            appended += 1
+            if appended % RESPONSE_EVERY == 1:
+                await connection.send(json.dumps({"type": "response.created"}))
+            if appended % RESPONSE_EVERY == RESPONSE_EVERY // 2:
+                await connection.send(json.dumps({"type": "input_audio_buffer.speech_started"}))
+                await connection.send(json.dumps({"type": "response.done"}))
+            await connection.send(json.dumps({
+                "type": "response.audio.delta",
+                "event_id": event["event_id"],
+                "delta": event["audio"]
+            }))
+
+    async def main():
+        async with serve(session, "127.0.0.1", port, compression=None, max_size=None):
+            await asyncio.Future()
+
+    asyncio.run(main())
+
+
+async def client_sessions(url: str, sessions: int, seconds: float) -> dict:
+    from websockets.asyncio.client import connect
+
+    audio = base64.b64encode(bytes(SAMPLE_RATE * FRAME_MS // 1000 * 2)).decode()
+    latencies = []
+    counts = {"sent": 0, "received": 0, "failed": 0}
+
+    async def one(index: int):
+        await asyncio.sleep(index * FRAME_MS / 1000 / max(sessions, 1))  # spread frame phases
+        try:
+            async with connect(url, compression=None, max_size=None) as ws:
+                async def reader():
+                    async for message in ws:
+                        counts["received"] += 1
+                        if '"response.audio.delta"' in message:
+                            sent = int(json.loads(message)["event_id"][1:])
+                            latencies.append((time.perf_counter_ns() - sent) / 1e6)
+
+                task = asyncio.create_task(reader())
+                deadline = time.perf_counter() + seconds
+                tick = time.perf_counter()
+                while tick < deadline:
+                    await ws.send(
+                        f'{{"type":"input_audio_buffer.append","event_id":"t{time.perf_counter_ns()}","audio":"{audio}"}}'
+                    )
+                    counts["sent"] += 1
+                    tick += FRAME_MS / 1000
+                    await asyncio.sleep(max(tick - time.perf_counter(), 0))
+                await asyncio.sleep(0.2)
+                task.cancel()
+        except Exception:
+            counts["failed"] += 1
+
+    await asyncio.gather(*(one(i) for i in range(sessions)))
+    return {**counts, "latencies": latencies}
+
+
+def run_clients(args) -> dict:
+    return asyncio.run(client_sessions(*args))
+
+
+def measure(relay_port: int, relay_pid: int, sessions: int, seconds: float, processes: int) -> dict:
+    url = f"ws://127.0.0.1:{relay_port}/v1/realtime/relay?token=bench"
+    shares = [sessions // processes + (i < sessions % processes) for i in range(processes)]
+    with multiprocessing.Pool(processes) as pool:
+        pending = pool.map_async(run_clients, [(url, share, seconds) for share in shares if share])
+        time.sleep(min(1.0, seconds / 4))  # let sessions connect
+        cpu_before, wall_before = cpu_seconds(relay_pid), time.perf_counter()
+        time.sleep(seconds * 0.6)
+        cpu = cpu_seconds(relay_pid) - cpu_before
+        wall = time.perf_counter() - wall_before
+        results = pending.get()
+
+    latencies = sorted(x for result in results for x in result["latencies"])
+    utilization = cpu / wall
+    return {
+        "sessions": sessions,
+        "frames_sent": sum(result["sent"] for result in results),
+        "frames_received": sum(result["received"] for result in results),
+        "failed": sum(result["failed"] for result in results),
+        "cpu_utilization": round(utilization, 3),
+        "sessions_per_core": round(sessions / utilization) if utilization else None,
+        "p50_ms": round(latencies[len(latencies) // 2], 2) if latencies else None,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)], 2) if latencies else None,
+    }
+
+
+def wait_for(port: int, timeout: float = 20.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/livez", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("relay did not start")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[25, 100])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    upstream_port, relay_port = free_port(), free_port()
+    upstream = multiprocessing.Process(target=run_upstream, args=(upstream_port,), daemon=True)
+    upstream.start()
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "sk-bench"),
+        "RELAY_ENABLED": "true",
+        "RELAY_UPSTREAM_URL": f"ws://127.0.0.1:{upstream_port}",
+        "RELAY_MAX_SESSIONS": str(max(args.sessions) * 2),
+        "LOG_LEVEL": "WARNING",
+    }
+    relay = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(relay_port), "--log-level", "warning"],
+        env=env
+    )
+    try:
+        wait_for(relay_port)
+        results = [
+            measure(relay_port, relay.pid, sessions, args.seconds, args.client_processes)
+            for sessions in args.sessions
+        ]
+    finally:
+        relay.terminate()
+        relay.wait()
+        upstream.terminate()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{FRAME_MS} ms PCM16 appends at {SAMPLE_RATE} Hz, echoed by the stand-in; {args.seconds:g}s per run")
+    print(f"  {'sessions':>8} {'relay CPU':>10} {'sessions/core':>14} {'p50 ms':>8} {'p99 ms':>8} {'failed':>7}")
+    for result in results:
+        print(f"  {result['sessions']:>8} {result['cpu_utilization']:>10.1%} {result['sessions_per_core']:>14} "
+              f"{result['p50_ms']:>8} {result['p99_ms']:>8} {result['failed']:>7}")
+
+
+if __name__ == "__main__":
+    main()
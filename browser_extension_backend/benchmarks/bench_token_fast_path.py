@@ -0,0 +1,163 @@
+"""
+Raw-body fast path: CPU per token request on a hot cache
+
+Replays byte-identical ``POST /v1/realtime/token`` bodies straight into the
+ASGI app (no HTTP client in the measurement) with the token already cached,
+alternating rounds with TOKEN_BODY_FAST_PATH_ENABLED off and on, and reports
+the median process CPU time per request. The parse stage alone
+(validation, canonicalization and cache keying versus one digest lookup) is
+timed separately.
+
+    python -m benchmarks.bench_token_fast_path --requests 5000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from app.config.settings import settings
+from app.core.container import container
+from app.main import app
+from app.models.token import TokenRequest
+from app.services.body_digest import BodyDigestCache
+
+BODIES = [
+    json.dumps({"voice": voice, "difficulty": difficulty, "sports_context": sport, "response_length": "medium"}).encode()
+    for voice, difficulty, sport in (
+        ("verse", "easy", "basketball"), ("cedar", "savage", "NBA"), ("marin", "easy", None),
+        ("verse", "expert", "soccer"),
+    )
+]
+
+
+def prefill(bodies) -> None:
+    """Cache a token for every body so the workload never reaches upstream"""
+    service = container.token_service
+    for body in bodies:
+        prepared = service.prepare(TokenRequest.model_validate_json(body))
+        canonical = prepared.canonical
+        service.cache.set(prepared.cache_key, {
+            "client_secret": "ek_bench", "expires_at": int(time.time()) + 3600, "session_id": "sess_bench",
+            "model": canonical.model.value, "voice": canonical.voice.value, "instructions": "bench",
+            "web_rtc_url": settings.relay_upstream_url, "voice_quality": canonical.voice_quality.value,
+            "audio_format": canonical.audio_format.value, "difficulty": canonical.difficulty.value,
+            "enable_interruptions": canonical.enable_interruptions,
+            "response_length": canonical.response_length, "sports_context": canonical.sports_context,
+        }, ttl=3600)
+
+
+async def post(body: bytes) -> int:
+    """One request through the ASGI app; returns the status code"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/v1/realtime/token", "raw_path": b"/v1/realtime/token",
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode())],
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    status = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Future()  # no disconnect while the response is produced
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+async def replay(requests: int, fast_path: bool) -> dict:
+    settings.token_body_fast_path_enabled = fast_path
+    await container.initialize()
+    prefill(BODIES)
+    for body in BODIES:  # warm up
+        await post(body)
+    cpu = time.process_time()
+    for i in range(requests):
+        status = await post(BODIES[i % len(BODIES)])
+        assert status == 200, status
+    cpu = time.process_time() - cpu
+    digests = container.body_digests
+    result = {
+        "cpu_us_per_request": cpu / requests * 1e6,
+        "digest_hit_rate": digests.get_stats()["hit_rate"] if digests else None,
+    }
+    await container.cleanup()
+    return result
+
+
+def parse_stage(iterations: int) -> dict:
+    """Per-request cost of parsing and keying versus the digest lookup that replaces it"""
+    service = container.token_service
+    digests = BodyDigestCache()
+    for body in BODIES:
+        digests.put(body, service.prepare(TokenRequest.model_validate_json(body)))
+
+    start = time.process_time()
+    for i in range(iterations):
+        service.prepare(TokenRequest.model_validate_json(BODIES[i % len(BODIES)]))
+    slow = time.process_time() - start
+
+    start = time.process_time()
+    for i in range(iterations):
+        digests.get(BODIES[i % len(BODIES)])
+    fast = time.process_time() - start
+    return {"parse_us": round(slow / iterations * 1e6, 2), "digest_us": round(fast / iterations * 1e6, 2)}
+
+
+async def run(requests: int, rounds: int) -> dict:
+    settings.rate_limit_enabled = False
+    settings.health_probe_enabled = False
+    settings.metrics_enabled = False
+    await replay(requests, False)  # first round pays import and allocator warm-up
+    samples = {False: [], True: []}
+    hit_rate = None
+    for _ in range(rounds):
+        for fast_path in (False, True):
+            result = await replay(requests, fast_path)
+            samples[fast_path].append(result["cpu_us_per_request"])
+            hit_rate = result["digest_hit_rate"] or hit_rate
+    await container.initialize()
+    stage = parse_stage(requests * 10)
+    await container.cleanup()
+    return {
+        "off_cpu_us": round(statistics.median(samples[False]), 1),
+        "on_cpu_us": round(statistics.median(samples[True]), 1),
+        "digest_hit_rate": hit_rate,
+        "parse_stage": stage,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5, help="alternating off/on rounds (median reported)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.requests, args.rounds))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    off, on, stage = results["off_cpu_us"], results["on_cpu_us"], results["parse_stage"]
+    print(f"{args.requests} hot-cache token requests x {args.rounds} rounds over {len(BODIES)} distinct bodies")
+    print(f"  fast path off  {off:8.1f} us CPU/request")
+    print(f"  fast path on   {on:8.1f} us CPU/request  (digest hit rate {results['digest_hit_rate']:.1%})")
+    print(f"  saved          {off - on:8.1f} us CPU/request ({(off - on) / off:.1%})")
+    print(f"  parse stage    {stage['parse_us']:.2f} us validate+canonicalize+key vs {stage['digest_us']:.2f} us digest lookup")
+
+
+if __name__ == "__main__":
+    main()
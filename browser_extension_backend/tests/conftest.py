@@ -0,0 +1,8 @@
+"""
+Test configuration
+"""
+
+import os
+
+# Settings are read on import and require a key; tests never reach the API
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
@@ -0,0 +1,47 @@
+"""
+Tests for offline audio quality scoring
+"""
+
+import struct
+
+import numpy as np
+import pytest
+
+import app.services.audio_quality as audio_quality
+from app.utils.audio_batch import score_file
+
+
+def _write_wav(path, channels=1, sample_rate=24000, bits=16, frames=4800):
+    block_align = max(channels, 1) * bits // 8
+    data = np.zeros(frames * max(channels, 1), dtype="<i2").tobytes()
+    fmt = struct.pack("<HHIIHH", 1, channels, sample_rate, sample_rate * block_align, block_align, bits)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(data)) + data
+    path.write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+    return str(path)
+
+
+def test_valid_wav_is_scored(tmp_path):
+    row = score_file((_write_wav(tmp_path / "ok.wav"), 24000, 1))
+    assert row["error"] is None
+    assert row["duration_seconds"] == pytest.approx(0.2)
+
+
+@pytest.mark.parametrize("header, message", [
+    ({"channels": 0}, "channel count 0"),
+    ({"channels": 9}, "channel count 9"),
+    ({"sample_rate": 0}, "sample rate 0"),
+    ({"bits": 8}, "8-bit"),
+])
+def test_malformed_wav_headers_become_error_rows(tmp_path, header, message):
+    row = score_file((_write_wav(tmp_path / "bad.wav", **header), 24000, 1))
+    assert message in row["error"]
+
+
+def test_analysis_failure_becomes_an_error_row(tmp_path, monkeypatch):
+    def failing(data, sample_rate, channels):
+        samples = np.frombuffer(data, dtype="<i2")  # holds the mapping while the error propagates
+        return samples.size / 0
+
+    monkeypatch.setattr(audio_quality, "analyze_pcm16", failing)
+    row = score_file((_write_wav(tmp_path / "ok.wav"), 24000, 1))
+    assert row["error"].startswith("analysis failed: ZeroDivisionError")
@@ -0,0 +1,82 @@
+"""
+Tests for token request canonicalization
+"""
+
+from app.config.settings import settings
+from app.models.token import TokenRequest
+from app.services.canonical_request import build_sport_aliases, canonicalize
+from app.services.token_service import TokenService
+from app.services.voice_config import VoiceConfigService
+
+SPORTS = {
+    "basketball": {"aliases": ["NBA", " hoops  ", "bball"]},
+    "football": {"aliases": ["nfl", "Football"]},
+    "soccer": {"aliases": ["football", "futbol"]},
+}
+
+ALIASES = build_sport_aliases(SPORTS)
+
+
+def test_aliases_are_normalized_and_include_the_sport_itself():
+    assert ALIASES["basketball"] == "basketball"
+    assert ALIASES["nba"] == "basketball"
+    assert ALIASES["hoops"] == "basketball"
+    assert " hoops  " not in ALIASES
+
+
+def test_alias_collisions_resolve_to_the_first_sport():
+    # "football" is football's own name before it is soccer's alias
+    assert ALIASES["football"] == "football"
+    assert ALIASES["futbol"] == "soccer"
+
+
+def test_blank_aliases_are_skipped():
+    assert build_sport_aliases({"hockey": {"aliases": ["", "   "]}, "golf": {}}) == {
+        "hockey": "hockey",
+        "golf": "golf",
+    }
+
+
+def test_sports_fold_case_and_whitespace():
+    for sport in ("NBA", "  nba ", "Hoops", "basketball"):
+        assert canonicalize(TokenRequest(sports_context=sport), ALIASES).sports_context == "basketball"
+
+
+def test_unknown_and_blank_sports_are_dropped():
+    assert canonicalize(TokenRequest(sports_context="curling"), ALIASES).sports_context is None
+    assert canonicalize(TokenRequest(sports_context="   "), ALIASES).sports_context is None
+
+
+def test_custom_instructions_are_kept_as_written():
+    request = TokenRequest(instructions="Call the game:\n- loudly\n- with stats")
+    assert canonicalize(request, ALIASES).instructions == request.instructions
+    assert canonicalize(TokenRequest(instructions=" \n "), ALIASES).instructions is None
+
+
+def test_instruction_whitespace_is_folded_in_the_cache_key_only():
+    service = TokenService(None, None, VoiceConfigService(), None)
+    listed = service.prepare(TokenRequest(instructions="Call the game:\n- loudly\n- with stats"))
+    flat = service.prepare(TokenRequest(instructions="  Call the game: - loudly - with stats "))
+
+    assert listed.cache_key == flat.cache_key
+    assert "Call the game:\n- loudly\n- with stats" in service._prepare_session_data(listed.canonical)["instructions"]
+
+
+def test_default_instructions_fold_to_none():
+    restated = "  " + settings.default_instructions.replace(" ", "  ") + "\n"
+    assert canonicalize(TokenRequest(instructions=restated), ALIASES).instructions is None
+    assert canonicalize(TokenRequest(instructions=restated), ALIASES) == canonicalize(TokenRequest(), ALIASES)
+
+
+def test_response_length_folds_to_known_values():
+    assert canonicalize(TokenRequest(response_length=" SHORT "), ALIASES).response_length == "short"
+    assert canonicalize(TokenRequest(response_length="verbose"), ALIASES).response_length == "medium"
+    assert canonicalize(TokenRequest(response_length=None), ALIASES).response_length == "medium"
+
+
+def test_other_fields_are_kept():
+    request = TokenRequest(voice="cedar", voice_quality="ultra", enable_interruptions=False)
+    canonical = canonicalize(request, ALIASES)
+    assert (canonical.voice, canonical.voice_quality, canonical.enable_interruptions) == (
+        request.voice, request.voice_quality, False
+    )
@@ -0,0 +1,44 @@
+"""
+Tests for first-request container initialization
+"""
+
+import asyncio
+
+import httpx
+
+from app.config.settings import settings
+
+
+def test_failed_initialization_is_a_structured_503(monkeypatch):
+    monkeypatch.setattr(settings, "health_probe_enabled", False)
+    from app.core.container import container
+    from app.main import app
+
+    async def broken():
+        raise RuntimeError("config unreadable")
+
+    async def scenario():
+        await container.cleanup()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            with monkeypatch.context() as patch:
+                patch.setattr(container, "_build_services", broken)
+                failed = await client.post("/v1/realtime/token", json={})
+                failed_stream = await client.get("/v1/realtime/token/stream")
+        # The failed attempt left nothing behind, so the next one starts afresh
+        await container.ready()
+        recovered = container.is_ready
+        await container.cleanup()
+        return failed, failed_stream, recovered
+
+    failed, failed_stream, recovered = asyncio.run(scenario())
+
+    assert recovered
+
+    for response in (failed, failed_stream):
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        body = response.json()
+        assert body["error"]["message"]["error"]["code"] == "service_unavailable"
+        assert body["request_id"] == response.headers["x-request-id"]
+        assert "timestamp" in body
@@ -0,0 +1,64 @@
+"""
+Tests for the precompiled voice configuration snapshot
+"""
+
+import json
+import marshal
+from pathlib import Path
+
+import pytest
+import yaml
+
+from app.utils.config_snapshot import DEFAULT_SNAPSHOT_PATH, SNAPSHOT_VERSION, build_snapshot, load_snapshot
+
+YAML_PATH = Path(__file__).parent.parent.parent / "shared_config" / "voice_personalities.yaml"
+
+
+def test_committed_snapshot_matches_yaml():
+    """Vercel deploys only the snapshot; rebuild with python -m app.utils.config_snapshot"""
+    config = load_snapshot(DEFAULT_SNAPSHOT_PATH, YAML_PATH)
+
+    assert config is not None, "config snapshot is missing or stale"
+    assert config == yaml.safe_load(YAML_PATH.read_text(encoding="utf-8"))
+
+
+def test_stale_snapshot_is_ignored(tmp_path):
+    yaml_path = tmp_path / "voices.yaml"
+    snapshot_path = tmp_path / "voices.snapshot"
+    yaml_path.write_text("voices:\n  verse: {}\n", encoding="utf-8")
+    build_snapshot(yaml_path, snapshot_path)
+
+    assert load_snapshot(snapshot_path, yaml_path) == {"voices": {"verse": {}}}
+
+    yaml_path.write_text("voices:\n  cedar: {}\n", encoding="utf-8")
+    assert load_snapshot(snapshot_path, yaml_path) is None
+
+
+def test_snapshot_is_used_without_yaml(tmp_path):
+    yaml_path = tmp_path / "voices.yaml"
+    snapshot_path = tmp_path / "voices.snapshot"
+    yaml_path.write_text("voices:\n  verse: {}\n", encoding="utf-8")
+    build_snapshot(yaml_path, snapshot_path)
+    yaml_path.unlink()
+
+    assert load_snapshot(snapshot_path, yaml_path) == {"voices": {"verse": {}}}
+    assert load_snapshot(tmp_path / "missing.snapshot", yaml_path) is None
+
+
+def test_snapshot_is_portable_json(tmp_path):
+    """Readable by any Python version, unlike marshal output"""
+    payload = json.loads(DEFAULT_SNAPSHOT_PATH.read_bytes())
+    assert payload["version"] == SNAPSHOT_VERSION
+
+    legacy = tmp_path / "legacy.snapshot"
+    legacy.write_bytes(marshal.dumps({"version": 1, "config": {}}))
+    assert load_snapshot(legacy, YAML_PATH) is None
+
+
+def test_yaml_json_cannot_represent_is_refused(tmp_path):
+    yaml_path = tmp_path / "voices.yaml"
+    yaml_path.write_text("voices:\n  1: {released: 2024-01-01}\n", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        build_snapshot(yaml_path, tmp_path / "voices.snapshot")
+    assert not (tmp_path / "voices.snapshot").exists()
@@ -0,0 +1,98 @@
+"""
+Tests for deficit round-robin scheduling of upstream slots
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.fair_scheduler import FairScheduler, UpstreamQueueRejected
+
+
+async def _grant_order(scheduler, requests):
+    """Origins in the order queued ``requests`` get a slot, releasing each at once"""
+    order = []
+
+    async def request(origin):
+        await scheduler.acquire(origin)
+        order.append(origin)
+        scheduler.release()
+
+    await scheduler.acquire("holder")
+    tasks = []
+    for origin in requests:
+        tasks.append(asyncio.create_task(request(origin)))
+        await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_free_slots_pass_straight_through():
+    async def scenario():
+        scheduler = FairScheduler(max_concurrency=2, max_queue_per_origin=1, queue_timeout=1)
+        await scheduler.acquire("a")
+        await scheduler.acquire("a")
+        return scheduler.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["in_flight"] == 2
+    assert stats["queued"] == 0
+
+
+def test_origins_take_turns():
+    scheduler = FairScheduler(max_concurrency=1, max_queue_per_origin=10, queue_timeout=1)
+    order = asyncio.run(_grant_order(scheduler, ["a", "a", "a", "b", "b"]))
+
+    assert order == ["a", "b", "a", "b", "a"]
+    assert scheduler.get_stats()["dispatched_from_queue"] == 5
+
+
+def test_weights_scale_each_origins_share():
+    scheduler = FairScheduler(max_concurrency=1, max_queue_per_origin=10, queue_timeout=1, weights={"a": 2.0})
+    order = asyncio.run(_grant_order(scheduler, ["a"] * 4 + ["b"] * 2))
+
+    assert order == ["a", "a", "b", "a", "a", "b"]
+
+
+def test_full_queue_and_deadline_are_rejected():
+    async def scenario():
+        scheduler = FairScheduler(max_concurrency=1, max_queue_per_origin=1, queue_timeout=0.01)
+        await scheduler.acquire("holder")
+        waiting = asyncio.create_task(scheduler.acquire("a"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(UpstreamQueueRejected, match="full"):
+            await scheduler.acquire("a")
+        with pytest.raises(UpstreamQueueRejected, match="deadline"):
+            await waiting
+        return scheduler.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["rejected_queue_full"], stats["rejected_deadline"]) == (1, 1)
+
+
+def test_abandoned_waiters_free_their_queue_place():
+    async def scenario():
+        scheduler = FairScheduler(max_concurrency=1, max_queue_per_origin=1, queue_timeout=0.01)
+        await scheduler.acquire("holder")
+
+        with pytest.raises(UpstreamQueueRejected, match="deadline"):
+            await scheduler.acquire("a")
+        cancelled = asyncio.create_task(scheduler.acquire("a"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert scheduler.get_stats()["queued_origins"] == 0
+
+        # Neither abandoned waiter holds the origin's only queue place
+        scheduler.queue_timeout = 1
+        waiting = asyncio.create_task(scheduler.acquire("a"))
+        await asyncio.sleep(0)
+        scheduler.release()
+        await waiting
+        return scheduler.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["in_flight"], stats["queued"], stats["rejected_queue_full"]) == (1, 0, 0)
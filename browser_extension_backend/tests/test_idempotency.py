@@ -0,0 +1,125 @@
+"""
+Tests for the Idempotency-Key result store
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.idempotency import IdempotencyConflict, IdempotencyStore
+
+
+class Call:
+    """Counts invocations; each one waits for ``release`` when given"""
+
+    def __init__(self, minted: bool = True, release: asyncio.Event = None):
+        self.calls = 0
+        self.minted = minted
+        self.release = release
+
+    async def __call__(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        return f"result-{self.calls}", self.minted
+
+
+def test_first_call_runs_and_retry_replays():
+    async def scenario():
+        store = IdempotencyStore(ttl_seconds=60, max_entries=10)
+        call = Call()
+        first = await store.run("k", b"body", call)
+        retry = await store.run("k", b"body", call)
+        return store, call, first, retry
+
+    store, call, first, retry = asyncio.run(scenario())
+
+    assert first == ("result-1", False)
+    assert retry == ("result-1", True)
+    assert call.calls == 1
+    assert store.get_stats()["replayed"] == 1
+    # The retry would have hit the token cache anyway
+    assert store.get_stats()["upstream_mints_avoided"] == 0
+
+
+def test_concurrent_retry_joins_in_flight_call():
+    async def scenario():
+        store = IdempotencyStore(ttl_seconds=60, max_entries=10)
+        call = Call(release=asyncio.Event())
+        first = asyncio.create_task(store.run("k", b"body", call))
+        await asyncio.sleep(0)
+        joined = asyncio.create_task(store.run("k", b"body", call))
+        await asyncio.sleep(0)
+        assert "k" in store
+        call.release.set()
+        return store, call, await first, await joined
+
+    store, call, first, joined = asyncio.run(scenario())
+
+    assert call.calls == 1
+    assert first == ("result-1", False)
+    assert joined == ("result-1", True)
+    assert store.get_stats()["joined"] == 1
+    assert store.get_stats()["upstream_mints_avoided"] == 1
+
+
+def test_same_key_with_different_body_conflicts():
+    async def scenario():
+        store = IdempotencyStore(ttl_seconds=60, max_entries=10)
+        await store.run("k", b"body", Call())
+        await store.run("k", b"other body", Call())
+
+    with pytest.raises(IdempotencyConflict):
+        asyncio.run(scenario())
+
+
+def test_failed_call_is_forgotten():
+    async def scenario():
+        store = IdempotencyStore(ttl_seconds=60, max_entries=10)
+
+        async def failing():
+            raise RuntimeError("upstream down")
+
+        with pytest.raises(RuntimeError):
+            await store.run("k", b"body", failing)
+        assert "k" not in store
+        return await store.run("k", b"body", Call())
+
+    assert asyncio.run(scenario()) == ("result-1", False)
+
+
+def test_retry_takes_over_when_original_is_cancelled():
+    async def scenario():
+        store = IdempotencyStore(ttl_seconds=60, max_entries=10)
+        call = Call(release=asyncio.Event())
+        original = asyncio.create_task(store.run("k", b"body", call))
+        await asyncio.sleep(0)
+        retry = asyncio.create_task(store.run("k", b"body", call))
+        await asyncio.sleep(0)
+        original.cancel()
+        await asyncio.sleep(0)
+        call.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await original
+        return call, await retry
+
+    call, result = asyncio.run(scenario())
+
+    assert call.calls == 2
+    assert result == ("result-2", False)
+
+
+def test_expired_and_evicted_entries_run_again():
+    async def scenario():
+        expiring = IdempotencyStore(ttl_seconds=0, max_entries=10)
+        call = Call()
+        await expiring.run("k", b"body", call)
+        assert "k" not in expiring
+        assert await expiring.run("k", b"body", call) == ("result-2", False)
+
+        bounded = IdempotencyStore(ttl_seconds=60, max_entries=1)
+        await bounded.run("a", b"body", Call())
+        await bounded.run("b", b"body", Call())
+        assert "a" not in bounded and "b" in bounded
+
+    asyncio.run(scenario())
@@ -0,0 +1,109 @@
+"""
+Tests for the token-bucket rate limiters and client identity
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+from starlette.requests import Request
+
+from app.config.settings import settings
+from app.core.client_identity import client_ip
+from app.services.rate_limiter import SQLiteRateLimiter, TokenBucketRateLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_burst_then_refill():
+    clock = Clock()
+    limiter = TokenBucketRateLimiter(rate_per_minute=60, burst=3, clock=clock)
+
+    assert [limiter.check("a").allowed for _ in range(4)] == [True, True, True, False]
+    assert limiter.check("a").retry_after == pytest.approx(1.0)
+    # Other keys have their own bucket
+    assert limiter.check("b").allowed
+
+    clock.now += 1.0
+    assert limiter.check("a").allowed
+    assert not limiter.check("a").allowed
+
+    clock.now += 60
+    assert limiter.check("a").remaining == 2
+
+
+def test_idle_buckets_are_evicted():
+    clock = Clock()
+    limiter = TokenBucketRateLimiter(rate_per_minute=60, burst=5, clock=clock)
+    limiter.check("old")
+    clock.now += 4
+    limiter.check("recent")
+    clock.now += 2
+
+    assert limiter.evict_idle() == 1
+    assert limiter.tracked_keys() == 1
+
+
+def test_full_shard_drops_least_recently_used_key():
+    limiter = TokenBucketRateLimiter(rate_per_minute=60, burst=1, shards=1, max_keys_per_shard=2, clock=Clock())
+    limiter.check("a")
+    limiter.check("b")
+    limiter.check("a")
+    limiter.check("c")
+
+    # "b" was evicted, so it starts with a full bucket again
+    assert limiter.check("b").allowed
+    assert not limiter.check("c").allowed
+    assert limiter.get_stats()["evicted"] == 2
+
+
+def test_sqlite_buckets_are_shared(tmp_path):
+    path = str(tmp_path / "limits.sqlite3")
+    first = SQLiteRateLimiter(rate_per_minute=1, burst=2, path=path)
+    second = SQLiteRateLimiter(rate_per_minute=1, burst=2, path=path)
+
+    assert first.check("a").allowed
+    assert asyncio.run(second.acquire("a")).allowed
+    assert not first.check("a").allowed
+    assert first.tracked_keys() == 1
+
+
+def test_sqlite_fails_open_when_locked(tmp_path):
+    path = str(tmp_path / "limits.sqlite3")
+    limiter = SQLiteRateLimiter(rate_per_minute=1, burst=1, path=path)
+    holder = sqlite3.connect(path, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        limiter._connection().execute("PRAGMA busy_timeout=0")
+        assert limiter.check("a").allowed
+        assert limiter.get_stats()["errors"] == 1
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+
+
+def _request(forwarded_for=None, peer="10.0.0.1"):
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+
+def test_forwarded_for_is_ignored_without_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(settings, "trusted_proxy_count", 0)
+    assert client_ip(_request("1.2.3.4")) == "10.0.0.1"
+
+
+def test_forwarded_for_uses_the_trusted_hop(monkeypatch):
+    monkeypatch.setattr(settings, "trusted_proxy_count", 1)
+    # The client prepended a spoofed address; the proxy appended the real one
+    assert client_ip(_request("6.6.6.6, 1.2.3.4")) == "1.2.3.4"
+    assert client_ip(_request()) == "10.0.0.1"
+
+    monkeypatch.setattr(settings, "trusted_proxy_count", 2)
+    assert client_ip(_request("6.6.6.6, 1.2.3.4, 172.16.0.1")) == "1.2.3.4"
+    assert client_ip(_request("1.2.3.4")) == "1.2.3.4"
@@ -0,0 +1,25 @@
+"""
+Tests for request ID stamping
+"""
+
+import asyncio
+
+import httpx
+
+
+def test_error_responses_carry_one_request_id():
+    from app.main import app
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(
+                "/v1/voice/events",
+                json={"session_id": "s1", "events": [["interruption"]]},
+                headers={"Idempotency-Key": "k" * 300}
+            )
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 400
+    assert response.headers.get_list("x-request-id") == [response.json()["request_id"]]
@@ -0,0 +1,97 @@
+"""
+Tests for server-sent token refresh channels
+"""
+
+import asyncio
+import gc
+import time
+
+import pytest
+
+from app.models.token import TokenRequest, TokenResponse
+from app.services.canonical_request import canonicalize
+from app.services.token_service import PreparedRequest
+from app.services.token_stream import TokenBroadcaster, TokenStreamFull
+
+
+class FakeTokenService:
+    """Keys requests by sport and mints numbered sessions"""
+
+    def __init__(self):
+        self.mints = 0
+
+    def prepare(self, token_request):
+        canonical = canonicalize(token_request, {"basketball": "basketball", "nba": "basketball"})
+        return PreparedRequest(token_request, canonical, f"key:{canonical.sports_context}")
+
+    async def generate_token(self, token_request, request_id, origin, min_valid_seconds, prepared):
+        self.mints += 1
+        return TokenResponse(
+            client_secret="secret", expires_at=int(time.time()) + 600, session_id=f"sess_{self.mints}",
+            model=token_request.model.value, voice=token_request.voice.value, instructions="instructions",
+            web_rtc_url="https://example.test", voice_quality=token_request.voice_quality.value,
+            audio_format=token_request.audio_format.value, difficulty=token_request.difficulty.value,
+            enable_interruptions=token_request.enable_interruptions,
+            response_length=token_request.response_length, sports_context=token_request.sports_context
+        )
+
+
+def _broadcaster(max_subscribers=10):
+    return TokenBroadcaster(FakeTokenService(), lead_seconds=5, heartbeat_seconds=10,
+                            max_subscribers=max_subscribers, retry_seconds=1)
+
+
+async def _first_token(stream):
+    await stream.__anext__()  # retry hint
+    return await stream.__anext__()
+
+
+def test_subscribers_share_a_mint_but_get_their_own_echo():
+    async def scenario():
+        broadcaster = _broadcaster()
+        high = broadcaster.subscribe(TokenRequest(voice_quality="high", sports_context="NBA"))
+        ultra = broadcaster.subscribe(TokenRequest(voice_quality="ultra", sports_context=" basketball "))
+        events = await _first_token(high), await _first_token(ultra)
+        stats = broadcaster.get_stats()
+        await high.aclose()
+        await ultra.aclose()
+        return broadcaster, stats, events
+
+    broadcaster, stats, (high, ultra) = asyncio.run(scenario())
+
+    assert broadcaster.token_service.mints == 1
+    assert stats["channels"] == 1
+    assert b'"voice_quality":"high"' in high and b'"sports_context":"NBA"' in high
+    assert b'"voice_quality":"ultra"' in ultra and b'"sports_context":" basketball "' in ultra
+    assert broadcaster.get_stats()["subscribers"] == 0
+    assert broadcaster.get_stats()["channels"] == 0
+
+
+def test_subscribe_reserves_the_slot():
+    async def scenario():
+        broadcaster = _broadcaster(max_subscribers=1)
+        stream = broadcaster.subscribe(TokenRequest())
+        # Not iterated yet, but it already holds the only slot
+        with pytest.raises(TokenStreamFull):
+            broadcaster.subscribe(TokenRequest())
+        await _first_token(stream)
+        await stream.aclose()
+        broadcaster.subscribe(TokenRequest())
+        return broadcaster.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["rejected"] == 1
+
+
+def test_unstarted_stream_releases_its_slot():
+    async def scenario():
+        broadcaster = _broadcaster()
+        stream = broadcaster.subscribe(TokenRequest())
+        assert broadcaster.subscribers == 1
+        del stream
+        gc.collect()
+        return broadcaster
+
+    broadcaster = asyncio.run(scenario())
+    assert broadcaster.subscribers == 0
+    assert broadcaster.token_service.mints == 0
@@ -0,0 +1,78 @@
+"""
+Tests for client voice event validation and ingestion
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from app.config.settings import settings
+from app.models.events import VoiceEventBatch
+
+BAD_EVENTS = [
+    '[["quality", NaN], ["end", 3]]',
+    '[["satisfaction", Infinity]]',
+    '[["end", -Infinity]]',
+    '[["quality", 1.5]]',
+    '[["satisfaction", -0.1]]',
+    '[["audio_chunk", -4096]]',
+    '[["audio_chunk", 1e12]]',
+    '[["end", -3]]',
+    '[["end", 1e9]]',
+]
+
+
+@pytest.mark.parametrize("events", BAD_EVENTS)
+def test_bad_event_values_are_rejected(events):
+    with pytest.raises(ValidationError):
+        VoiceEventBatch.model_validate_json(f'{{"session_id": "s1", "events": {events}}}')
+
+
+def test_valid_event_values_are_accepted():
+    batch = VoiceEventBatch(
+        session_id="s1",
+        events=[["audio_chunk", 0], ["interruption"], ["quality", 1], ["satisfaction", 0], ["end", 48.5]]
+    )
+    assert len(batch.events) == 5
+
+
+def test_rejected_batches_leave_monitoring_serializable(monkeypatch):
+    monkeypatch.setattr(settings, "health_probe_enabled", False)
+    from app.core.container import container
+    from app.main import app
+
+    async def scenario():
+        await container.initialize()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                rejected = []
+                for events in BAD_EVENTS:
+                    response = await client.post(
+                        "/v1/voice/events",
+                        content=f'{{"session_id": "s1", "events": {events}}}',
+                        headers={"content-type": "application/json"}
+                    )
+                    rejected.append(response.status_code)
+                accepted = await client.post(
+                    "/v1/voice/events", json={"session_id": "s2", "events": [["quality", 0.9], ["end", 3]]}
+                )
+                await asyncio.sleep(0.05)
+                container.monitoring_snapshots.refresh()
+                default_view = await client.get("/v1/voice/monitoring")
+                filtered_view = await client.get("/v1/voice/monitoring", params={"voice": "verse"})
+        finally:
+            await container.cleanup()
+        return rejected, accepted, default_view, filtered_view
+
+    rejected, accepted, default_view, filtered_view = asyncio.run(scenario())
+
+    assert rejected == [422] * len(BAD_EVENTS)
+    assert accepted.status_code == 202
+    assert default_view.status_code == 200 and filtered_view.status_code == 200
+    stats = default_view.json()["voice_monitoring"]["performance_stats"]
+    assert stats["average_audio_quality"] == pytest.approx(0.9)
+    json.dumps(default_view.json(), allow_nan=False)
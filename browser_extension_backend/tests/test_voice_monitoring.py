@@ -0,0 +1,34 @@
+"""
+Tests for voice monitoring aggregates
+"""
+
+from app.services.voice_monitoring import VoiceMonitoringService
+
+
+def test_reported_sessions_count_toward_interruption_rate():
+    monitoring = VoiceMonitoringService()
+
+    monitoring.start_session("req-1", "verse", "easy")
+    monitoring.end_session("req-1")
+    for session_id, interruptions in (("sess-1", 3), ("sess-2", 0)):
+        monitoring.start_session(session_id, "cedar", "easy")
+        for _ in range(interruptions):
+            monitoring.record_interruption(session_id)
+        monitoring.end_reported_session(session_id, audio_duration_seconds=30)
+
+    stats = monitoring.get_performance_stats()
+    assert stats.interruption_rate == 1.0
+    # Reported sessions are not token requests
+    assert stats.total_requests == 1
+    assert monitoring.get_session_stats()["reported_sessions"] == 2
+
+
+def test_reported_scores_are_folded_into_averages():
+    monitoring = VoiceMonitoringService()
+    monitoring.start_session("sess-1", "cedar", "easy")
+    monitoring.record_scores("sess-1", audio_quality_score=0.8, user_satisfaction_score=0.6)
+    monitoring.end_reported_session("sess-1")
+
+    stats = monitoring.get_performance_stats()
+    assert (stats.average_audio_quality, stats.average_user_satisfaction) == (0.8, 0.6)
+    assert monitoring.get_session_stats()["reported_audio_seconds"] == 0